@@ -1,6 +1,10 @@
 import streamlit as st
 import os
 import time
+import html
+import queue
+import threading
+import uuid
 import requests
 
 st.set_page_config(
@@ -453,6 +457,7 @@ elif mode == "Combined Market Brief":
 with st.expander("⚙  Advanced Settings"):
     analysis_depth = st.select_slider("Analysis Depth", ["Brief", "Standard", "Detailed"], value="Standard")
     include_recommendation = st.checkbox("Include actionable recommendations", value=True)
+    live_stream = st.checkbox("Stream agent output live", value=True)
     audience = st.selectbox("Target Audience",
         ["General", "Investor", "Business Analyst", "Travel Planner"], index=1)
 
@@ -460,6 +465,105 @@ st.markdown('<div class="div"></div>', unsafe_allow_html=True)
 run_btn = st.button("◈  FETCH LIVE DATA & RUN AGENTS")
 
 
+# ── Streaming ──────────────────────────────────────────────────────────────────
+# StreamRoutes / _stream_routes / kickoff_streaming are kept in sync with
+# startup-evaluation-orchestrator/app.py (only the step / task payloads differ) —
+# each app deploys as a single file.
+class StreamRoutes:
+    """
+    run id → {id(llm): (llm, chunk callback)}. Concurrent Streamlit sessions
+    register and remove their runs under one lock, and a chunk only reaches
+    the run whose LLM object emitted it. Holding the LLM keeps its id from
+    being reused by another session's LLM while the run is registered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs = {}
+
+    def add(self, run_id, llm, callback):
+        with self._lock:
+            self._runs.setdefault(run_id, {})[id(llm)] = (llm, callback)
+
+    def remove(self, run_id):
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def dispatch(self, source, chunk):
+        callbacks = []
+        with self._lock:
+            for run in self._runs.values():
+                llm, callback = run.get(id(source), (None, None))
+                if llm is source:
+                    callbacks.append(callback)
+        for callback in callbacks:
+            callback(chunk)
+
+
+@st.cache_resource
+def _stream_routes():
+    """
+    The process-wide StreamRoutes. CrewAI's event bus is process-wide, so one
+    listener is registered per process and routes chunks by emitting LLM.
+    Returns None when this CrewAI build has no token stream events.
+    """
+    try:
+        from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+    except ImportError:
+        try:
+            from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+        except ImportError:
+            return None
+    routes = StreamRoutes()
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _route_chunk(source, event):
+        routes.dispatch(source, event.chunk)
+
+    return routes
+
+
+def kickoff_streaming(crew, on_event, poll=0.1):
+    """
+    Runs crew.kickoff() on a worker thread. Agent steps, finished tasks and LLM
+    token chunks are queued and handed to on_event(kind, agent, text) here on
+    the Streamlit thread — only this thread may draw.
+    Returns (result, ttft_seconds | None); re-raises the crew's exception.
+    """
+    events, box = queue.Queue(), {}
+    routes, run_id = _stream_routes(), uuid.uuid4().hex
+    for agent in crew.agents:
+        if routes is not None and getattr(agent, "llm", None) is not None:
+            routes.add(run_id, agent.llm, lambda chunk, role=agent.role: events.put(("token", role, chunk)))
+    crew.step_callback = lambda step: events.put(("step", None, getattr(step, "tool", None) or ""))
+    crew.task_callback = lambda out: events.put(("task", getattr(out, "agent", None), ""))
+
+    def worker():
+        try:
+            box["result"] = crew.kickoff()
+        except Exception as e:
+            box["error"] = e
+
+    start, first_token = time.time(), None
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        while thread.is_alive() or not events.empty():
+            try:
+                kind, agent, text = events.get(timeout=poll)
+            except queue.Empty:
+                continue
+            if kind == "token" and first_token is None:
+                first_token = time.time()
+            on_event(kind, agent, text)
+    finally:
+        if routes is not None:
+            routes.remove(run_id)
+    if "error" in box:
+        raise box["error"]
+    return box["result"], (round(first_token - start, 2) if first_token else None)
+
+
 # ── Execution ──────────────────────────────────────────────────────────────────
 if run_btn:
     try:
@@ -481,6 +585,7 @@ if run_btn:
     t0 = time.time()
     log_ph    = st.empty()
     status_ph = st.empty()
+    stream_ph = st.empty()
 
     def ts():
         return f"{round(time.time()-t0,1):>5}s"
@@ -700,8 +805,44 @@ if run_btn:
     rec_instruction = "Include specific actionable recommendations." if include_recommendation else "Analysis only, no recommendations."
     audience_instruction = f"Target audience: {audience}. Adjust tone and depth accordingly."
 
+    stream_tokens = live_stream and _stream_routes() is not None
+
+    def make_llm():
+        # One instance per agent so streamed chunks can be attributed to it
+        if stream_tokens:
+            return LLM(model=model_id, api_key=api_key, temperature=0.7, stream=True)
+        return LLM(model=model_id, api_key=api_key, temperature=0.7)
+
+    buffers   = {}
+    last_draw = [0.0]
+
+    def render_stream():
+        rows = "".join(
+            f'<div class="log-line"><span class="log-tag t-agt">{html.escape(role)}</span>'
+            f'<span class="log-msg">{html.escape(text[-600:])}</span></div>'
+            for role, text in buffers.items()
+        )
+        stream_ph.markdown(f"""
+        <div class="log-wrap">
+            <div class="log-head"><span class="log-head-title">Live Agent Output</span></div>
+            <div class="log-body">{rows}</div>
+        </div>""", unsafe_allow_html=True)
+
+    def on_event(kind, agent, text):
+        if kind == "token":
+            buffers[agent] = buffers.get(agent, "") + text
+            if time.time() - last_draw[0] > 0.15:
+                render_stream()
+                last_draw[0] = time.time()
+        elif kind == "task":
+            log.append((ts(), "AGT", "t-agt", f"Task complete · {html.escape(str(agent))}"))
+            render_log(log)
+        elif text:
+            log.append((ts(), "API", "t-api", f"Tool call · {html.escape(str(text))}"))
+            render_log(log)
+
     try:
-        llm = LLM(model=model_id, api_key=api_key, temperature=0.7)
+        llm = make_llm()
         coin_str = ",".join(coins)
 
         if mode == "Weather Intelligence":
@@ -748,7 +889,7 @@ if run_btn:
                 role="Crypto Market Specialist",
                 goal=f"Fetch and analyze live prices for {coin_str}.",
                 backstory=f"Quantitative crypto analyst. Always uses Crypto Price Tool. {audience_instruction}",
-                tools=[crypto_tool], llm=llm, verbose=False,
+                tools=[crypto_tool], llm=make_llm(), verbose=False,
             )
             weather_task = Task(
                 description=f"Fetch weather for {city}. Depth: {depth_instruction}",
@@ -767,8 +908,9 @@ if run_btn:
                 verbose=False,
             )
 
-        result = crew.kickoff()
+        result, ttft = kickoff_streaming(crew, on_event)
         elapsed = round(time.time() - t0, 1)
+        stream_ph.empty()
 
         # Extract outputs
         out1, out2 = "", ""
@@ -783,6 +925,8 @@ if run_btn:
 
         log.append((ts(), "API", "t-api", "All API calls completed ✓"))
         log.append((ts(), "AGT", "t-agt", f"Agent analysis complete in {elapsed}s"))
+        if ttft is not None:
+            log.append((ts(), "AGT", "t-agt", f"First token after {ttft}s"))
         render_log(log)
 
         status_ph.markdown(f"""
@@ -800,6 +944,7 @@ if run_btn:
             <div class="stat">agents <b>{agent_count}</b></div>
             <div class="stat">live apis <b>{api_list}</b></div>
             <div class="stat">elapsed <b>{elapsed}s</b></div>
+            <div class="stat">first token <b>{f"{ttft}s" if ttft is not None else "—"}</b></div>
             <div class="stat">model <b>{model_id.split('/')[1]}</b></div>
             <div class="stat">depth <b>{analysis_depth}</b></div>
         </div>""", unsafe_allow_html=True)
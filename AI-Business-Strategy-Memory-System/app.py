@@ -1,9 +1,9 @@
 import streamlit as st
+import io
 import os
 import time
 import json
-import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 st.set_page_config(
     page_title="AgentForge · Memory Systems",
@@ -401,33 +401,74 @@ st.markdown("""
 # ── Init session state ────────────────────────────────────────────────────────────
 if "chroma_collection" not in st.session_state:
     st.session_state["chroma_collection"] = None
-if "memory_entries" not in st.session_state:
-    st.session_state["memory_entries"] = []  # [{id, text, category, ts}]
 if "chroma_ready" not in st.session_state:
     st.session_state["chroma_ready"] = False
+if "vault_page" not in st.session_state:
+    st.session_state["vault_page"] = 0
+
+
+# ── Init ChromaDB (persistent, one collection per workspace) ──────────────────────
+try:
+    import memory_vault as vault
+    import memory_search
+    import vault_io
+    import consolidation
+except ImportError:
+    st.markdown('<div class="err-box">⚠ ChromaDB Error: chromadb not installed. Add `chromadb` to requirements.txt.</div>', unsafe_allow_html=True)
+    st.stop()
 
 
-# ── Init ChromaDB (lazy) ──────────────────────────────────────────────────────────
 @st.cache_resource
-def init_chroma():
+def init_vault_client():
+    return vault.get_client()
+
+
+@st.cache_resource
+def init_chroma(workspace):
     try:
-        import chromadb
-        client = chromadb.Client()
-        collection = client.get_or_create_collection(
-            name="business_memory",
-            metadata={"hnsw:space": "cosine"}
-        )
-        return collection, None
-    except ImportError:
-        return None, "chromadb not installed. Add `chromadb` to requirements.txt."
+        return vault.open_vault(init_vault_client(), workspace), None
     except Exception as e:
         return None, str(e)
 
 
-collection, chroma_err = init_chroma()
+@st.cache_resource
+def start_consolidation(workspace):
+    # one background consolidation thread per workspace for the whole process,
+    # only when MEMORY_CONSOLIDATE_INTERVAL is set (None otherwise)
+    return consolidation.start_background(init_chroma(workspace)[0])
+
+
+@st.cache_data(show_spinner=False)
+def vault_categories(workspace, count):
+    # keyed by count so any add / delete (from any replica) re-scans the metadata
+    return dict(vault.category_counts(init_chroma(workspace)[0]))
+
+
+# ── Workspace ─────────────────────────────────────────────────────────────────────
+if "workspace_input" not in st.session_state:
+    st.session_state["workspace_input"] = st.query_params.get("workspace", vault.DEFAULT_WORKSPACE)
+
+with st.sidebar:
+    st.markdown('<span class="sec-label">Workspace</span>', unsafe_allow_html=True)
+    workspace = vault.workspace_slug(st.text_input("workspace", key="workspace_input", label_visibility="collapsed"))
+    st.query_params["workspace"] = workspace
+    try:
+        known = vault.list_workspaces(init_vault_client())
+        if known:
+            st.caption("Existing: " + ", ".join(known))
+    except Exception:
+        pass
+
+if st.session_state.get("workspace") != workspace:
+    st.session_state["workspace"]   = workspace
+    st.session_state["vault_page"]  = 0
+    st.session_state["export_file"] = None
+
+collection, chroma_err = init_chroma(workspace)
 if collection is not None:
     st.session_state["chroma_collection"] = collection
     st.session_state["chroma_ready"] = True
+    start_consolidation(workspace)
 
 
 # ── Memory status banner ──────────────────────────────────────────────────────────
@@ -437,8 +478,8 @@ if chroma_err:
 
 
 # ── Stats row ─────────────────────────────────────────────────────────────────────
-entry_count = len(st.session_state["memory_entries"])
-categories  = list(set(e["category"] for e in st.session_state["memory_entries"])) if entry_count > 0 else []
+entry_count = collection.count()
+categories  = sorted(vault_categories(workspace, entry_count)) if entry_count > 0 else []
 
 st.markdown(f"""
 <div class="stat-row">
@@ -455,8 +496,8 @@ st.markdown(f"""
         <div class="stat-lbl">ChromaDB status</div>
     </div>
     <div class="stat-card">
-        <div class="stat-val">cosine</div>
-        <div class="stat-lbl">Similarity metric</div>
+        <div class="stat-val">{workspace}</div>
+        <div class="stat-lbl">Workspace</div>
     </div>
 </div>
 """, unsafe_allow_html=True)
@@ -512,28 +553,57 @@ with tab1:
             st.markdown('<div class="err-box">⚠ Please enter an insight before storing.</div>', unsafe_allow_html=True)
         else:
             coll = st.session_state["chroma_collection"]
-            doc_id = f"mem_{uuid.uuid4().hex[:8]}"
             try:
-                coll.add(
-                    documents=[insight_text.strip()],
-                    metadatas=[{"category": category, "ts": datetime.now().isoformat()}],
-                    ids=[doc_id]
-                )
-                st.session_state["memory_entries"].append({
-                    "id": doc_id,
-                    "text": insight_text.strip(),
-                    "category": category,
-                    "ts": datetime.now().strftime("%H:%M:%S")
-                })
+                doc_id = vault.add_memory(coll, insight_text.strip(), category)
+                st.session_state["vault_page"] = 0
                 st.success(f"✓ Stored as `{doc_id}` in ChromaDB")
             except Exception as e:
                 st.markdown(f'<div class="err-box">ChromaDB write error: {e}</div>', unsafe_allow_html=True)
 
+    # Bulk import / export
+    with st.expander("📦  Bulk import / export"):
+        upload = st.file_uploader(
+            "Import insights (CSV / JSONL / Markdown, or a Parquet backup)",
+            type=["csv", "jsonl", "md", "parquet"], key="bulk_file"
+        )
+        bulk_category = st.selectbox("Category for rows without one", vault.CATEGORIES, index=3, key="bulk_cat")
+        if st.button("⇪  IMPORT FILE", key="import_btn", disabled=upload is None):
+            bar = st.progress(0.0, text="Importing...")
+            try:
+                stats = vault_io.import_file(
+                    st.session_state["chroma_collection"], upload, upload.name,
+                    default_category=bulk_category,
+                    progress=lambda done, total: bar.progress(min(done / max(total, 1), 1.0), text=f"{done} / {total}"),
+                )
+                bar.empty()
+                st.session_state["vault_page"] = 0
+                st.success(f"✓ {stats['written']} stored · {stats['duplicates']} duplicates in file · "
+                           f"{stats['existing']} already in vault · {stats['seconds']}s")
+            except Exception as e:
+                bar.empty()
+                st.markdown(f'<div class="err-box">Import error: {e}</div>', unsafe_allow_html=True)
+
+        if st.button("⇩  BUILD PARQUET EXPORT", key="export_btn"):
+            buf = io.BytesIO()
+            try:
+                rows = vault_io.export_parquet(st.session_state["chroma_collection"], buf)
+                st.session_state["export_file"] = (rows, buf.getvalue())
+            except Exception as e:
+                st.markdown(f'<div class="err-box">Export error: {e}</div>', unsafe_allow_html=True)
+        if st.session_state.get("export_file"):
+            rows, data = st.session_state["export_file"]
+            st.download_button(f"Download {rows} memories (.parquet)", data,
+                               file_name=f"memory_vault_{workspace}.parquet",
+                               mime="application/octet-stream", key="export_dl")
+
     st.markdown('<div class="div"></div>', unsafe_allow_html=True)
 
-    # Memory vault display
-    entries = st.session_state["memory_entries"]
-    vault_count = len(entries)
+    # Memory vault display — one page at a time, newest first, read from the store
+    coll        = st.session_state["chroma_collection"]
+    vault_count = coll.count()
+    page_count  = max(1, -(-vault_count // vault.PAGE_SIZE))
+    st.session_state["vault_page"] = min(st.session_state["vault_page"], page_count - 1)
+    entries = vault.page(coll, st.session_state["vault_page"], total=vault_count)
 
     st.markdown(f"""
     <div class="vault-header">
@@ -555,27 +625,49 @@ with tab1:
     else:
         tag_cls_map = {"Market": "tag-market", "Technology": "tag-tech",
                        "General": "tag-general", "Health": "tag-health", "Custom": "tag-custom"}
-        for e in reversed(entries):
+        for e in entries:
             cls = tag_cls_map.get(e["category"], "tag-custom")
             st.markdown(f"""
             <div class="memory-card">
                 <div class="memory-card-header">
                     <span class="memory-tag {cls}">{e["category"].upper()}</span>
-                    <span class="memory-ts">{e["ts"]}</span>
+                    <span class="memory-ts">{e["ts"].replace("T", " ")[:16]}</span>
                 </div>
                 <div class="memory-text">{e["text"]}</div>
-                <div class="memory-id">{e["id"]}</div>
+                <div class="memory-id">{e["id"]}{f" · consolidated from {e['merged'] + 1} memories" if e["merged"] else ""}</div>
             </div>
             """, unsafe_allow_html=True)
 
+    if page_count > 1:
+        def _turn(step):
+            st.session_state["vault_page"] = min(max(st.session_state["vault_page"] + step, 0), page_count - 1)
+
+        col_prev, col_pg, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("← Newer", key="page_prev", on_click=_turn, args=(-1,),
+                      disabled=st.session_state["vault_page"] == 0)
+        with col_pg:
+            st.markdown(f'<div style="text-align:center;padding-top:0.7rem;font-family:var(--mono);font-size:0.72rem;color:var(--muted)">page {st.session_state["vault_page"] + 1} of {page_count}</div>', unsafe_allow_html=True)
+        with col_next:
+            st.button("Older →", key="page_next", on_click=_turn, args=(1,),
+                      disabled=st.session_state["vault_page"] >= page_count - 1)
+
     if vault_count > 0:
+        if st.button("🧹  Consolidate duplicates now", key="consolidate_btn"):
+            try:
+                consolidation.consolidate(coll)
+                st.rerun()  # the listing above was rendered before the merge
+            except Exception as ex:
+                st.markdown(f'<div class="err-box">Consolidation error: {ex}</div>', unsafe_allow_html=True)
+        last_run = consolidation.last_runs.get(coll.name)
+        if last_run:
+            st.caption(f"Last consolidation {time.strftime('%H:%M', time.localtime(last_run['finished']))} · "
+                       f"{last_run['merged']} of {last_run['processed']} new memories merged · {last_run['seconds']}s")
+
         if st.button("🗑  Clear all memories", key="clear_btn"):
             try:
-                coll = st.session_state["chroma_collection"]
-                all_ids = [e["id"] for e in st.session_state["memory_entries"]]
-                if all_ids:
-                    coll.delete(ids=all_ids)
-                st.session_state["memory_entries"] = []
+                vault.clear(coll)
+                st.session_state["vault_page"] = 0
                 st.rerun()
             except Exception as ex:
                 st.markdown(f'<div class="err-box">Clear error: {ex}</div>', unsafe_allow_html=True)
@@ -587,7 +679,7 @@ with tab1:
 with tab2:
     st.markdown('<div style="height:0.8rem"></div>', unsafe_allow_html=True)
 
-    entries_count = len(st.session_state["memory_entries"])
+    entries_count = entry_count
     if entries_count == 0:
         st.markdown("""
         <div class="info-box">ℹ  No memories stored yet. Go to the <strong>Store Memory</strong> tab and add at least 3 insights first.</div>
@@ -603,57 +695,62 @@ with tab2:
         col_n, col_cat = st.columns(2)
         with col_n:
             st.markdown('<span class="sec-label">Top-N Results</span>', unsafe_allow_html=True)
-            n_results = st.slider("n", 1, min(entries_count, 5), min(3, entries_count), label_visibility="collapsed")
+            n_results = st.slider("n", 1, max(2, min(entries_count, 20)), min(3, entries_count), label_visibility="collapsed")
         with col_cat:
             st.markdown('<span class="sec-label">Filter by Category</span>', unsafe_allow_html=True)
-            all_cats = list(set(e["category"] for e in st.session_state["memory_entries"]))
+            all_cats = categories
             filter_cats = st.multiselect("fcat", ["All"] + all_cats, default=["All"], label_visibility="collapsed")
 
+        DATE_RANGES = {"Any time": None, "Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last year": 365}
+        col_d, col_h = st.columns(2)
+        with col_d:
+            st.markdown('<span class="sec-label">Stored</span>', unsafe_allow_html=True)
+            date_range = st.selectbox("fdate", list(DATE_RANGES), label_visibility="collapsed")
+        with col_h:
+            st.markdown('<span class="sec-label">Recency Half-Life</span>', unsafe_allow_html=True)
+            half_life = st.select_slider(
+                "hl", sorted({0, 7, 30, 90, 180, 365, int(memory_search.RECENCY_HALF_LIFE_DAYS)}), value=int(memory_search.RECENCY_HALF_LIFE_DAYS),
+                format_func=lambda d: "off" if d == 0 else f"{d} days", label_visibility="collapsed"
+            )
+        dedupe = st.checkbox("Hide near-duplicate insights", value=True)
+
         if st.button("🔍  SEARCH MEMORY", key="query_btn"):
             if not query_text.strip():
                 st.markdown('<div class="err-box">⚠ Please enter a query.</div>', unsafe_allow_html=True)
             else:
                 coll = st.session_state["chroma_collection"]
                 try:
-                    where_filter = None
-                    if filter_cats and "All" not in filter_cats:
-                        if len(filter_cats) == 1:
-                            where_filter = {"category": filter_cats[0]}
-                        else:
-                            where_filter = {"category": {"$in": filter_cats}}
-
-                    results = coll.query(
-                        query_texts=[query_text.strip()],
-                        n_results=n_results,
-                        where=where_filter if where_filter else None,
-                        include=["documents", "distances", "metadatas"]
+                    days = DATE_RANGES[date_range]
+                    where_filter = memory_search.where_clause(
+                        categories=filter_cats if filter_cats and "All" not in filter_cats else None,
+                        since=datetime.now() - timedelta(days=days) if days else None,
+                    )
+                    hits = memory_search.get_service(coll).search(
+                        query_text.strip(), n=n_results, where=where_filter,
+                        half_life_days=half_life, dedupe=dedupe,
                     )
 
-                    docs      = results.get("documents", [[]])[0]
-                    distances = results.get("distances", [[]])[0]
-                    metas     = results.get("metadatas", [[]])[0]
-
-                    if not docs:
+                    if not hits:
                         st.markdown('<div class="info-box">No results found for that query.</div>', unsafe_allow_html=True)
                     else:
-                        st.markdown(f'<div style="margin:0.75rem 0 0.5rem;font-size:0.8rem;color:var(--muted)">Found <strong style="color:var(--text)">{len(docs)}</strong> results for: <em style="color:var(--accent2)">{query_text.strip()}</em></div>', unsafe_allow_html=True)
+                        st.markdown(f'<div style="margin:0.75rem 0 0.5rem;font-size:0.8rem;color:var(--muted)">Found <strong style="color:var(--text)">{len(hits)}</strong> results for: <em style="color:var(--accent2)">{query_text.strip()}</em></div>', unsafe_allow_html=True)
                         tag_cls_map = {"Market": "tag-market", "Technology": "tag-tech",
                                        "General": "tag-general", "Health": "tag-health", "Custom": "tag-custom"}
-                        for i, (doc, dist, meta) in enumerate(zip(docs, distances, metas)):
+                        for i, hit in enumerate(hits):
                             # cosine: distance 0 = identical. similarity = 1 - distance
-                            similarity = max(0, round((1 - dist) * 100, 1))
+                            similarity = max(0, round((1 - hit["distance"]) * 100, 1))
                             bar_width  = int(similarity)
-                            cat        = meta.get("category", "General")
+                            cat        = hit["category"]
                             cls        = tag_cls_map.get(cat, "tag-custom")
                             st.markdown(f"""
                             <div class="result-card">
                                 <div class="result-header">
                                     <div class="result-rank">#{i+1}</div>
                                     <span class="memory-tag {cls}">{cat.upper()}</span>
-                                    <span class="result-score">Similarity: {similarity}%</span>
+                                    <span class="result-score">Similarity: {similarity}% · {hit["ts"][:10]}</span>
                                 </div>
                                 <div class="score-bar" style="width:{bar_width}%"></div>
-                                <div class="result-text" style="margin-top:0.6rem">{doc}</div>
+                                <div class="result-text" style="margin-top:0.6rem">{hit["text"]}</div>
                             </div>
                             """, unsafe_allow_html=True)
 
@@ -667,7 +764,7 @@ with tab2:
 with tab3:
     st.markdown('<div style="height:0.8rem"></div>', unsafe_allow_html=True)
 
-    entries_count = len(st.session_state["memory_entries"])
+    entries_count = entry_count
     if entries_count < 3:
         st.markdown(f"""
         <div class="info-box">ℹ  You have <strong>{entries_count}</strong> memory entries.
@@ -729,8 +826,7 @@ with tab3:
             # ── Import guard ─────────────────────────────────────────────────────
             try:
                 from crewai import Agent, Task, Crew, LLM
-                from crewai.tools import BaseTool
-                from typing import ClassVar
+                from memory_tools import MemorySearchTool
             except ImportError as e:
                 st.markdown(f'<div class="err-box">Import error: {e}</div>', unsafe_allow_html=True)
                 st.stop()
@@ -774,51 +870,16 @@ with tab3:
             render_log(log)
 
             # ── Build MemorySearchTool ────────────────────────────────────────────
-            coll_ref = st.session_state["chroma_collection"]
-
-            class MemorySearchTool(BaseTool):
-                name: str = "Business Memory Search Tool"
-                description: str = (
-                    "Searches stored business insights using semantic similarity. "
-                    "Use this tool FIRST to recall relevant market data, trends, and insights "
-                    "before making any strategic recommendations. "
-                    "Input: a question or topic as a string. "
-                    "Output: top matching insights with similarity scores."
-                )
-                def _run(self, query: str) -> str:
-                    try:
-                        n = min(5, len(st.session_state["memory_entries"]))
-                        if n == 0:
-                            return "No memories stored yet."
-                        results = coll_ref.query(
-                            query_texts=[query.strip()],
-                            n_results=n,
-                            include=["documents", "distances", "metadatas"]
-                        )
-                        docs  = results.get("documents", [[]])[0]
-                        dists = results.get("distances",  [[]])[0]
-                        metas = results.get("metadatas",  [[]])[0]
-                        if not docs:
-                            return "No relevant memories found for that query."
-                        lines = [f"Retrieved {len(docs)} relevant insights from memory vault:\n"]
-                        for i, (doc, dist, meta) in enumerate(zip(docs, dists, metas)):
-                            sim = max(0, round((1 - dist) * 100, 1))
-                            cat = meta.get("category", "General")
-                            lines.append(
-                                f"[{i+1}] Category: {cat} | Similarity: {sim}%\n"
-                                f"    Insight: {doc}\n"
-                            )
-                        return "\n".join(lines)
-                    except Exception as e:
-                        return f"Memory search error: {e}"
-
-            memory_tool = MemorySearchTool()
+            coll_ref     = st.session_state["chroma_collection"]
+            search_stats = memory_search.get_service(coll_ref)
+            calls_before = (search_stats.calls, search_stats.result_hits)
+            memory_tool  = MemorySearchTool(search=search_stats)
 
             log.append((ts(), "MEM", "t-mem", "MemorySearchTool initialised"))
             render_log(log)
 
             # ── Build short-term memory context ──────────────────────────────────
-            recent_entries = st.session_state["memory_entries"][-3:]
+            recent_entries = vault.recent(coll_ref, 3)
             recent_context = " | ".join([e["text"][:80] + "..." for e in recent_entries])
 
             # ── Agent depth instructions ──────────────────────────────────────────
@@ -933,7 +994,9 @@ with tab3:
                 result = crew.kickoff()
                 elapsed = round(time.time() - t0, 1)
 
-                log.append((ts(), "MEM",  "t-mem",   "Memory recall complete"))
+                log.append((ts(), "MEM",  "t-mem",
+                            f"Memory recall complete · {search_stats.calls - calls_before[0]} searches, "
+                            f"{search_stats.result_hits - calls_before[1]} served from cache"))
                 log.append((ts(), "OK",   "t-ok",    f"Strategy generated in {elapsed}s"))
                 render_log(log)
                 status_ph.empty()
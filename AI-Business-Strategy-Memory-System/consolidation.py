@@ -0,0 +1,221 @@
+# ============================================================
+# consolidation.py — Merge near-duplicate memories
+# Incremental: only memories not yet consolidated (no
+# `consolidated` flag — new adds, imports, anything from before
+# this job existed) are read. Each batch is first matched
+# against already-consolidated memories in the vector store,
+# then clustered among itself (single-linkage agglomerative
+# clustering at a cosine threshold). Every cluster collapses
+# into one canonical memory — the existing canonical it joined,
+# else its medoid — whose `merged_ids` / `merged_from` keep the
+# id, text, category and timestamp of everything folded into
+# it; the other members are then deleted.
+#
+#   python consolidation.py --workspace acme
+# ============================================================
+
+import os
+import json
+import time
+import logging
+import threading
+
+import numpy as np
+
+import memory_vault as vault
+
+
+CONSOLIDATE_SIMILARITY = float(os.environ.get("MEMORY_CONSOLIDATE_SIMILARITY", "0.92"))
+CONSOLIDATE_BATCH = 1000    # new memories clustered together (similarity matrix is batch²)
+CONSOLIDATE_INTERVAL = float(os.environ.get("MEMORY_CONSOLIDATE_INTERVAL", "0"))  # seconds; 0 = off (opt-in)
+
+NEW_MEMORIES = {"consolidated": {"$ne": 1}}
+CONSOLIDATED = {"consolidated": 1}
+
+logger = logging.getLogger(__name__)
+
+last_runs = {}              # collection name → stats of the latest run in this process
+_run_locks = {}
+_locks_guard = threading.Lock()
+
+
+# ── Clustering ───────────────────────────────────────────────────────────────
+
+def _unit(embeddings):
+    e = np.asarray(embeddings, dtype=np.float32)
+    return e / np.maximum(np.linalg.norm(e, axis=1, keepdims=True), 1e-12)
+
+
+def clusters(unit, threshold=CONSOLIDATE_SIMILARITY):
+    """
+    Single-linkage agglomerative clustering at `threshold` cosine
+    similarity: the connected components of the ≥ threshold graph.
+    Returns a list of index arrays.
+    """
+    parent = np.arange(len(unit))
+
+    def _find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in np.argwhere(np.triu(unit @ unit.T >= threshold, k=1)):
+        ri, rj = _find(i), _find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    roots = np.array([_find(i) for i in range(len(unit))])
+    return [np.flatnonzero(roots == r) for r in np.unique(roots)]
+
+
+def _merged_ids(meta):
+    return [i for i in (meta or {}).get("merged_ids", "").split(",") if i]
+
+
+def merged_from(meta):
+    """
+    The memories folded into a canonical, oldest merge first:
+    [{"id", "text", "category", "ts"}]. Chroma metadata is scalar-only,
+    so they are stored as a JSON string.
+    """
+    try:
+        return json.loads((meta or {}).get("merged_from") or "[]")
+    except json.JSONDecodeError:
+        return []
+
+
+def provenance(coll, doc_id):
+    """merged_from() of one stored memory; [] if it is not a canonical or no longer exists."""
+    metas = coll.get(ids=[doc_id], include=["metadatas"])["metadatas"]
+    return merged_from(metas[0]) if metas else []
+
+
+# ── Job ──────────────────────────────────────────────────────────────────────
+
+def _lock_for(coll):
+    with _locks_guard:
+        return _run_locks.setdefault(coll.name, threading.Lock())
+
+
+def consolidate(coll, threshold=CONSOLIDATE_SIMILARITY, batch=CONSOLIDATE_BATCH):
+    """
+    One incremental pass over coll. Canonical memories get
+    consolidated=1, merged_ids (comma-separated ids of every memory
+    folded in, transitively), merged_from (those memories' text,
+    category and ts — see merged_from()), merged_count, and the newest member's
+    ts/created so recency ranking sees when the insight was last
+    restated. Returns {"processed", "merged", "kept", "seconds"}.
+    """
+    stats = {"processed": 0, "merged": 0, "kept": 0}
+    t0 = time.perf_counter()
+    with _lock_for(coll):
+        while True:
+            got = coll.get(where=NEW_MEMORIES, include=["documents", "metadatas", "embeddings"],
+                           limit=batch)
+            if not got["ids"]:
+                break
+            ids, docs, metas = got["ids"], got["documents"], [m or {} for m in got["metadatas"]]
+            unit = _unit(got["embeddings"])
+
+            # nearest already-consolidated memory for every new one
+            near = coll.query(query_embeddings=unit, n_results=1, where=CONSOLIDATED,
+                              include=["metadatas", "distances"])
+            matched = [
+                (r[0], 1.0 - d[0], m[0]) if r and 1.0 - d[0] >= threshold else None
+                for r, d, m in zip(near["ids"], near["distances"], near["metadatas"])
+            ]
+
+            updates, deletes = {}, []
+            for members in clusters(unit, threshold):
+                joins = [matched[i] for i in members if matched[i]]
+                if joins:
+                    canon_id, _, canon_meta = max(joins, key=lambda j: j[1])
+                    canon_meta = dict(updates.get(canon_id, canon_meta))
+                    absorbed = list(members)
+                else:
+                    sims = unit[members] @ unit[members].T
+                    medoid = members[int(np.argmax(sims.sum(axis=1)))]
+                    canon_id, canon_meta = ids[medoid], dict(metas[medoid])
+                    absorbed = [i for i in members if i != medoid]
+
+                provenance, texts = _merged_ids(canon_meta), merged_from(canon_meta)
+                newest = canon_meta
+                for i in absorbed:
+                    provenance += [ids[i]] + _merged_ids(metas[i])
+                    texts += merged_from(metas[i]) + [{
+                        "id": ids[i], "text": docs[i],
+                        "category": metas[i].get("category", "General"), "ts": metas[i].get("ts", ""),
+                    }]
+                    if metas[i].get("created", 0) > newest.get("created", 0):
+                        newest = metas[i]
+                canon_meta.update({
+                    "consolidated": 1,
+                    "merged_ids": ",".join(dict.fromkeys(provenance)),
+                    "merged_from": json.dumps(list({t["id"]: t for t in texts}.values()), ensure_ascii=False),
+                    "merged_count": len(dict.fromkeys(provenance)),
+                    "ts": newest.get("ts", canon_meta.get("ts", "")),
+                    "created": newest.get("created", canon_meta.get("created", 0)),
+                })
+                if not canon_meta["merged_ids"]:
+                    canon_meta.pop("merged_ids")
+                    canon_meta.pop("merged_from")
+                updates[canon_id] = canon_meta
+                deletes += [ids[i] for i in absorbed]
+                stats["merged"] += len(absorbed)
+
+            # canonicals first (they now hold the members' text): if the delete
+            # never happens, the members are still unconsolidated and fold into
+            # the same canonical next run
+            coll.update(ids=list(updates), metadatas=list(updates.values()))
+            if deletes:
+                coll.delete(ids=deletes)
+            vault.mark_written(coll)
+            stats["processed"] += len(ids)
+            stats["kept"] = stats["processed"] - stats["merged"]
+
+    stats["seconds"] = round(time.perf_counter() - t0, 2)
+    if stats["processed"]:
+        last_runs[coll.name] = {**stats, "finished": time.time()}
+    return stats
+
+
+# ── Background runner ────────────────────────────────────────────────────────
+
+_runners = {}
+
+
+def start_background(coll, interval=CONSOLIDATE_INTERVAL):
+    """
+    Daemon thread running consolidate(coll) every `interval` seconds (once
+    per collection). Off unless MEMORY_CONSOLIDATE_INTERVAL (or interval) is set.
+    """
+    if not interval or coll.name in _runners:
+        return _runners.get(coll.name)
+
+    def _loop():
+        while True:
+            time.sleep(interval)
+            try:
+                consolidate(coll)
+            except Exception:  # keep the loop alive; the next pass retries
+                logger.exception("consolidation pass for %s failed", coll.name)
+
+    thread = threading.Thread(target=_loop, name=f"consolidate-{coll.name}", daemon=True)
+    _runners[coll.name] = thread
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge near-duplicate memories in a workspace")
+    parser.add_argument("--workspace", default=vault.DEFAULT_WORKSPACE)
+    parser.add_argument("--similarity", type=float, default=CONSOLIDATE_SIMILARITY)
+    args = parser.parse_args()
+
+    coll = vault.open_vault(vault.get_client(), args.workspace)
+    before = coll.count()
+    result = consolidate(coll, threshold=args.similarity)
+    print(f"✅ {result['processed']} new memories → {result['merged']} merged · "
+          f"{before} → {coll.count()} in vault · {result['seconds']}s")
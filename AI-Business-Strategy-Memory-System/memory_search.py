@@ -0,0 +1,183 @@
+# ============================================================
+# memory_search.py — Cached, batched, filtered search over a vault
+# One MemorySearch per collection for the whole process. Query
+# embeddings are cached by normalised query; top-k results are
+# cached by (normalised query, n, filter, ranking) and dropped
+# whenever the collection version changes (any write, here or —
+# via the count — on another replica). Several queries are
+# answered by a single embedding call and a single
+# collection.query(). Category / date filters run inside the
+# vector store; an oversampled candidate set is then re-scored
+# with a recency half-life and near-duplicates are dropped.
+# ============================================================
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+import memory_vault as vault
+
+
+QUERY_CACHE_SIZE = 2048     # normalised query → embedding
+RESULT_CACHE_SIZE = 512     # (query, n, where, ranking) → hits, for the current collection version
+
+# Ranking: score = cosine similarity × 0.5 ** (age_days / half_life); 0 disables decay
+RECENCY_HALF_LIFE_DAYS = float(os.environ.get("MEMORY_HALF_LIFE_DAYS", "180"))
+OVERSAMPLE = 4              # candidates fetched per requested hit, for re-scoring and de-duplication
+MAX_CANDIDATES = 100
+DUPLICATE_SIMILARITY = 0.95  # hits at least this similar to a better-ranked hit are dropped
+
+
+def normalize_query(query):
+    # the default MiniLM model is uncased, so casefolding does not change the embedding
+    return " ".join(query.split()).casefold()
+
+
+def where_clause(categories=None, since=None, until=None):
+    """Chroma `where` for category membership and a [since, until) window on the stored `created` time."""
+    clauses = []
+    if categories:
+        categories = list(categories)
+        clauses.append({"category": categories[0]} if len(categories) == 1 else {"category": {"$in": categories}})
+    if since:
+        clauses.append({"created": {"$gte": since.timestamp()}})
+    if until:
+        clauses.append({"created": {"$lt": until.timestamp()}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _created(meta):
+    if "created" in meta:
+        return float(meta["created"])
+    try:
+        return datetime.fromisoformat(meta.get("ts", "")).timestamp()
+    except ValueError:
+        return None
+
+
+def rank(hits, created, embeddings, n, half_life_days, now, dedupe=True):
+    """
+    Top n of hits by recency-decayed similarity, skipping any hit whose
+    embedding is DUPLICATE_SIMILARITY-close to one already kept.
+    created holds each hit's epoch seconds (None = undated, no decay).
+    """
+    if not hits:
+        return []
+    sims = np.array([1.0 - h["distance"] for h in hits])
+    ages = np.array([(now - c) / 86400 if c is not None else 0.0 for c in created])
+    decay = 0.5 ** (np.clip(ages, 0, None) / half_life_days) if half_life_days else np.ones(len(hits))
+    scores = sims * decay
+
+    unit = np.asarray(embeddings, dtype=np.float32)
+    unit = unit / np.maximum(np.linalg.norm(unit, axis=1, keepdims=True), 1e-12)
+    kept = []
+    for i in np.argsort(-scores, kind="stable"):
+        if dedupe and kept and float(np.max(unit[kept] @ unit[i])) >= DUPLICATE_SIMILARITY:
+            continue
+        kept.append(i)
+        if len(kept) == n:
+            break
+    return [{**hits[i], "similarity": float(sims[i]), "score": float(scores[i])} for i in kept]
+
+
+class MemorySearch:
+    """
+    search(query, ...) / search_many(queries, ...) return, per query, hits
+    [{"id", "text", "category", "ts", "distance", "similarity", "score"}]
+    best score first. Repeated and near-identical (case / whitespace)
+    queries are served from memory until the collection is written to.
+    """
+
+    def __init__(self, coll, embed=None):
+        self.coll = coll
+        self.embed = embed or vault.get_embedding_function()
+        self._vectors = OrderedDict()
+        self._results = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.result_hits = 0
+        self.embedding_hits = 0
+
+    def _lookup(self, cache, key, size, value=None):
+        if value is not None:
+            cache[key] = value
+        elif key not in cache:
+            return None
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
+        return cache[key]
+
+    def search(self, query, n=5, where=None, half_life_days=RECENCY_HALF_LIFE_DAYS, dedupe=True):
+        return self.search_many([query], n, where, half_life_days, dedupe)[0]
+
+    def search_many(self, queries, n=5, where=None, half_life_days=RECENCY_HALF_LIFE_DAYS, dedupe=True):
+        version = vault.version(self.coll)
+        total = version[0]
+        now = time.time()
+        # the hour keeps decayed rankings from going stale in a vault nobody writes to
+        ranking = (json.dumps(where, sort_keys=True) if where else "", half_life_days, dedupe, int(now // 3600))
+        keys = [(normalize_query(q), n) + ranking for q in queries]
+
+        with self._lock:
+            self.calls += len(queries)
+            if version != self._version:
+                self._results.clear()
+                self._version = version
+            found = {k: self._lookup(self._results, k, RESULT_CACHE_SIZE) for k in set(keys)}
+            missing = [k for k, hits in found.items() if hits is None]
+            self.result_hits += len(keys) - sum(keys.count(k) for k in missing)
+            vectors = {k[0]: self._lookup(self._vectors, k[0], QUERY_CACHE_SIZE) for k in missing}
+            to_embed = [q for q, vec in vectors.items() if vec is None]
+            self.embedding_hits += len(vectors) - len(to_embed)
+
+        if missing and total:
+            if to_embed:
+                vectors.update(zip(to_embed, self.embed(to_embed)))
+            res = self.coll.query(
+                query_embeddings=[vectors[k[0]] for k in missing],
+                n_results=min(max(n * OVERSAMPLE, n), MAX_CANDIDATES, total),
+                where=where or None,
+                include=["documents", "distances", "metadatas", "embeddings"],
+            )
+            for i, k in enumerate(missing):
+                hits = [
+                    {**entry, "distance": dist}
+                    for entry, dist in zip(vault.to_entries({
+                        "ids": res["ids"][i], "documents": res["documents"][i], "metadatas": res["metadatas"][i],
+                    }), res["distances"][i])
+                ]
+                created = [_created(meta or {}) for meta in res["metadatas"][i]]
+                found[k] = rank(hits, created, res["embeddings"][i], n, half_life_days, now, dedupe)
+        else:
+            found.update({k: [] for k in missing})
+
+        with self._lock:
+            for q in to_embed:
+                if vectors.get(q) is not None:
+                    self._lookup(self._vectors, q, QUERY_CACHE_SIZE, vectors[q])
+            if vault.version(self.coll) == version:  # don't cache results that raced a write
+                for k in missing:
+                    self._lookup(self._results, k, RESULT_CACHE_SIZE, found[k])
+        return [found[k] for k in keys]
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_service(coll):
+    """The process-wide MemorySearch for coll (one per collection name)."""
+    with _services_lock:
+        svc = _services.get(coll.name)
+        if svc is None or svc.coll.id != coll.id:
+            svc = _services[coll.name] = MemorySearch(coll)
+        return svc
@@ -0,0 +1,76 @@
+# ============================================================
+# memory_tools.py — CrewAI tool over the memory vault
+# Defined once at import; each instance holds the process-wide
+# MemorySearch for its workspace (memory_search.get_service),
+# so repeated agent queries hit the cache instead of
+# re-embedding, whoever built the tool.
+# ============================================================
+
+import re
+from datetime import datetime, timedelta
+
+from crewai.tools import BaseTool
+from pydantic import ConfigDict
+
+import memory_search
+
+
+TOOL_TOP_K = 5
+
+_QUERY_SPLIT = re.compile(r"\s*(?:\n|;)\s*")
+
+
+def format_hits(hits):
+    lines = []
+    for i, hit in enumerate(hits):
+        sim = max(0, round((1 - hit["distance"]) * 100, 1))
+        stored = f" | Stored: {hit['ts'][:10]}" if hit["ts"] else ""
+        lines.append(
+            f"[{i+1}] Category: {hit['category']} | Similarity: {sim}%{stored}\n"
+            f"    Insight: {hit['text']}\n"
+        )
+    return "\n".join(lines)
+
+
+class MemorySearchTool(BaseTool):
+    """
+    Semantic search over one workspace's vault. Several queries in one
+    call (one per line, or separated by ';') go out as a single batched
+    vector-store query.
+    """
+    name: str = "Business Memory Search Tool"
+    description: str = (
+        "Searches stored business insights using semantic similarity. "
+        "Use this tool FIRST to recall relevant market data, trends, and insights "
+        "before making any strategic recommendations. "
+        "Input: a question or topic as a string; to run several searches at once, "
+        "put each on its own line or separate them with ';'. Optional: category "
+        "(Market, Technology, Health, General or Custom) and since_days to only "
+        "search insights stored in the last N days. "
+        "Output: top matching insights with similarity scores, recent insights ranked higher."
+    )
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    search: memory_search.MemorySearch      # memory_search.get_service(coll)
+
+    def _run(self, query: str, category: str = "", since_days: int = 0) -> str:
+        try:
+            queries = [q for q in _QUERY_SPLIT.split(query.strip()) if q]
+            if not queries:
+                return "Please provide a search query."
+            where = memory_search.where_clause(
+                categories=[category.strip().title()] if category.strip() else None,
+                since=datetime.now() - timedelta(days=since_days) if since_days else None,
+            )
+            results = self.search.search_many(queries, n=TOOL_TOP_K, where=where)
+            if len(queries) == 1:
+                hits = results[0]
+                if not hits:
+                    return "No relevant memories found for that query."
+                return f"Retrieved {len(hits)} relevant insights from memory vault:\n\n" + format_hits(hits)
+            sections = []
+            for q, hits in zip(queries, results):
+                body = format_hits(hits) if hits else "No relevant memories found for that query.\n"
+                sections.append(f"Query: {q}\n{body}")
+            return "\n".join(sections)
+        except Exception as e:
+            return f"Memory search error: {e}"
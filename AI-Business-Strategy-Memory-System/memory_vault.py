@@ -0,0 +1,263 @@
+# ============================================================
+# memory_vault.py — Persistent, per-workspace memory vault
+# One ChromaDB collection per workspace, stored on disk
+# (PersistentClient) or on a shared Chroma server (HttpClient
+# when CHROMA_HOST is set), so memories survive restarts and
+# every replica sees the same vault. Embeddings go through a
+# process-wide cache backed by SQLite and shared by all
+# workspaces. No Streamlit imports here — app.py caches the
+# client and collections.
+# ============================================================
+
+import os
+import re
+import uuid
+import sqlite3
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+
+
+VAULT_DIR = os.environ.get(
+    "MEMORY_VAULT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".memory_vault"),
+)
+CHROMA_HOST = os.environ.get("CHROMA_HOST", "")
+CHROMA_PORT = int(os.environ.get("CHROMA_PORT", "8000"))
+DEFAULT_WORKSPACE = os.environ.get("MEMORY_WORKSPACE", "default")
+
+COLLECTION_PREFIX = "vault_"
+CATEGORIES = ["Market", "Technology", "Health", "General", "Custom"]
+PAGE_SIZE = 10
+SCAN_BATCH = 1000           # ids / metadatas fetched per get() when scanning a collection
+
+EMBED_CACHE_PATH = os.path.join(VAULT_DIR, "embedding_cache.sqlite")
+EMBED_CACHE_HOT = 20_000    # vectors also kept in process memory (LRU)
+
+
+# ── Shared embedding cache ───────────────────────────────────────────────────
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """
+    Chroma embedding function that only embeds texts it has not seen.
+
+    Vectors are keyed by sha256(model, text) and kept in an in-process LRU
+    in front of a SQLite table, so re-adding an insight, re-running a
+    query or seeding a second workspace with the same presets costs a
+    lookup instead of a model call. `inner` defaults to Chroma's own
+    all-MiniLM-L6-v2 ONNX model, loaded on first miss.
+    """
+
+    def __init__(self, inner=None, path=EMBED_CACHE_PATH, hot_size=EMBED_CACHE_HOT):
+        self._inner = inner
+        self._model = getattr(inner, "name", lambda: "default")() if inner is not None else "default"
+        self._hot = OrderedDict()
+        self._hot_size = hot_size
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB)")
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def name():
+        return "memory_vault_cached"
+
+    def get_config(self):
+        return {"model": self._model}
+
+    @staticmethod
+    def build_from_config(config):
+        return CachedEmbeddingFunction()
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self._model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _embed(self, texts):
+        if self._inner is None:
+            from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+            self._inner = DefaultEmbeddingFunction()
+        return [np.asarray(v, dtype=np.float32) for v in self._inner(list(texts))]
+
+    def __call__(self, input):
+        keys = [self._key(t) for t in input]
+        found = {}
+        with self._lock:
+            for k in keys:
+                if k in self._hot:
+                    self._hot.move_to_end(k)
+                    found[k] = self._hot[k]
+            cold = list({k for k in keys if k not in found})
+            for start in range(0, len(cold), 500):  # SQLite's bound-parameter limit
+                chunk = cold[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for k, blob in rows:
+                    found[k] = np.frombuffer(blob, dtype=np.float32)
+
+        missing = OrderedDict((k, t) for k, t in zip(keys, input) if k not in found)
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            vectors = self._embed(missing.values())
+            found.update(zip(missing.keys(), vectors))
+
+        with self._lock:
+            if missing:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                    [(k, found[k].tobytes()) for k in missing],
+                )
+                self._db.commit()
+            for k in keys:
+                self._hot[k] = found[k]
+                self._hot.move_to_end(k)
+            while len(self._hot) > self._hot_size:
+                self._hot.popitem(last=False)
+        return [found[k] for k in keys]
+
+
+_embedding_function = None
+_embedding_lock = threading.Lock()
+
+
+def get_embedding_function():
+    """The process-wide CachedEmbeddingFunction shared by every workspace."""
+    global _embedding_function
+    with _embedding_lock:
+        if _embedding_function is None:
+            _embedding_function = CachedEmbeddingFunction()
+        return _embedding_function
+
+
+# ── Backend and workspaces ───────────────────────────────────────────────────
+
+def get_client():
+    """HttpClient for a shared Chroma server when CHROMA_HOST is set, else an on-disk PersistentClient."""
+    import chromadb
+    if CHROMA_HOST:
+        return chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
+    os.makedirs(VAULT_DIR, exist_ok=True)
+    return chromadb.PersistentClient(path=VAULT_DIR)
+
+
+def workspace_slug(workspace):
+    """Lowercase [a-z0-9_-] form of a workspace name, safe inside a Chroma collection name."""
+    slug = re.sub(r"[^a-z0-9_-]+", "-", workspace.strip().lower()).strip("-_")
+    return slug[:50] or DEFAULT_WORKSPACE
+
+
+def collection_name(workspace):
+    return COLLECTION_PREFIX + workspace_slug(workspace)
+
+
+def open_vault(client, workspace, embedding_function=None):
+    """The workspace's collection (cosine space), created on first use."""
+    slug = workspace_slug(workspace)
+    return client.get_or_create_collection(
+        name=collection_name(slug),
+        metadata={"hnsw:space": "cosine", "workspace": slug},
+        embedding_function=embedding_function or get_embedding_function(),
+    )
+
+
+def list_workspaces(client):
+    names = [getattr(c, "name", c) for c in client.list_collections()]
+    return sorted(n[len(COLLECTION_PREFIX):] for n in names if n.startswith(COLLECTION_PREFIX))
+
+
+# ── Reads ────────────────────────────────────────────────────────────────────
+
+def to_entries(result):
+    return [
+        {
+            "id": doc_id,
+            "text": doc,
+            "category": (meta or {}).get("category", "General"),
+            "ts": (meta or {}).get("ts", ""),
+            "merged": (meta or {}).get("merged_count", 0),
+        }
+        for doc_id, doc, meta in zip(result["ids"], result["documents"], result["metadatas"])
+    ]
+
+
+def category_counts(coll):
+    """Counter of memories per category, scanned from stored metadata in SCAN_BATCH pages."""
+    counts, offset = Counter(), 0
+    while True:
+        metas = coll.get(include=["metadatas"], limit=SCAN_BATCH, offset=offset)["metadatas"]
+        counts.update((m or {}).get("category", "General") for m in metas)
+        if len(metas) < SCAN_BATCH:
+            return counts
+        offset += SCAN_BATCH
+
+
+def page(coll, number, size=PAGE_SIZE, total=None):
+    """
+    Page `number` (0 = newest) of the vault, newest first.
+    Chroma returns get() results in insertion order, so the page is read
+    from the tail of the collection and reversed.
+    """
+    total = coll.count() if total is None else total
+    end = total - number * size
+    if end <= 0:
+        return []
+    start = max(0, end - size)
+    result = coll.get(include=["documents", "metadatas"], limit=end - start, offset=start)
+    return to_entries(result)[::-1]
+
+
+def recent(coll, n):
+    """The n most recently stored memories, newest first."""
+    return page(coll, 0, size=n)
+
+
+# ── Writes ───────────────────────────────────────────────────────────────────
+# Every write goes through mark_written so caches keyed on version() (see
+# memory_search.py) drop stale results; the count catches writes made by
+# other replicas.
+
+_writes = Counter()
+
+
+def mark_written(coll):
+    _writes[coll.name] += 1
+
+
+def version(coll):
+    return coll.count(), _writes[coll.name]
+
+
+def content_hash(text):
+    """sha256 of the whitespace- and case-normalised text; equal hashes are duplicate insights."""
+    return hashlib.sha256(" ".join(text.split()).casefold().encode("utf-8")).hexdigest()
+
+
+def memory_metadata(category, ts, text, **extra):
+    return {"category": category, "ts": ts.isoformat(timespec="seconds"), "created": ts.timestamp(),
+            "hash": content_hash(text), **extra}
+
+
+def add_memory(coll, text, category, now=None):
+    """Stores one insight; returns its id."""
+    doc_id = f"mem_{uuid.uuid4().hex[:8]}"
+    coll.add(documents=[text], metadatas=[memory_metadata(category, now or datetime.now(), text)], ids=[doc_id])
+    mark_written(coll)
+    return doc_id
+
+
+def clear(coll):
+    """Deletes every memory in the collection, SCAN_BATCH ids at a time."""
+    while True:
+        ids = coll.get(include=[], limit=SCAN_BATCH)["ids"]
+        if not ids:
+            return
+        coll.delete(ids=ids)
+        mark_written(coll)
@@ -0,0 +1,318 @@
+# ============================================================
+# vault_io.py — Bulk import / export for the memory vault
+# Reads insights from CSV, JSONL, Markdown or a Parquet backup,
+# drops duplicates by content hash (within the file and against
+# the workspace) before anything is embedded, embeds the rest in
+# large batches on a worker pool and writes each batch with one
+# upsert. Export streams the collection, embeddings included, to
+# Parquet one page at a time.
+#
+#   python vault_io.py import corpus.csv --workspace acme
+#   python vault_io.py export backup.parquet --workspace acme
+# ============================================================
+
+import io
+import os
+import re
+import csv
+import json
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import memory_vault as vault
+
+
+EMBED_BATCH = 256           # texts per embedding call (and per upsert)
+EMBED_WORKERS = int(os.environ.get("MEMORY_EMBED_WORKERS", "4"))
+IMPORT_CHUNK = 5000         # records deduplicated and embedded together
+HASH_LOOKUP_BATCH = 1000    # hashes per `$in` lookup against the store
+
+FORMATS = ("csv", "jsonl", "md", "parquet")
+TEXT_FIELDS = ("text", "insight", "document", "content")
+TS_FIELDS = ("ts", "timestamp", "date")
+
+_MD_ITEM = re.compile(r"^(?:[-*+]|\d+[.)])\s+")
+
+
+# ── Readers ──────────────────────────────────────────────────────────────────
+# Every reader yields {"text", "category", "ts"} dicts; Parquet backups also
+# carry "id", "metadata" and "embedding". Missing fields fall back to defaults
+# in import_records.
+
+def _field(row, names):
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _record(row):
+    text = _field(row, TEXT_FIELDS)
+    if not isinstance(text, str) or not text.strip():
+        return None
+    return {"text": text.strip(), "category": _field(row, ("category",)), "ts": _field(row, TS_FIELDS)}
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        rec = _record({k.strip().lower(): v for k, v in row.items() if k})
+        if rec:
+            yield rec
+
+
+def read_jsonl(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        row = json.loads(line)
+        rec = _record({"text": row} if isinstance(row, str) else {k.lower(): v for k, v in row.items()})
+        if rec:
+            yield rec
+
+
+def read_markdown(stream):
+    """
+    One memory per list item or paragraph. A heading naming a category
+    (e.g. `## Market`) applies to the items below it, up to the next
+    heading; items under any other heading have no category.
+    """
+    category, lines = None, []
+
+    def _flush():
+        text = " ".join(lines).strip()
+        lines.clear()
+        return {"text": text, "category": category, "ts": None} if text else None
+
+    for raw in stream:
+        line = raw.strip()
+        if line.startswith("#"):
+            rec = _flush()
+            if rec:
+                yield rec
+            heading = line.lstrip("#").strip()
+            # any other heading ends the section: its items get the default category
+            category = next((c for c in vault.CATEGORIES if c.lower() == heading.lower()), None)
+        elif not line:
+            rec = _flush()
+            if rec:
+                yield rec
+        else:
+            item = _MD_ITEM.match(line)
+            if item:
+                rec = _flush()
+                if rec:
+                    yield rec
+                line = line[item.end():]
+            lines.append(line)
+    rec = _flush()
+    if rec:
+        yield rec
+
+
+def read_parquet(source):
+    import pyarrow.parquet as pq
+
+    with pq.ParquetFile(source) as parquet:     # closes only a file it opened itself
+        for batch in parquet.iter_batches(batch_size=vault.SCAN_BATCH):
+            cols = batch.to_pydict()
+            emb = batch.column("embedding")
+            vectors = emb.flatten().to_numpy(zero_copy_only=False).astype(np.float32).reshape(len(batch), -1) \
+                if len(batch) else []
+            for i, (doc_id, text, meta) in enumerate(zip(cols["id"], cols["text"], cols["metadata"])):
+                meta = json.loads(meta) if meta else {}
+                yield {"id": doc_id, "text": text, "category": meta.get("category"), "ts": meta.get("ts"),
+                       "metadata": meta, "embedding": vectors[i]}
+
+
+def read_records(source, name):
+    """Records from a path or binary file object, dispatched on name's extension."""
+    ext = os.path.splitext(name)[1].lower().lstrip(".")
+    if ext == "parquet":
+        return read_parquet(source)
+    readers = {"csv": read_csv, "jsonl": read_jsonl, "ndjson": read_jsonl, "md": read_markdown,
+               "markdown": read_markdown, "txt": read_markdown}
+    if ext not in readers:
+        raise ValueError(f"Unsupported file type '.{ext}' — use one of {', '.join(FORMATS)}")
+    return _read_text(source, readers[ext])
+
+
+def _read_text(source, reader):
+    # a path is opened (and closed) here; a caller's file object stays the caller's to close
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8", newline="") as stream:
+            yield from reader(stream)
+    else:
+        yield from reader(io.TextIOWrapper(source, encoding="utf-8", newline=""))
+
+
+# ── Import ───────────────────────────────────────────────────────────────────
+
+def _parse_ts(value, default):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value)) if value else default
+    except ValueError:
+        return default
+
+
+def _stored_hashes(coll, hashes):
+    found = set()
+    for start in range(0, len(hashes), HASH_LOOKUP_BATCH):
+        chunk = hashes[start:start + HASH_LOOKUP_BATCH]
+        metas = coll.get(where={"hash": {"$in": chunk}}, include=["metadatas"])["metadatas"]
+        found.update(m.get("hash") for m in metas if m)
+    return found
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_records(coll, records, default_category="General", source="", embed=None,
+                   workers=EMBED_WORKERS, batch_size=EMBED_BATCH, progress=None):
+    """
+    Bulk-loads records into coll.
+
+    Records whose content hash was already seen in this import or is
+    already stored are dropped before embedding. The rest are embedded
+    batch_size texts per call on `workers` threads (through the shared
+    embedding cache) and each batch is written with one upsert. Ids are
+    derived from the hash, so re-running an import is a no-op; Parquet
+    backups keep their ids and stored embeddings. progress(done, total)
+    is called after every write, total counting records read so far.
+
+    Returns {"read", "duplicates", "existing", "written", "seconds"}.
+    """
+    embed = embed or vault.get_embedding_function()
+    stats = {"read": 0, "duplicates": 0, "existing": 0, "written": 0}
+    seen, t0, now = set(), time.perf_counter(), datetime.now()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk in _chunks(records, IMPORT_CHUNK):
+            stats["read"] += len(chunk)
+            fresh = {}
+            for rec in chunk:
+                h = vault.content_hash(rec["text"])
+                if h in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(h)
+                fresh[h] = rec
+            stored = _stored_hashes(coll, list(fresh))
+            stats["existing"] += len(stored)
+            todo = [(h, rec) for h, rec in fresh.items() if h not in stored]
+
+            batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+
+            def _embed_batch(batch):
+                need = [rec["text"] for _, rec in batch if rec.get("embedding") is None]
+                vectors = iter(embed(need) if need else [])
+                return [rec["embedding"] if rec.get("embedding") is not None else next(vectors) for _, rec in batch]
+
+            # map() yields in submission order while later batches are still embedding
+            for batch, vectors in zip(batches, pool.map(_embed_batch, batches)):
+                ids, metadatas = [], []
+                for h, rec in batch:
+                    meta = dict(rec.get("metadata") or {})
+                    meta.update(vault.memory_metadata(
+                        rec.get("category") or meta.get("category") or default_category,
+                        _parse_ts(rec.get("ts"), now), rec["text"],
+                    ))
+                    if source:
+                        meta.setdefault("source", source)
+                    ids.append(rec.get("id") or f"mem_{h[:16]}")
+                    metadatas.append(meta)
+                coll.upsert(
+                    ids=ids,
+                    documents=[rec["text"] for _, rec in batch],
+                    metadatas=metadatas,
+                    embeddings=[np.asarray(v, dtype=np.float32) for v in vectors],
+                )
+                vault.mark_written(coll)
+                stats["written"] += len(batch)
+                if progress:
+                    progress(stats["written"] + stats["duplicates"] + stats["existing"], stats["read"])
+            if progress and not batches:
+                progress(stats["duplicates"] + stats["existing"], stats["read"])
+
+    stats["seconds"] = round(time.perf_counter() - t0, 2)
+    return stats
+
+
+def import_file(coll, source, name, **kwargs):
+    return import_records(coll, read_records(source, name), source=os.path.basename(name), **kwargs)
+
+
+# ── Export ───────────────────────────────────────────────────────────────────
+
+def export_parquet(coll, dest, batch=vault.SCAN_BATCH):
+    """
+    Streams every memory (id, text, metadata as JSON, embedding) to a
+    Parquet file or binary file object, one row group per `batch`
+    memories, so memory use stays flat. Returns the row count.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("text", pa.string()),
+        ("metadata", pa.string()),
+        ("embedding", pa.list_(pa.float32())),
+    ])
+    rows, offset = 0, 0
+    with pq.ParquetWriter(dest, schema, compression="zstd") as writer:
+        while True:
+            got = coll.get(include=["documents", "metadatas", "embeddings"], limit=batch, offset=offset)
+            n = len(got["ids"])
+            if not n:
+                break
+            emb = np.asarray(got["embeddings"], dtype=np.float32)
+            offsets = pa.array(np.arange(0, emb.size + 1, emb.shape[1], dtype=np.int32))
+            writer.write_table(pa.table({
+                "id": got["ids"],
+                "text": got["documents"],
+                "metadata": [json.dumps(m or {}) for m in got["metadatas"]],
+                "embedding": pa.ListArray.from_arrays(offsets, pa.array(emb.ravel())),
+            }, schema=schema))
+            rows += n
+            offset += n
+            if n < batch:
+                break
+    return rows
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk import / export for the memory vault")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("path", help=f"file to import ({', '.join(FORMATS)}) or Parquet file to write")
+    parser.add_argument("--workspace", default=vault.DEFAULT_WORKSPACE)
+    parser.add_argument("--category", default="General", help="category for records that have none")
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS)
+    args = parser.parse_args()
+
+    coll = vault.open_vault(vault.get_client(), args.workspace)
+    if args.action == "import":
+        result = import_file(coll, args.path, args.path, default_category=args.category, workers=args.workers,
+                             progress=lambda done, total: print(f"\r  {done}/{total}", end="", flush=True))
+        print(f"\n✅ {result['written']} written · {result['duplicates']} duplicates · "
+              f"{result['existing']} already stored · {result['seconds']}s")
+    else:
+        print(f"✅ Exported {export_parquet(coll, args.path)} memories to {args.path}")
@@ -20,6 +20,99 @@ for secret_key in ["GEMINI_API_KEY", "GROQ_API_KEY"]:
         pass
 os.environ.setdefault("OPENAI_API_KEY", "dummy-not-used")
 
+# ── JSON extraction ──────────────────────────────────────────────────────────────
+# Kept identical to scan_json_object() in AI-Startup-Investment-Analyzer/utils.py —
+# this app ships as a single file, so it carries its own copy.
+
+# Structural tokens only: a complete string literal, a brace/bracket/comma,
+# or a markdown fence. The string branch can't overlap the others, so the
+# regex never backtracks — the scan stays linear in len(text).
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\],]|```(?:json)?')
+# A JSON object opens with { then a key or }. Prose braces like "{note}"
+# are rejected here, in C, before any tokenizing.
+_JSON_START = re.compile(r'\{\s*["}]')
+
+
+def scan_json_object(text: str, required_key: str = None) -> tuple:
+    """
+    Single-pass, brace-balanced scan for the outermost JSON object.
+    Returns (parsed: dict | None, span: (start, end) | None).
+
+    Repairs inline while scanning — trailing commas before } or ] are
+    dropped and markdown fences inside the object are skipped — so the
+    candidate is parsed exactly once. Balanced candidates that still fail
+    to parse (or lack required_key) are skipped and the scan resumes after
+    them, never re-reading text. An empty {} is only returned when no
+    non-empty object follows. span indexes the original text; on failure
+    it is the first candidate tried (to the end of text if truncated),
+    for previews, or None when the text holds no object at all.
+    """
+    if not text:
+        return None, None
+    first = empty = None
+    m = _JSON_START.search(text)
+    while m:
+        start = m.start()
+        out, depth, last, pending_comma = [], 0, start, None
+        end = None
+        for tok in _JSON_TOKEN.finditer(text, start):
+            t = tok.group()
+            between = text[last:tok.start()]
+            if pending_comma is not None:
+                # Comma directly followed by } or ] — trailing, drop it
+                if not (t in "}]" and not between.strip()):
+                    out.append(",")
+                pending_comma = None
+            out.append(between)
+            last = tok.end()
+            if t == ",":
+                pending_comma = tok.start()
+                continue
+            if t.startswith("```"):
+                continue
+            out.append(t)
+            if t in "{[":
+                depth += 1
+            elif t in "}]":
+                depth -= 1
+                if depth == 0:
+                    end = tok.end()
+                    break
+        if end is None:
+            first = first or (start, len(text))
+            break                      # unbalanced to end of text — truncated output
+        first = first or (start, end)
+        try:
+            parsed = json.loads("".join(out))
+            if isinstance(parsed, dict) and (required_key is None or required_key in parsed):
+                if parsed:
+                    return parsed, (start, end)
+                empty = empty or (start, end)
+        except json.JSONDecodeError:
+            pass
+        m = _JSON_START.search(text, end)
+    if empty:
+        return {}, empty
+    return None, first
+
+
+def find_object_with_key(obj, key: str):
+    """Depth-first search for the first dict holding `key` (e.g. a verdict nested under "analysis")."""
+    if isinstance(obj, dict):
+        if key in obj:
+            return obj
+        children = obj.values()
+    elif isinstance(obj, list):
+        children = obj
+    else:
+        return None
+    for child in children:
+        found = find_object_with_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+
 # ══════════════════════════════════════════════════════════════════════════════════
 # DESIGN SYSTEM — Premium VC SaaS
 # Inspired by: Carta, Linear, Retool, Vercel Dashboard
@@ -1173,16 +1266,19 @@ if run_btn:
         full_result    = str(result).strip()
 
         # ── Parse JSON ────────────────────────────────────────────────────────────
-        verdict = {}
         search_text = investment_out + "\n" + full_result
-        m = re.search(r'```json\s*(\{.*?\})\s*```', search_text, re.DOTALL)
-        if not m:
-            m = re.search(r'(\{[^{}]*"final_decision"[^{}]*\})', search_text, re.DOTALL)
-        if m:
-            try:
-                verdict = json.loads(m.group(1))
-            except Exception:
-                pass
+        verdict, _ = scan_json_object(search_text, required_key="final_decision")
+        pos, first_obj = 0, None
+        while verdict is None:
+            # No top-level verdict — fall back to one nested inside any object
+            outer, span = scan_json_object(search_text[pos:])
+            if not outer:
+                verdict = first_obj
+                break
+            first_obj = first_obj or outer
+            verdict = find_object_with_key(outer, "final_decision")
+            pos += span[1]
+        verdict = verdict or {}
 
         ms  = verdict.get("market_score",    "—")
         fs  = verdict.get("financial_score", "—")
@@ -121,15 +121,23 @@ def create_investment_advisor(llm) -> Agent:
 
 
 # ── Agent registry ────────────────────────────────────────────────────────────
-def create_all_agents(llm, research_tools: list, strategy_tools: list) -> dict:
+def create_all_agents(llm, research_tools: list, strategy_tools: list,
+                      llm_factory=None) -> dict:
     """
     Creates and returns all agents as a named dict.
     Called by crew_setup.py — not called directly from app.py.
+
+    llm_factory, if given, is called once per agent so each agent owns its
+    LLM instance — that keeps token usage counters separate per agent —
+    and `llm` may be None.
     """
+    if llm is None and llm_factory is None:
+        raise ValueError("create_all_agents needs an llm or an llm_factory")
+    new_llm = llm_factory or (lambda: llm)
     return {
-        "manager":            create_manager(llm),
-        "market_analyst":     create_market_analyst(llm, research_tools),
-        "financial_analyst":  create_financial_analyst(llm, strategy_tools),
-        "risk_analyst":       create_risk_analyst(llm),
-        "investment_advisor": create_investment_advisor(llm),
+        "manager":            create_manager(new_llm()),
+        "market_analyst":     create_market_analyst(new_llm(), research_tools),
+        "financial_analyst":  create_financial_analyst(new_llm(), strategy_tools),
+        "risk_analyst":       create_risk_analyst(new_llm()),
+        "investment_advisor": create_investment_advisor(new_llm()),
     }
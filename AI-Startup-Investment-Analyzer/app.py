@@ -19,6 +19,7 @@ import streamlit as st
 import os
 import time
 import json
+import html
 
 st.set_page_config(
     page_title="AgentForge · Modular Analyzer",
@@ -301,6 +302,8 @@ details summary { color: var(--muted) !important; font-size: 0.82rem !important;
 .lt-val { background: #1a1205; color: #d4a030; }
 .lt-json{ background: #0a1a14; color: #50d4b0; }
 .el-msg { color: #c8b898; }
+.el-stream { padding: 0.7rem 1rem; font-size: 0.67rem; line-height: 1.55; color: #c8b898; white-space: pre-wrap; word-break: break-word; }
+.el-agent  { color: #6a9fd8; font-size: 0.56rem; letter-spacing: 0.08em; text-transform: uppercase; margin-top: 0.4rem; }
 
 /* ── Status ── */
 .status-bar {
@@ -475,6 +478,21 @@ def render_log(lines, ph):
     </div>""", unsafe_allow_html=True)
 
 
+def render_stream(buffers, ph, tail=600):
+    """Live token panel — last `tail` chars per agent, newest agent last."""
+    body = "".join(
+        f'<div class="el-agent">{agent}</div>{html.escape(text[-tail:])}'
+        for agent, text in buffers.items()
+    )
+    ph.markdown(f"""
+    <div class="exec-log">
+        <div class="el-head">
+            <span class="el-title">Live Output — streaming tokens</span>
+        </div>
+        <div class="el-stream">{body}</div>
+    </div>""", unsafe_allow_html=True)
+
+
 # ── Header ───────────────────────────────────────────────────────────────────
 st.markdown("""
 <div class="hdr">
@@ -675,6 +693,12 @@ with st.expander("⚙  Advanced — Architecture + Analysis Settings"):
             value=True,
             help="ON = 5 agents (market + financial + risk + advisor + manager). OFF = 1 agent direct."
         )
+        parallel_specialists = st.toggle(
+            "Parallel Specialists",
+            value=True,
+            disabled=not use_specialists,
+            help="ON = market, financial and risk tasks run concurrently. OFF = one after another."
+        )
         persona = st.selectbox("Analyst Persona",
             ["Venture Capital Partner", "Angel Investor",
              "Private Equity Analyst", "Startup Accelerator"])
@@ -684,6 +708,16 @@ with st.expander("⚙  Advanced — Architecture + Analysis Settings"):
         risk_tolerance = st.selectbox("Risk Tolerance",
             ["Conservative", "Balanced", "Aggressive"])
     max_retries = st.slider("Max Retries", 1, 5, 3)
+    live_stream = st.toggle(
+        "Live Token Stream",
+        value=True,
+        help="ON = show agent steps and LLM tokens while the crew runs. OFF = render only when complete."
+    )
+    use_cache = st.toggle(
+        "Reuse Cached Results",
+        value=True,
+        help="ON = identical inputs return the stored analysis instantly. OFF = always run the crew."
+    )
     temperature = st.slider("Temperature", 0.0, 1.0, 0.2, 0.1,
                              help="Lower = more stable JSON. Recommended 0.1–0.3 for structured output.")
 
@@ -699,7 +733,7 @@ if run_btn:
         st.stop()
 
     try:
-        from execution import run_startup_analysis
+        from execution import run_startup_analysis, stream_startup_analysis
     except ImportError:
         st.markdown('<div class="err-box">⚠ Could not import execution.py — make sure all module files are in the same directory as app.py.</div>', unsafe_allow_html=True)
         st.stop()
@@ -728,7 +762,7 @@ if run_btn:
         <span class="s-text">Modular pipeline executing…</span>
     </div>""", unsafe_allow_html=True)
 
-    result = run_startup_analysis(
+    analysis_kwargs = dict(
         startup_idea    = startup_idea,
         model_id        = model_id,
         api_key         = api_key,
@@ -740,14 +774,50 @@ if run_btn:
         risk_tolerance  = risk_tolerance if 'risk_tolerance' in dir() else "Balanced",
         temperature     = temperature if 'temperature' in dir() else 0.2,
         use_specialists = use_specialists,
+        parallel_specialists = parallel_specialists,
         max_retries     = max_retries if 'max_retries' in dir() else 3,
         auto_regen      = True,
+        use_cache       = use_cache,
     )
 
+    if live_stream:
+        # Crew runs on a worker thread; events are drawn here as they arrive
+        stream_ph  = st.empty()
+        buffers    = {}
+        last_draw  = 0.0
+        for event in stream_startup_analysis(**analysis_kwargs):
+            kind = event["type"]
+            if kind == "result":
+                result = event["result"]
+                break
+            if kind == "token":
+                agent = event["agent"] or "agent"
+                buffers[agent] = buffers.get(agent, "") + event["text"]
+                if time.time() - last_draw > 0.15:
+                    render_stream(buffers, stream_ph)
+                    last_draw = time.time()
+                continue
+            if kind == "task":
+                log.append((ts(), "OK", "lt-ok", f"Task complete: {event['agent']} · {event['t']}s"))
+            else:
+                log.append((ts(), "SYS", "lt-sys", f"Step: {html.escape(event['text'][:90])}"))
+            render_log(log, log_ph)
+        if buffers:
+            render_stream(buffers, stream_ph)
+    else:
+        result = run_startup_analysis(**analysis_kwargs)
+
     elapsed = round(time.time() - t0, 1)
 
     # Log the outcome
     log.append((ts(), "SYS", "lt-sys", f"Stage returned: {result.get('stage','unknown')} · {elapsed}s"))
+    if result.get("ttft_s") is not None:
+        log.append((ts(), "SYS", "lt-sys", f"Time to first token: {result['ttft_s']}s"))
+    if result.get("cache_hit"):
+        log.append((ts(), "OK", "lt-ok", "Cache hit — identical inputs, crew not run"))
+    for role, secs in result.get("timings", {}).items():
+        if role != "total":
+            log.append((ts(), "SYS", "lt-sys", f"Task timing: {role} · {secs}s"))
     if result["success"]:
         log.append((ts(), "JSON", "lt-json", "JSON extracted ✓"))
         val = result.get("validation", [])
@@ -871,11 +941,25 @@ if run_btn:
         <div class="stat">decision <b>{decision}</b></div>
         <div class="stat">agents <b>{agents_label}</b></div>
         <div class="stat">attempts <b>{result['attempts']}</b></div>
-        <div class="stat">est. tokens <b>{cost_est.get('total_tokens','—')}</b></div>
+        <div class="stat">cache <b>{'hit' if result.get('cache_hit') else 'miss'}</b></div>
+        <div class="stat">{'tokens' if cost_est.get('source') == 'usage' else 'est. tokens'} <b>{cost_est.get('total_tokens','—')}</b></div>
+        <div class="stat">cost <b>${cost_est.get('cost_usd', 0):.4f}</b></div>
         <div class="stat">elapsed <b>{elapsed}s</b></div>
+        <div class="stat">first token <b>{str(result['ttft_s']) + 's' if result.get('ttft_s') is not None else '—'}</b></div>
         <div class="stat">model <b>{model_id.split('/')[1]}</b></div>
     </div>""", unsafe_allow_html=True)
 
+    # Usage report export
+    usage = result.get("usage") or {}
+    if usage.get("by_agent"):
+        from usage import usage_report_csv
+        st.download_button(
+            "⬇  Download usage report (CSV)",
+            data=usage_report_csv(usage),
+            file_name="usage_report.csv",
+            mime="text/csv",
+        )
+
     # Raw JSON
     st.markdown(f"""
     <div class="result-section">
@@ -0,0 +1,303 @@
+# ============================================================
+# batch.py — Batch analysis API + CLI
+# Fans run_startup_analysis() out over a bounded worker pool.
+# Results stream to JSONL as each idea completes; the same
+# file is the checkpoint, so a crashed run resumes where it stopped.
+#
+#   python batch.py ideas.csv --out results.jsonl --concurrency 4
+# ============================================================
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from execution import run_startup_analysis
+
+
+DEFAULT_MODEL = "gemini/gemini-2.5-flash"
+
+# Crew runs started per minute, per provider. Each run makes 1–4 LLM calls,
+# so these sit well under the free-tier request limits.
+DEFAULT_RUNS_PER_MINUTE = {
+    "gemini": 3,
+    "groq":   6,
+}
+
+# Row fields that override the run_startup_analysis() defaults per idea.
+ROW_FIELDS = ("revenue", "cost", "industry", "persona", "stage", "risk_tolerance")
+
+
+# ── Rate limiting ────────────────────────────────────────────────────────────
+
+class RateLimiter:
+    """
+    Token bucket shared by every worker using the same provider.
+    acquire() blocks until a slot is free — workers never burst past the limit.
+    """
+
+    def __init__(self, per_minute: float):
+        self._lock    = threading.Lock()
+        self.tokens   = None
+        self.set_rate(per_minute)
+
+    def set_rate(self, per_minute: float):
+        """Changes the limit in place; workers already waiting pick it up on their next check."""
+        with self._lock:
+            self.per_minute = float(per_minute)
+            self.capacity   = max(1.0, self.per_minute)
+            self.rate       = self.capacity / 60.0
+            self.tokens     = self.capacity if self.tokens is None else min(self.tokens, self.capacity)
+            self.updated    = time.monotonic()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now          = time.monotonic()
+                self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiters      = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model_id: str, per_minute: float = None) -> RateLimiter:
+    """
+    One limiter per provider prefix ('gemini', 'groq', ...) for the whole process.
+    An explicit per_minute that differs from the current limit re-rates it.
+    """
+    provider = model_id.split("/", 1)[0]
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            rpm = per_minute or DEFAULT_RUNS_PER_MINUTE.get(provider, 5)
+            limiter = _limiters[provider] = RateLimiter(rpm)
+        elif per_minute and float(per_minute) != limiter.per_minute:
+            limiter.set_rate(per_minute)
+        return limiter
+
+
+# ── Input loading ────────────────────────────────────────────────────────────
+
+def idea_id(idea: dict) -> str:
+    """Stable id: the row's own 'id' if present, else a hash of the idea text."""
+    if idea.get("id"):
+        return str(idea["id"])
+    text = " ".join(str(idea.get("startup_idea", "")).split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+NUMERIC_FIELDS = ("revenue", "cost")
+
+
+def _to_number(value):
+    """Lenient float: accepts '1,200', '$500000', ' 3e5 '. Returns None when it can't parse."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return float(str(value).strip().replace(",", "").replace("$", ""))
+    except ValueError:
+        return None
+
+
+def _normalize_row(row: dict) -> dict:
+    """
+    Cleans one input row. A number field that doesn't parse is kept as-is so the
+    worker turns that row into a failed record instead of aborting the whole load.
+    """
+    row = {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+    if "startup_idea" not in row and "idea" in row:
+        row["startup_idea"] = row.pop("idea")
+    for num in NUMERIC_FIELDS:
+        if num in row:
+            value = _to_number(row[num])
+            if value is not None:
+                row[num] = value
+    return row
+
+
+def load_ideas(path: str) -> list:
+    """
+    Reads ideas from .csv (header row) or .jsonl (one object per line).
+    Each row needs 'startup_idea' (or 'idea'); optional 'id' and ROW_FIELDS.
+    """
+    ideas = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            row = _normalize_row(row)
+            if row.get("startup_idea"):
+                ideas.append(row)
+    return ideas
+
+
+def load_checkpoint(output_path: str) -> set:
+    """
+    Ids already finished successfully in a previous run.
+    Failed ids are not included — they are retried on resume.
+    A torn last line from a crash is ignored.
+    """
+    done = set()
+    if not output_path or not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("success"):
+                done.add(record.get("id"))
+    return done
+
+
+# ── Batch runner ─────────────────────────────────────────────────────────────
+
+def run_startup_batch(
+    ideas: list,
+    model_id: str = DEFAULT_MODEL,
+    api_key: str = None,
+    concurrency: int = 4,
+    output_path: str = None,
+    resume: bool = True,
+    runs_per_minute: float = None,
+    on_result=None,
+    **analysis_kwargs,
+) -> list:
+    """
+    Runs run_startup_analysis() for every idea with at most `concurrency` in flight.
+
+    ideas: list of str or dicts (see load_ideas for dict fields).
+    output_path: JSONL file — one record appended and flushed per completed idea.
+    resume: skip ids that already succeeded in output_path.
+    runs_per_minute: per-provider cap on crew starts (default from DEFAULT_RUNS_PER_MINUTE);
+                     it applies to every batch sharing the provider from now on.
+    on_result: optional callback(record) fired as each idea completes.
+    analysis_kwargs: forwarded to run_startup_analysis (temperature, use_specialists, ...).
+
+    Returns the list of records produced in this call, in completion order.
+    """
+    if api_key is None:
+        env_key = "GEMINI_API_KEY" if model_id.startswith("gemini/") else "GROQ_API_KEY"
+        api_key = os.environ.get(env_key, "")
+
+    ideas   = [{"startup_idea": i} if isinstance(i, str) else dict(i) for i in ideas]
+    done    = load_checkpoint(output_path) if resume else set()
+    pending = [i for i in ideas if idea_id(i) not in done]
+    limiter = get_rate_limiter(model_id, runs_per_minute)
+
+    write_lock = threading.Lock()
+    out_file   = open(output_path, "a", encoding="utf-8") if output_path else None
+    records    = []
+
+    def _run_one(idea: dict) -> dict:
+        t0 = time.time()
+        try:
+            if not idea.get("startup_idea"):
+                raise ValueError("row has no 'startup_idea'")
+            overrides = {k: idea[k] for k in ROW_FIELDS if k in idea}
+            for num in NUMERIC_FIELDS:
+                if num in overrides:
+                    value = _to_number(overrides[num])
+                    if value is None:
+                        raise ValueError(f"row has non-numeric '{num}': {overrides[num]!r}")
+                    overrides[num] = value
+            limiter.acquire()
+            t0 = time.time()
+            result = run_startup_analysis(
+                startup_idea = idea["startup_idea"],
+                model_id     = model_id,
+                api_key      = api_key,
+                **{**analysis_kwargs, **overrides},
+            )
+        except Exception as e:
+            result = {"success": False, "error": str(e), "stage": "batch_worker", "data": None}
+        return {
+            "id":           idea_id(idea),
+            "startup_idea": idea.get("startup_idea", ""),
+            "elapsed_s":    round(time.time() - t0, 2),
+            **result,
+        }
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = [pool.submit(_run_one, idea) for idea in pending]
+            for future in as_completed(futures):
+                record = future.result()
+                records.append(record)
+                if out_file:
+                    with write_lock:
+                        out_file.write(json.dumps(record, default=str) + "\n")
+                        out_file.flush()
+                        os.fsync(out_file.fileno())
+                if on_result:
+                    on_result(record)
+    finally:
+        if out_file:
+            out_file.close()
+
+    return records
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run the startup investment analysis over a CSV/JSONL list of ideas."
+    )
+    parser.add_argument("input", help="ideas file (.csv with header, or .jsonl)")
+    parser.add_argument("--out", default="results.jsonl", help="JSONL output + checkpoint file")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="model id, e.g. groq/llama-3.3-70b-versatile")
+    parser.add_argument("--concurrency", type=int, default=4, help="max analyses in flight")
+    parser.add_argument("--rpm", type=float, default=None, help="crew runs started per minute for this provider")
+    parser.add_argument("--temperature", type=float, default=0.2)
+    parser.add_argument("--direct", action="store_true", help="1-agent direct mode instead of 5 specialists")
+    parser.add_argument("--no-resume", action="store_true", help="ignore ids already in --out")
+    parser.add_argument("--no-cache", action="store_true", help="always run the crew")
+    args = parser.parse_args(argv)
+
+    ideas = load_ideas(args.input)
+    done  = 0 if args.no_resume else len({idea_id(i) for i in ideas} & load_checkpoint(args.out))
+    print(f"{len(ideas)} ideas loaded · {done} already done · concurrency {args.concurrency}")
+
+    counts = {"ok": 0, "failed": 0}
+
+    def _progress(record):
+        counts["ok" if record.get("success") else "failed"] += 1
+        status   = record.get("data", {}).get("final_decision", "") if record.get("success") else record.get("stage")
+        finished = counts["ok"] + counts["failed"]
+        print(f"[{finished}/{len(ideas) - done}] {record['id']} · {status} · {record['elapsed_s']}s")
+
+    t0 = time.time()
+    run_startup_batch(
+        ideas,
+        model_id        = args.model,
+        concurrency     = args.concurrency,
+        output_path     = args.out,
+        resume          = not args.no_resume,
+        runs_per_minute = args.rpm,
+        on_result       = _progress,
+        temperature     = args.temperature,
+        use_specialists = not args.direct,
+        use_cache       = not args.no_cache,
+    )
+    print(f"Done in {round(time.time() - t0, 1)}s · {counts['ok']} ok · {counts['failed']} failed → {args.out}")
+    return 0 if counts["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
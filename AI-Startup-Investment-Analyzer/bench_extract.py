@@ -0,0 +1,83 @@
+# ============================================================
+# bench_extract.py — Micro-benchmark for JSON extraction
+# Compares the old regex two-pass extractor with the single-pass
+# scan_json_object() on large, noisy LLM-style outputs.
+#
+#   python bench_extract.py
+# ============================================================
+
+import json
+import random
+import re
+import timeit
+
+from utils import extract_json_safe
+
+
+def regex_two_pass(text: str) -> dict:
+    """The pre-scanner extract_json_safe, kept here for comparison only."""
+    match = None
+    try:
+        cleaned = re.sub(r'```json\s*', '', text)
+        cleaned = re.sub(r'```\s*', '', cleaned)
+        match   = re.search(r'\{.*\}', cleaned, re.DOTALL)
+        if match:
+            return json.loads(match.group())
+    except Exception:
+        pass
+    try:
+        if match:
+            fixed = re.sub(r',\s*}', '}', match.group())
+            fixed = re.sub(r',\s*]', ']', fixed)
+            return json.loads(fixed)
+    except Exception:
+        pass
+    return {"error": "failed"}
+
+
+PAYLOAD = {
+    "market_score": 7, "market_summary": "Large TAM {with braces} in prose.",
+    "financial_score": 6, "financial_summary": "Payback ~14 months, margin 70%.",
+    "risk_score": 5, "risk_summary": "Regulatory exposure in EU, \"moderate\".",
+    "final_decision": "Consider", "confidence_level": "Medium",
+    "recommended_actions": ["a", "b", "c", "d", "e"], "total_score": 6.0,
+}
+
+
+def _prose(rng: random.Random, chars: int, braces: bool = False) -> str:
+    words = ["market", "growth", "risk", "revenue", "`code`", "moat", "churn", "[1]", "CAGR,"]
+    if braces:
+        words += ["{note}", "{A}"]
+    out, n = [], 0
+    while n < chars:
+        w = rng.choice(words)
+        out.append(w)
+        n += len(w) + 1
+    return " ".join(out)
+
+
+def make_cases(size: int, seed: int = 7) -> dict:
+    rng  = random.Random(seed)
+    body = json.dumps(PAYLOAD, indent=2)
+    trailing = body.replace('"e"\n  ]', '"e",\n  ]').replace("6.0\n}", "6.0,\n}")
+    return {
+        "clean + prose":       _prose(rng, size) + "\n" + body + "\n" + _prose(rng, size),
+        "fenced + trailing ,": _prose(rng, size) + "\n```json\n" + trailing + "\n```\n" + _prose(rng, size),
+        "braces in prose":     _prose(rng, size, braces=True) + body + _prose(rng, size, braces=True),
+        "stray } after":       _prose(rng, size) + body + " see appendix {A} and {B} " + _prose(rng, size),
+    }
+
+
+def main():
+    for size in (2_000, 50_000, 500_000):
+        print(f"\n── noise ≈ {size * 2:,} chars around the object ──")
+        for name, text in make_cases(size).items():
+            for label, fn in (("regex two-pass", regex_two_pass), ("single-pass scan", lambda t: extract_json_safe(t)[0])):
+                ok     = "error" not in fn(text)
+                runs   = 5 if size >= 500_000 else 50
+                per_ms = timeit.timeit(lambda: fn(text), number=runs) / runs * 1000
+                print(f"  {name:<22} {label:<17} {per_ms:9.3f} ms   {'ok' if ok else 'FAILED'}")
+
+
+if __name__ == "__main__":
+    main()
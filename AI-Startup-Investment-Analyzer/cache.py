@@ -0,0 +1,233 @@
+# ============================================================
+# cache.py — Result cache for run_startup_analysis()
+# Content-addressed: the key is a hash of the normalized inputs.
+# Two tiers: in-process LRU in front of an on-disk SQLite store.
+# No CrewAI imports here — pure Python, stdlib only.
+# ============================================================
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+# Bump when the result dict shape or JSON_SCHEMA changes — old entries stop matching.
+CACHE_VERSION = 1
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_DB_PATH     = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "analysis_cache.sqlite3")
+
+
+# ── Key derivation ────────────────────────────────────────────────────────────
+
+def _norm_text(value) -> str:
+    """Collapses whitespace so re-pasted text with stray spaces still matches."""
+    return " ".join(str(value).split())
+
+
+def make_cache_key(
+    startup_idea: str,
+    model_id: str,
+    revenue: float,
+    cost: float,
+    industry: str,
+    persona: str,
+    stage: str,
+    risk_tolerance: str,
+    temperature: float,
+    use_specialists: bool = True,
+) -> str:
+    """
+    SHA-256 over a canonical JSON encoding of every input that changes the output.
+    API keys and retry settings are deliberately excluded.
+    """
+    payload = {
+        "v":               CACHE_VERSION,
+        "startup_idea":    _norm_text(startup_idea),
+        "model_id":        model_id.strip(),
+        "revenue":         round(float(revenue), 2),
+        "cost":            round(float(cost), 2),
+        "industry":        _norm_text(industry),
+        "persona":         _norm_text(persona),
+        "stage":           _norm_text(stage),
+        "risk_tolerance":  _norm_text(risk_tolerance),
+        "temperature":     round(float(temperature), 3),
+        "use_specialists": bool(use_specialists),
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def as_cache_hit(cached: dict) -> dict:
+    """
+    A cached result as returned to a new caller. No LLM call was made, so
+    attempts, cost, usage, timings and TTFT are zeroed; the original run's
+    figures are kept under "cached_from".
+    """
+    original = {k: cached.get(k) for k in ("attempts", "cost_estimate", "timings", "usage", "ttft_s")}
+    return {
+        **cached,
+        "attempts":      0,
+        "cost_estimate": {
+            "input_tokens": 0, "output_tokens": 0, "total_tokens": 0,
+            "attempts": 0, "cost_usd": 0.0, "source": "cache",
+        },
+        "timings":       {},
+        "usage":         {},
+        "ttft_s":        None,
+        "cache_hit":     True,
+        "cached_from":   original,
+    }
+
+
+# ── Tiers ─────────────────────────────────────────────────────────────────────
+# Any object with get(key) -> dict | None and set(key, value) works as a cache.
+
+class MemoryCache:
+    """
+    In-process LRU with per-entry TTL.
+    Thread-safe — batch workers share one instance.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl         = ttl
+        self._data       = OrderedDict()
+        self._lock       = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict, stored_at: float = None):
+        with self._lock:
+            self._data[key] = (stored_at or time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache:
+    """
+    On-disk tier — survives restarts and is shared by every process on the host.
+    One short-lived connection per call, committed and closed when the call
+    ends, so it is safe across threads and leaks no file handles.
+    Expired rows are purged on write.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, ttl: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl  = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:             # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def get_with_time(self, key: str) -> tuple:
+        """Returns (value, stored_at) or (None, None) when missing or expired."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, stored_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None, None
+        try:
+            return json.loads(row[0]), row[1]
+        except json.JSONDecodeError:
+            return None, None
+
+    def get(self, key: str):
+        return self.get_with_time(key)[0]
+
+    def set(self, key: str, value: dict, stored_at: float = None):
+        now = stored_at or time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), now),
+            )
+            conn.execute("DELETE FROM results WHERE stored_at < ?", (time.time() - self.ttl,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
+
+
+class TieredCache:
+    """
+    LRU in front of SQLite. Disk hits are promoted into memory
+    with their original timestamp, so TTL is measured from the first store.
+    """
+
+    def __init__(self, memory: MemoryCache = None, disk: SQLiteCache = None):
+        self.memory = memory or MemoryCache()
+        self.disk   = disk
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        value, stored_at = self.disk.get_with_time(key)
+        if value is not None:
+            self.memory.set(key, value, stored_at=stored_at)
+        return value
+
+    def set(self, key: str, value: dict):
+        now = time.time()
+        self.memory.set(key, value, stored_at=now)
+        if self.disk is not None:
+            self.disk.set(key, value, stored_at=now)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+# ── Default instance ─────────────────────────────────────────────────────────
+
+_default_cache = None
+_default_lock  = threading.Lock()
+
+
+def get_default_cache() -> TieredCache:
+    """
+    Process-wide LRU + SQLite cache, created on first use.
+    Falls back to memory-only if the disk path is not writable.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                disk = SQLiteCache()
+            except (sqlite3.Error, OSError):
+                disk = None
+            _default_cache = TieredCache(MemoryCache(), disk)
+        return _default_cache
@@ -5,8 +5,18 @@
 # This is the single integration point.
 # ============================================================
 
+import threading
+
 from crewai import Crew, Process
 
+try:
+    from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+except ImportError:
+    try:
+        from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+    except ImportError:            # CrewAI build without an event bus — no token streaming
+        crewai_event_bus = LLMStreamChunkEvent = None
+
 from agents import create_all_agents
 from tasks import (
     create_market_research_task,
@@ -19,7 +29,7 @@ from tools import get_research_tools, get_strategy_tools
 
 def create_startup_crew(
     startup_idea: str,
-    llm,
+    llm=None,
     revenue: float = 500000.0,
     cost: float = 150000.0,
     industry: str = "AI SaaS",
@@ -27,6 +37,8 @@ def create_startup_crew(
     stage: str = "Seed",
     risk_tolerance: str = "Balanced",
     use_specialists: bool = True,
+    parallel_specialists: bool = True,
+    llm_factory=None,
 ) -> Crew:
     """
     Assembles and returns a fully configured CrewAI crew.
@@ -35,25 +47,38 @@ def create_startup_crew(
     - use_specialists=True  → 5-agent hierarchical crew with specialist context
     - use_specialists=False → 1-agent direct crew (faster, lower cost)
 
+    parallel_specialists=True marks the market, financial and risk tasks
+    async_execution — none reads another's output, so CrewAI runs them
+    concurrently and the evaluation task starts once all three finish.
+
+    llm_factory (zero-arg callable) gives every agent its own LLM instance,
+    so usage.py can attribute tokens per agent; `llm` is then not needed.
+    Without a factory every agent shares `llm`.
+
     The crew is returned — not executed here.
     Execution happens in execution.py via run_startup_analysis().
     """
     research_tools = get_research_tools()
     strategy_tools = get_strategy_tools()
-    agents         = create_all_agents(llm, research_tools, strategy_tools)
+    agents         = create_all_agents(llm, research_tools, strategy_tools, llm_factory)
 
     if use_specialists:
-        # Build specialist tasks
+        # Build specialist tasks — independent of each other, so they can
+        # run concurrently when parallel_specialists is set
         market_task   = create_market_research_task(
-            startup_idea, industry, agents["market_analyst"]
+            startup_idea, industry, agents["market_analyst"],
+            async_execution=parallel_specialists,
         )
         financial_task = create_financial_task(
-            startup_idea, revenue, cost, agents["financial_analyst"]
+            startup_idea, revenue, cost, agents["financial_analyst"],
+            async_execution=parallel_specialists,
         )
         risk_task = create_risk_task(
-            startup_idea, agents["risk_analyst"]
+            startup_idea, agents["risk_analyst"],
+            async_execution=parallel_specialists,
         )
-        # Final synthesis task — receives specialist context
+        # Final synthesis task — receives specialist context.
+        # Synchronous, so the sequential process waits on all async specialists.
         main_task = create_main_evaluation_task(
             startup_idea=startup_idea,
             persona=persona,
@@ -90,3 +115,67 @@ def create_startup_crew(
         )
 
     return crew, main_task
+
+
+# ── Live streaming hooks ──────────────────────────────────────────────────────
+# True when this CrewAI build emits per-token LLM chunk events.
+STREAMING_AVAILABLE = crewai_event_bus is not None
+
+# The event bus is process-global, so one listener routes chunks to whichever
+# run owns the emitting LLM instance (each agent has its own — see llm_factory).
+_stream_routes = {}
+_stream_lock   = threading.Lock()
+_listener_registered = False
+
+
+def _ensure_chunk_listener():
+    global _listener_registered
+    with _stream_lock:
+        if _listener_registered or not STREAMING_AVAILABLE:
+            return
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _route_chunk(source, event):
+            route = _stream_routes.get(id(source))
+            if route:
+                route(event.chunk)
+
+        _listener_registered = True
+
+
+def _step_text(step) -> str:
+    for attr in ("thought", "output", "result", "text"):
+        value = getattr(step, attr, None)
+        if value:
+            return str(value)
+    return str(step)
+
+
+def attach_stream_listeners(crew, emit) -> callable:
+    """
+    Wires live progress from a crew into emit(kind, agent, text):
+    - "step"  — every agent reasoning / tool step (step_callback)
+    - "task"  — each finished task with its raw output (task_callback)
+    - "token" — LLM output chunks, when STREAMING_AVAILABLE and the LLMs stream
+
+    Returns detach() — call it when the run ends so routes don't leak.
+    """
+    crew.step_callback = lambda step: emit("step", None, _step_text(step))
+    crew.task_callback = lambda out: emit("task", getattr(out, "agent", None), str(getattr(out, "raw", out)))
+
+    _ensure_chunk_listener()
+    routed = []
+    with _stream_lock:
+        for agent in crew.agents:
+            llm  = getattr(agent, "llm", None)
+            role = agent.role
+            if llm is not None:
+                _stream_routes[id(llm)] = lambda chunk, role=role: emit("token", role, chunk)
+                routed.append(id(llm))
+
+    def detach():
+        with _stream_lock:
+            for key in routed:
+                _stream_routes.pop(key, None)
+
+    return detach
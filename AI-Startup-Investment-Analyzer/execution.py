@@ -1,18 +1,27 @@
 # ============================================================
 # execution.py — Clean execution layer
 # This is the only file app.py needs to import.
-# It orchestrates: crew_setup → safe_kickoff → extract → validate
+# It orchestrates: cache → crew_setup → safe_kickoff → extract → validate
 # ============================================================
 
+import queue
+import threading
+import time
+
 from crewai import LLM
 
-from crew_setup import create_startup_crew
+from cache import make_cache_key, get_default_cache, as_cache_hit
+from crew_setup import create_startup_crew, attach_stream_listeners, STREAMING_AVAILABLE
+from usage import UsageTracker, cost_summary
 from utils import (
     validate_input,
     extract_json_safe,
     validate_output,
     safe_kickoff,
+    RetryPolicy,
+    classify_error,
     estimate_cost,
+    task_timings,
     all_passed,
 )
 
@@ -29,22 +38,41 @@ def run_startup_analysis(
     risk_tolerance: str = "Balanced",
     temperature: float = 0.2,
     use_specialists: bool = True,
+    parallel_specialists: bool = True,
     max_retries: int = 3,
     retry_delay: float = 2.0,
+    retry_deadline: float = None,
     min_input_len: int = 30,
     auto_regen: bool = True,
+    use_cache: bool = True,
+    cache=None,
+    on_event=None,
 ) -> dict:
     """
     Single entry point for the entire analysis pipeline.
 
     app.py calls this function — nothing else.
 
+    Successful results are cached on a hash of the inputs that shape the
+    output (see cache.make_cache_key). cache=None uses the shared LRU + SQLite
+    cache; pass any object with get(key)/set(key, value) to swap it out.
+
+    on_event(event: dict), if given, receives live progress while the crew
+    runs — agent steps, finished tasks and LLM token chunks. It is called
+    from CrewAI worker threads; see stream_startup_analysis() for a
+    generator that hands events back to the caller's thread.
+
     Returns a dict with:
     - success: bool
     - data: parsed JSON dict (or None)
     - validation: list of validation results
     - attempts: int
     - cost_estimate: dict
+    - timings: dict of per-task seconds (keyed by agent role) + "total"
+    - usage: real token counts + cost by agent / task / attempt (see usage.py)
+    - ttft_s: seconds from kickoff to the first streamed token (None if not streamed)
+    - cache_hit: bool (a hit reports zero cost / usage; the original run's
+      figures are under cached_from)
     - error: str (if failed)
     - stage: str (which layer failed, if any)
     """
@@ -60,8 +88,24 @@ def run_startup_analysis(
             "validation":    [],
             "attempts":      0,
             "cost_estimate": {},
+            "timings":       {},
+            "usage":         {},
+            "ttft_s":        None,
+            "cache_hit":     False,
         }
 
+    # ── Layer 1b: Result cache ─────────────────────────────────────────────
+    cache_key = None
+    if use_cache:
+        cache     = cache if cache is not None else get_default_cache()
+        cache_key = make_cache_key(
+            startup_idea, model_id, revenue, cost, industry,
+            persona, stage, risk_tolerance, temperature, use_specialists,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return as_cache_hit(cached)
+
     # ── Layer 2: Build LLM + crew ──────────────────────────────────────────
     import os
     is_gemini = model_id.startswith("gemini/")
@@ -69,10 +113,16 @@ def run_startup_analysis(
         os.environ["GEMINI_API_KEY"] = api_key
 
     try:
-        llm = LLM(model=model_id, api_key=api_key, temperature=temperature)
+        stream = on_event is not None and STREAMING_AVAILABLE
+
+        def llm_factory():
+            if stream:
+                return LLM(model=model_id, api_key=api_key, temperature=temperature, stream=True)
+            return LLM(model=model_id, api_key=api_key, temperature=temperature)
+
         crew, main_task = create_startup_crew(
             startup_idea    = startup_idea,
-            llm             = llm,
+            llm_factory     = llm_factory,
             revenue         = revenue,
             cost            = cost,
             industry        = industry,
@@ -80,6 +130,7 @@ def run_startup_analysis(
             stage           = stage,
             risk_tolerance  = risk_tolerance,
             use_specialists = use_specialists,
+            parallel_specialists = parallel_specialists,
         )
     except Exception as e:
         return {
@@ -90,37 +141,80 @@ def run_startup_analysis(
             "validation":    [],
             "attempts":      0,
             "cost_estimate": {},
+            "timings":       {},
+            "usage":         {},
+            "ttft_s":        None,
+            "cache_hit":     False,
         }
 
     # ── Layer 3: Retry-wrapped execution ───────────────────────────────────
-    result, attempts_used, success = safe_kickoff(
-        crew, retries=max_retries, delay=retry_delay
-    )
+    # retry_delay is the backoff base; retry_deadline caps total time spent retrying
+    policy = RetryPolicy(max_attempts=max_retries, base_delay=retry_delay,
+                         deadline=retry_deadline)
+    tracker = UsageTracker(crew, model_id)
+    track   = lambda attempt, ok, out: tracker.record_attempt(attempt, ok, out if ok else None)
+
+    t0          = time.perf_counter()
+    first_token = []
+    detach      = None
+    if on_event is not None:
+        def emit(kind, agent, text):
+            now = time.perf_counter()
+            if kind == "token" and not first_token:
+                first_token.append(now)
+            on_event({"type": kind, "agent": agent, "text": text, "t": round(now - t0, 2)})
+        detach = attach_stream_listeners(crew, emit)
+
+    result, attempts_used, success = safe_kickoff(crew, policy=policy, on_attempt=track)
+    ttft = round(first_token[0] - t0, 2) if first_token else None
 
     if not success:
+        if detach:
+            detach()
+        if classify_error(result) == "permanent":
+            error = f"Permanent error — not retried: {str(result)}"
+        else:
+            error = f"All {attempts_used} attempts failed: {str(result)}"
         return {
             "success":       False,
-            "error":         f"All {max_retries} attempts failed: {str(result)}",
+            "error":         error,
             "stage":         "crew_execution",
             "data":          None,
             "validation":    [],
             "attempts":      attempts_used,
             "cost_estimate": {},
+            "timings":       task_timings(crew.tasks, time.perf_counter() - t0),
+            "usage":         tracker.report(),
+            "ttft_s":        ttft,
+            "cache_hit":     False,
         }
 
     # ── Layer 4: JSON extraction ───────────────────────────────────────────
     raw_text = str(main_task.output.raw) if main_task.output else str(result)
-    parsed   = extract_json_safe(raw_text)
+    parsed, _ = extract_json_safe(raw_text)
 
     if "error" in parsed and auto_regen:
         # Auto-regenerate once on extraction failure
         result2, attempts2, success2 = safe_kickoff(
-            crew, retries=2, delay=retry_delay
+            crew, policy=RetryPolicy(max_attempts=2, base_delay=retry_delay,
+                                     deadline=retry_deadline),
+            on_attempt=track,
         )
         attempts_used += attempts2
         if success2:
             raw_text2 = str(main_task.output.raw) if main_task.output else str(result2)
-            parsed = extract_json_safe(raw_text2)
+            parsed, _ = extract_json_safe(raw_text2)
+
+    if detach:
+        detach()
+    timings = task_timings(crew.tasks, time.perf_counter() - t0)
+
+    # Real token counts when CrewAI exposes them; word-count heuristic otherwise
+    usage = tracker.report()
+    if usage["total"]["total_tokens"] > 0:
+        cost_est = cost_summary(usage, attempts_used)
+    else:
+        cost_est = estimate_cost(str(main_task.description), attempts_used)
 
     if "error" in parsed:
         return {
@@ -130,7 +224,11 @@ def run_startup_analysis(
             "data":          parsed,
             "validation":    [],
             "attempts":      attempts_used,
-            "cost_estimate": estimate_cost(str(main_task.description), attempts_used),
+            "cost_estimate": cost_est,
+            "timings":       timings,
+            "usage":         usage,
+            "ttft_s":        ttft,
+            "cache_hit":     False,
         }
 
     # ── Layer 5: Schema + business logic validation ────────────────────────
@@ -145,7 +243,7 @@ def run_startup_analysis(
     except Exception:
         pass
 
-    return {
+    output = {
         "success":       True,
         "error":         None,
         "stage":         "complete",
@@ -153,6 +251,51 @@ def run_startup_analysis(
         "validation":    val_results,
         "all_passed":    all_passed(val_results),
         "attempts":      attempts_used,
-        "cost_estimate": estimate_cost(str(main_task.description), attempts_used),
+        "cost_estimate": cost_est,
+        "timings":       timings,
+        "usage":         usage,
+        "ttft_s":        ttft,
         "raw_text":      raw_text,
+        "cache_hit":     False,
     }
+
+    # Only successful runs are cached — failures should be retried next time
+    if cache_key is not None:
+        try:
+            cache.set(cache_key, output)
+        except Exception:
+            pass
+
+    return output
+
+
+def stream_startup_analysis(poll_interval: float = 0.1, **kwargs):
+    """
+    Generator version of run_startup_analysis() for live UIs.
+
+    Runs the pipeline on a worker thread and yields progress events
+    ({"type": "step" | "task" | "token", "agent", "text", "t"}) on the
+    caller's thread as they arrive — Streamlit can only draw from there.
+    The last item is always {"type": "result", "result": <result dict>}.
+    """
+    events = queue.Queue()
+    box    = {}
+
+    def worker():
+        try:
+            box["result"] = run_startup_analysis(on_event=events.put, **kwargs)
+        except Exception as e:
+            box["result"] = {
+                "success": False, "error": str(e), "stage": "crew_execution",
+                "data": None, "validation": [], "attempts": 0, "cost_estimate": {},
+                "timings": {}, "usage": {}, "ttft_s": None, "cache_hit": False,
+            }
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    while thread.is_alive() or not events.empty():
+        try:
+            yield events.get(timeout=poll_interval)
+        except queue.Empty:
+            continue
+    yield {"type": "result", "result": box["result"]}
@@ -0,0 +1,231 @@
+# ============================================================
+# industry_index.py — Indexed industry lookup for tools.py
+# Loads the market / competitor tables from CSV or JSON and
+# answers free-text industry queries through a prebuilt index:
+# normalized-token inverted index, alias table, and a trigram
+# index for typos — ranked, deterministic top-k.
+# No CrewAI imports here — pure Python, stdlib only.
+# ============================================================
+
+import csv
+import json
+import math
+import os
+import re
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# A partial match must score above this to count; a fully covered name always does
+# (see IndustryIndex.search). Strict, so one word of a two-word alias is not enough.
+MIN_SCORE = 0.5
+# Trigram Dice similarity needed to treat a query token as a typo of a known token.
+FUZZY_MIN_SIMILARITY = 0.7
+# Work caps that keep a lookup's cost independent of the table size:
+SEED_LIMIT = 64             # tokens in more names/aliases than this don't seed candidates
+FUZZY_GRAM_LIMIT = 64       # trigrams shared by more known tokens than this aren't probed
+FUZZY_MAX_EXPANSIONS = 3    # known tokens a typo may stand for
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "the", "to", "with"})
+# Words that name almost any industry here: scored like any token, but never seed candidates.
+_GENERIC = frozenset({"ai", "app", "apps", "platform", "software", "startup", "tech", "technology"})
+
+
+# ── Normalization ─────────────────────────────────────────────────────────────
+
+def tokenize(text: str) -> list:
+    """Lowercase alphanumeric tokens, '&' read as 'and', stopwords dropped."""
+    return [t for t in _TOKEN.findall(str(text).lower().replace("&", " and ")) if t not in _STOPWORDS]
+
+
+def normalize(text: str) -> str:
+    return " ".join(tokenize(text))
+
+
+def _trigrams(token: str) -> frozenset:
+    padded = f" {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+# ── Dataset loading ───────────────────────────────────────────────────────────
+
+def _split_aliases(value) -> list:
+    if isinstance(value, (list, tuple)):
+        return [str(a).strip() for a in value if str(a).strip()]
+    return [a.strip() for a in str(value or "").split("|") if a.strip()]
+
+
+def load_table(path: str, key_field: str = "industry") -> dict:
+    """
+    Reads an industry table into {industry: record}.
+
+    .csv  — header row; `key_field` column names the industry,
+            optional `aliases` column is '|'-separated.
+    .json — either {industry: record} or a list of records with `key_field`.
+    Records keep every other column; `aliases` is always a list.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            data = json.load(f)
+            rows = [{key_field: k, **v} for k, v in data.items()] if isinstance(data, dict) else data
+
+    table = {}
+    for row in rows:
+        name = str(row.get(key_field, "")).strip()
+        if not name:
+            continue
+        record = {k: v for k, v in row.items() if k != key_field}
+        record["aliases"] = _split_aliases(record.get("aliases"))
+        table[name] = record
+    return table
+
+
+# ── Index ─────────────────────────────────────────────────────────────────────
+
+class IndustryIndex:
+    """
+    Built once per table; search() never scans the table.
+
+    An entry's score is the IDF-weighted share of its own name tokens
+    (or of one alias's tokens) found in the query — so "AI fitness app for
+    seniors" fully covers "AI Fitness", while a bare "AI" covers almost
+    nothing of any entry. Unknown query tokens are mapped to known tokens
+    through the trigram index, weighted by similarity.
+
+    Candidates come from three places, each capped so cost tracks the
+    query rather than the table:
+      - the postings of the query's rare tokens — common ones (generic
+        words like "ai" or "tech", anything in more than a quarter of the
+        entries or SEED_LIMIT names) still count towards scores but seed
+        nothing;
+      - names / aliases that appear whole in the query (key in query);
+      - names / aliases the whole query is part of (query in key, e.g.
+        "HR" → "HR Tech AI"); when the query holds all of that name's
+        rare tokens and points at a single entry, it matches even below
+        min_score.
+    Otherwise a partially covered name must score strictly above
+    min_score — "health" alone is half of "health and fitness", not a match.
+    Ties break on name, so results are deterministic.
+    """
+
+    COMMON_FRACTION = 0.25
+
+    def __init__(self, table: dict):
+        self.table    = table
+        self.names    = sorted(table)
+        self.exact    = {}   # normalized name / alias -> variant id
+        self.variants = []   # (entry id, token tuple) — one per name / alias
+        self.postings = {}   # token -> [variant id]
+        self.phrases  = {}   # contiguous sub-phrase with a rare token -> [variant id]
+        self.trigrams = {}   # trigram -> [vocabulary token]
+
+        entries_per_token = {}
+        for entry_id, name in enumerate(self.names):
+            for text in [name, *table[name].get("aliases", [])]:
+                tokens = tuple(dict.fromkeys(tokenize(text)))
+                if not tokens:
+                    continue
+                variant_id = len(self.variants)
+                self.exact.setdefault(" ".join(tokens), variant_id)
+                self.variants.append((entry_id, tokens))
+                for token in tokens:
+                    self.postings.setdefault(token, []).append(variant_id)
+                    entries_per_token.setdefault(token, set()).add(entry_id)
+
+        n = len(self.names) or 1
+        self.idf    = {t: math.log(1 + n / len(e)) for t, e in entries_per_token.items()}
+        self.common = {
+            t for t, e in entries_per_token.items()
+            if t in _GENERIC or (n > 8 and len(e) > n * self.COMMON_FRACTION) or len(self.postings[t]) > SEED_LIMIT
+        }
+        self.variant_weight = [sum(self.idf[t] for t in tokens) for _, tokens in self.variants]
+        self.longest = max((len(tokens) for _, tokens in self.variants), default=0)
+
+        for variant_id, (_, tokens) in enumerate(self.variants):
+            for i in range(len(tokens)):
+                for j in range(i + 1, len(tokens) + 1):
+                    if not self.common.issuperset(tokens[i:j]):
+                        self.phrases.setdefault(" ".join(tokens[i:j]), []).append(variant_id)
+        self.token_grams = {token: _trigrams(token) for token in self.postings}
+        for token, grams in self.token_grams.items():
+            for gram in grams:
+                self.trigrams.setdefault(gram, []).append(token)
+
+    @classmethod
+    def from_file(cls, path: str, key_field: str = "industry") -> "IndustryIndex":
+        return cls(load_table(path, key_field))
+
+    def _expand(self, token: str) -> dict:
+        """Known tokens this query token stands for -> match weight (1.0 exact)."""
+        if token in self.postings:
+            return {token: 1.0}
+        if len(token) < 4:
+            return {}
+        grams = _trigrams(token)
+        candidates = set()
+        for gram in grams:
+            tokens = self.trigrams.get(gram, ())
+            if len(tokens) <= FUZZY_GRAM_LIMIT:
+                candidates.update(tokens)
+        matches = []
+        for candidate in candidates:
+            other = self.token_grams[candidate]
+            similarity = 2 * len(grams & other) / (len(grams) + len(other))
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches.append((-similarity, candidate))
+        return {c: -s for s, c in sorted(matches)[:FUZZY_MAX_EXPANSIONS]}
+
+    def search(self, query: str, k: int = 5, min_score: float = MIN_SCORE) -> list:
+        """Top-k [(industry, score)] with score in (0, 1], best first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        exact  = self.exact.get(" ".join(tokens))
+        if exact is not None:
+            return [(self.names[self.variants[exact][0]], 1.0)][:k]
+
+        weights = {}   # known token -> best match weight from any query token
+        for token in tokens:
+            for known, weight in self._expand(token).items():
+                weights[known] = max(weights.get(known, 0.0), weight)
+
+        candidates = set()
+        for token in weights:
+            if token not in self.common:
+                candidates.update(self.postings[token])
+        for i in range(len(tokens)):                         # key in query
+            for j in range(i + 1, min(i + self.longest, len(tokens)) + 1):
+                variant_id = self.exact.get(" ".join(tokens[i:j]))
+                if variant_id is not None:
+                    candidates.add(variant_id)
+        contains_query = self.phrases.get(" ".join(tokens), ())  # query in key
+        candidates.update(contains_query)
+        always = {                                           # ... that covers every rare token
+            self.variants[v][0] for v in contains_query
+            if self.common.issuperset(set(self.variants[v][1]).difference(tokens))
+        }
+        if len(always) > 1:
+            always = set()   # ambiguous ("health") — coverage decides
+
+        best = {}
+        for variant_id in candidates:
+            entry_id, variant_tokens = self.variants[variant_id]
+            covered = sum(self.idf[t] * weights.get(t, 0.0) for t in variant_tokens)
+            score   = round(covered / self.variant_weight[variant_id], 4)
+            if score > best.get(entry_id, 0.0):
+                best[entry_id] = score
+
+        ranked = sorted(
+            ((self.names[e], s) for e, s in best.items() if s >= 1.0 or s > min_score or e in always),
+            key=lambda item: (-item[1], item[0]),
+        )
+        return ranked[:k]
+
+    def lookup(self, query: str):
+        """(industry, record) for the best match, or (None, None)."""
+        hits = self.search(query, k=1)
+        if not hits:
+            return None, None
+        name = hits[0][0]
+        return name, self.table[name]
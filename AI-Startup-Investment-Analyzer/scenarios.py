@@ -0,0 +1,252 @@
+# ============================================================
+# scenarios.py — Vectorized ROI scenario engine
+# Evaluates whole grids / Monte Carlo samples of revenue, cost,
+# growth, churn and discount-rate assumptions in one NumPy call:
+# NPV, IRR, payback and 3-year profit per scenario, plus
+# percentile summaries. ROICalculatorTool wraps it so the
+# Financial Analyst gets the full picture from a single call.
+# No CrewAI imports here — NumPy only.
+# ============================================================
+
+import itertools
+
+import numpy as np
+
+
+DEFAULT_YEARS = 5
+MAX_YEARS = 30              # horizon cap for tool input; evaluate() cost no longer grows with it
+
+# Spread used when the caller gives only base revenue / cost.
+# (low, high) pairs are sampled uniformly; *_sd are relative normal spreads.
+DEFAULT_ASSUMPTIONS = {
+    "revenue_sd":    0.25,
+    "cost_sd":       0.15,
+    "growth":        (0.00, 0.40),
+    "churn":         (0.05, 0.25),
+    "discount_rate": (0.10, 0.15),
+}
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# IRR is solved by bisection on this bracket; 40 halvings ≈ 1e-11 width
+_IRR_LOW, _IRR_HIGH, _IRR_STEPS = -0.99, 10.0, 40
+# Below this |1 - x|, a geometric sum is taken from its series instead of (1 - x**n) / (1 - x)
+_GEOMETRIC_EPS = 1e-7
+
+
+# ── Core model ───────────────────────────────────────────────────────────────
+
+def cash_flows(revenue, cost, growth, churn, years: int = DEFAULT_YEARS, investment=None):
+    """
+    Cash flows, shape (n, years + 1). All inputs broadcast to n scenarios.
+
+    Year 0 is -investment (default: one year of cost, the same convention
+    as the payback figure ROICalculatorTool has always reported).
+    Year t revenue compounds by (1 + growth) * (1 - churn); cost stays flat.
+    """
+    revenue, cost, growth, churn = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (revenue, cost, growth, churn))
+    )
+    investment = cost if investment is None else np.broadcast_to(np.asarray(investment, dtype=float), cost.shape)
+    t       = np.arange(years, dtype=float)
+    factor  = ((1.0 + growth) * (1.0 - churn))[:, None] ** t
+    flows   = np.empty((revenue.size, years + 1))
+    flows[:, 0]  = -investment
+    flows[:, 1:] = revenue[:, None] * factor - cost[:, None]
+    return flows
+
+
+def npv(flows: np.ndarray, discount_rate) -> np.ndarray:
+    """Horner's rule in 1 / (1 + rate) — no per-year power arrays, IRR calls this a lot."""
+    rate = np.broadcast_to(np.asarray(discount_rate, dtype=float), flows.shape[:1])
+    d    = 1.0 / (1.0 + rate)
+    acc  = flows[:, -1].copy()
+    for t in range(flows.shape[1] - 2, -1, -1):
+        acc *= d
+        acc += flows[:, t]
+    return acc
+
+
+def _geometric(x, n: int):
+    """1 + x + ... + x**(n-1), elementwise; the series form near x = 1 avoids cancellation."""
+    near = np.abs(1.0 - x) < _GEOMETRIC_EPS
+    with np.errstate(divide="ignore", invalid="ignore"):
+        closed = (1.0 - x ** n) / (1.0 - x)
+    return np.where(near, n + 0.5 * n * (n - 1) * (x - 1.0), closed)
+
+
+def model_npv(revenue, cost, growth, churn, investment, years: int):
+    """
+    NPV(rate) for the cash_flows() model in closed form — two geometric
+    sums, so each evaluation costs the same whatever the horizon.
+    Inputs are the (n,) arrays cash_flows() broadcasts.
+    """
+    q = (1.0 + growth) * (1.0 - churn)
+
+    def at(rate):
+        d = 1.0 / (1.0 + np.asarray(rate, dtype=float))
+        return revenue * d * _geometric(q * d, years) - cost * d * _geometric(d, years) - investment
+
+    return at
+
+
+def irr(flows: np.ndarray, npv_at=None) -> np.ndarray:
+    """
+    Vectorized bisection on NPV(rate) = 0. NaN where the bracket holds no
+    sign change (e.g. the project never recovers its investment).
+    npv_at(rates) may stand in for npv(flows, rates) — evaluate() passes
+    the closed form, so the 40 steps don't each walk every year.
+    """
+    npv_at = npv_at or (lambda rate: npv(flows, rate))
+    n   = flows.shape[0]
+    lo  = np.full(n, _IRR_LOW)
+    hi  = np.full(n, _IRR_HIGH)
+    f_lo = npv_at(lo)
+    valid = np.sign(f_lo) != np.sign(npv_at(hi))
+    for _ in range(_IRR_STEPS):
+        mid   = 0.5 * (lo + hi)
+        f_mid = npv_at(mid)
+        left  = np.sign(f_mid) == np.sign(f_lo)
+        lo    = np.where(left, mid, lo)
+        f_lo  = np.where(left, f_mid, f_lo)
+        hi    = np.where(left, hi, mid)
+    return np.where(valid, 0.5 * (lo + hi), np.nan)
+
+
+def payback_months(flows: np.ndarray) -> np.ndarray:
+    """Months until cumulative cash turns non-negative, interpolated in-year. NaN if never."""
+    cumulative = np.cumsum(flows, axis=1)
+    recovered  = cumulative >= 0
+    ever       = recovered[:, 1:].any(axis=1)
+    year       = np.argmax(recovered[:, 1:], axis=1) + 1
+    rows       = np.arange(flows.shape[0])
+    before     = cumulative[rows, year - 1]
+    in_year    = flows[rows, year]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        months = 12.0 * (year - 1 + np.where(in_year > 0, -before / in_year, 0.0))
+    return np.where(ever, np.where(cumulative[:, 0] >= 0, 0.0, months), np.nan)
+
+
+def evaluate(revenue, cost, growth=0.0, churn=0.0, discount_rate=0.10,
+             years: int = DEFAULT_YEARS, investment=None) -> dict:
+    """Every metric for n broadcast scenarios, as arrays of shape (n,)."""
+    flows  = cash_flows(revenue, cost, growth, churn, years, investment)
+    shape  = flows.shape[:1]
+    inputs = [np.broadcast_to(np.atleast_1d(np.asarray(x, dtype=float)), shape) for x in (revenue, cost, growth, churn)]
+    npv_at = model_npv(*inputs, -flows[:, 0], years)
+    return {
+        "npv":            npv(flows, discount_rate),
+        "irr":            irr(flows, npv_at),
+        "payback_months": payback_months(flows),
+        "profit_3yr":     flows[:, 1:4].sum(axis=1),
+    }
+
+
+# ── Grids and sampling ───────────────────────────────────────────────────────
+
+def evaluate_grid(revenue, cost, growth=(0.0,), churn=(0.0,), discount_rate=(0.10,),
+                  years: int = DEFAULT_YEARS) -> dict:
+    """
+    Cartesian product of the given assumption lists, evaluated in one call.
+    Returns the input columns alongside the metric columns.
+    """
+    axes = [np.atleast_1d(np.asarray(a, dtype=float)) for a in (revenue, cost, growth, churn, discount_rate)]
+    mesh = [m.ravel() for m in np.meshgrid(*axes, indexing="ij")]
+    out  = dict(zip(("revenue", "cost", "growth", "churn", "discount_rate"), mesh))
+    out.update(evaluate(*mesh, years=years))
+    return out
+
+
+def _sample_range(rng, spec, n):
+    if isinstance(spec, (tuple, list)):
+        low, high = spec
+        if low > high:
+            raise ValueError(f"range {low}:{high} is reversed — give it as low:high")
+        return rng.uniform(low, high, n)
+    return np.full(n, float(spec))
+
+
+def monte_carlo(revenue: float, cost: float, n: int = 100_000, seed: int = 0,
+                years: int = DEFAULT_YEARS, **assumptions) -> dict:
+    """
+    Samples n scenarios around base revenue / cost and evaluates them at once.
+    Revenue and cost are normal with relative spreads revenue_sd / cost_sd
+    (floored at 0); growth, churn and discount_rate are a fixed value or a
+    (low, high) uniform range — ValueError if low > high. Seeded — same
+    inputs, same summary.
+    """
+    spec = {**DEFAULT_ASSUMPTIONS, **assumptions}
+    rng  = np.random.default_rng(seed)
+    rev  = np.maximum(rng.normal(revenue, abs(revenue) * spec["revenue_sd"], n), 0.0)
+    cst  = np.maximum(rng.normal(cost, abs(cost) * spec["cost_sd"], n), 1e-9)
+    grw  = _sample_range(rng, spec["growth"], n)
+    chn  = np.clip(_sample_range(rng, spec["churn"], n), 0.0, 1.0)
+    dsc  = _sample_range(rng, spec["discount_rate"], n)
+    return evaluate(rev, cst, grw, chn, dsc, years=years)
+
+
+def summarize(metrics: dict) -> dict:
+    """Percentiles per metric plus the odds that matter to an investor."""
+    summary = {}
+    for name, values in metrics.items():
+        finite = values[np.isfinite(values)]
+        summary[name] = (
+            {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(finite, PERCENTILES))}
+            if finite.size else {}
+        )
+    summary["p_npv_positive"]  = float(np.mean(metrics["npv"] > 0))
+    summary["p_payback_found"] = float(np.mean(np.isfinite(metrics["payback_months"])))
+    summary["samples"]         = int(metrics["npv"].size)
+    return summary
+
+
+# ── Tool-facing report ───────────────────────────────────────────────────────
+
+def _money(x: float) -> str:
+    return f"-${abs(x):,.0f}" if x < 0 else f"${x:,.0f}"
+
+
+def scenario_report(revenue: float, cost: float, n: int = 100_000, years: int = DEFAULT_YEARS,
+                    seed: int = 0, **assumptions) -> str:
+    """
+    Compact text for the agent: base case, a revenue × cost sensitivity
+    grid, and Monte Carlo percentiles — everything one tool call needs.
+    """
+    spec = {**DEFAULT_ASSUMPTIONS, **assumptions}
+    mid  = {k: (sum(v) / 2 if isinstance(v, (tuple, list)) else v)
+            for k, v in spec.items() if k in ("growth", "churn", "discount_rate")}
+
+    base = evaluate(revenue, cost, years=years, **mid)
+    base_irr = base["irr"][0]
+    base_pb  = base["payback_months"][0]
+    lines = [
+        f"Base case ({years}y, growth {mid['growth']:.0%}, churn {mid['churn']:.0%}, "
+        f"discount {mid['discount_rate']:.0%}): NPV {_money(base['npv'][0])} | "
+        f"IRR {'n/a' if np.isnan(base_irr) else f'{base_irr:.0%}'} | "
+        f"Payback {'never' if np.isnan(base_pb) else f'{base_pb:.1f} months'}",
+    ]
+
+    steps = (0.8, 1.0, 1.2)
+    grid  = evaluate_grid([revenue * s for s in steps], [cost * s for s in steps],
+                          mid["growth"], mid["churn"], mid["discount_rate"], years=years)
+    cells = [
+        f"rev{int(round((rs - 1) * 100)):+d}%/cost{int(round((cs - 1) * 100)):+d}%: {_money(v)}"
+        for (rs, cs), v in zip(itertools.product(steps, steps), grid["npv"])
+    ]
+    lines.append("NPV sensitivity: " + ", ".join(cells))
+
+    mc = summarize(monte_carlo(revenue, cost, n=n, seed=seed, years=years, **spec))
+    npv_p, irr_p, pb_p = mc["npv"], mc["irr"], mc["payback_months"]
+    lines.append(
+        f"Monte Carlo ({mc['samples']:,} samples): "
+        f"NPV P5/P50/P95 {_money(npv_p['p5'])} / {_money(npv_p['p50'])} / {_money(npv_p['p95'])} | "
+        f"P(NPV>0) {mc['p_npv_positive']:.0%}"
+    )
+    if irr_p:
+        lines.append(f"IRR P5/P50/P95 (where defined) {irr_p['p5']:.0%} / {irr_p['p50']:.0%} / {irr_p['p95']:.0%}")
+    if pb_p:
+        lines.append(
+            f"Payback P25/P50/P75 {pb_p['p25']:.1f} / {pb_p['p50']:.1f} / {pb_p['p75']:.1f} months | "
+            f"recovered within {years}y in {mc['p_payback_found']:.0%} of scenarios"
+        )
+    return "\n".join(lines)
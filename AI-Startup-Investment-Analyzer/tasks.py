@@ -23,10 +23,12 @@ JSON_SCHEMA = """{
 }"""
 
 
-def create_market_research_task(startup_idea: str, industry: str, agent) -> Task:
+def create_market_research_task(startup_idea: str, industry: str, agent,
+                                async_execution: bool = False) -> Task:
     """
     Assigns market research to the Market Research Specialist.
     Instructs the agent to call both market and competitor tools.
+    async_execution=True lets it run alongside the other specialists.
     """
     return Task(
         description=(
@@ -43,35 +45,43 @@ def create_market_research_task(startup_idea: str, industry: str, agent) -> Task
             "and top 3 market opportunities."
         ),
         agent=agent,
+        async_execution=async_execution,
     )
 
 
-def create_financial_task(startup_idea: str, revenue: float, cost: float, agent) -> Task:
+def create_financial_task(startup_idea: str, revenue: float, cost: float, agent,
+                          async_execution: bool = False) -> Task:
     """
     Assigns financial analysis to the Financial Analyst.
     Passes actual revenue and cost figures for ROI tool.
+    async_execution=True lets it run alongside the other specialists.
     """
     return Task(
         description=(
             f"Evaluate the financial viability of:\n'{startup_idea}'\n\n"
-            f"You MUST call the ROI Calculator tool with input: '{revenue},{cost}'\n"
+            f"You MUST call the ROI Calculator tool ONCE with input: '{revenue},{cost}'\n"
+            f"It returns the base case, an NPV sensitivity grid and Monte Carlo percentiles "
+            f"in one response — do not call it again with guessed variations.\n"
             f"Base all financial conclusions on the tool's output."
         ),
         expected_output=(
             "Financial analysis covering: "
             "ROI and payback period (from tool), "
+            "NPV / IRR range and probability of a positive NPV (from tool), "
             "unit economics, "
             "revenue model assessment, "
             "and 3-year financial outlook."
         ),
         agent=agent,
+        async_execution=async_execution,
     )
 
 
-def create_risk_task(startup_idea: str, agent) -> Task:
+def create_risk_task(startup_idea: str, agent, async_execution: bool = False) -> Task:
     """
     Assigns risk assessment to the Risk Analyst.
     No tools required — draws from domain knowledge and context.
+    async_execution=True lets it run alongside the other specialists.
     """
     return Task(
         description=(
@@ -87,6 +97,7 @@ def create_risk_task(startup_idea: str, agent) -> Task:
             "and overall risk score with justification."
         ),
         agent=agent,
+        async_execution=async_execution,
     )
 
 
@@ -0,0 +1,54 @@
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    # batch.py only needs run_startup_analysis from execution (which pulls in crewai)
+    execution = types.ModuleType("execution")
+    execution.run_startup_analysis = lambda startup_idea, **kw: {
+        "success": True, "data": {"final_decision": "Invest"}, "stage": "complete",
+    }
+    monkeypatch.setitem(sys.modules, "execution", execution)
+    monkeypatch.delitem(sys.modules, "batch", raising=False)
+    import batch
+    monkeypatch.setattr(batch, "_limiters", {})
+    return batch
+
+
+def test_row_without_idea_fails_alone(batch, tmp_path):
+    out = tmp_path / "results.jsonl"
+    records = batch.run_startup_batch(
+        ["A subscription app for indoor plant care", {"id": "bad", "industry": "AI SaaS"}],
+        model_id="groq/test", api_key="x", output_path=str(out), runs_per_minute=600,
+    )
+    by_id = {r["id"]: r for r in records}
+    assert by_id["bad"]["success"] is False and "startup_idea" in by_id["bad"]["error"]
+    assert sum(r["success"] for r in records) == 1
+    assert len(out.read_text().splitlines()) == 2
+
+
+def test_rate_limiter_follows_new_rate(batch):
+    first = batch.get_rate_limiter("groq/a", 6)
+    assert batch.get_rate_limiter("groq/b") is first and first.per_minute == 6
+    assert batch.get_rate_limiter("groq/a", 30) is first
+    assert first.per_minute == 30 and first.capacity == 30
+
+
+def test_bad_number_cell_fails_alone(batch, tmp_path):
+    src = tmp_path / "ideas.csv"
+    src.write_text(
+        "id,startup_idea,revenue,cost\n"
+        "ok,A marketplace for used lab equipment,\"$1,200\",300\n"
+        "bad,An AI tutor for welders,abc,100\n"
+    )
+    ideas = batch.load_ideas(str(src))
+    assert [i["id"] for i in ideas] == ["ok", "bad"]
+    assert ideas[0]["revenue"] == 1200.0
+
+    records = batch.run_startup_batch(ideas, model_id="groq/test", api_key="x", runs_per_minute=600)
+    by_id = {r["id"]: r for r in records}
+    assert by_id["ok"]["success"] is True
+    assert by_id["bad"]["success"] is False and "revenue" in by_id["bad"]["error"]
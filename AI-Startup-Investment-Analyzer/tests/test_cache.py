@@ -0,0 +1,47 @@
+import sqlite3
+
+import cache
+from cache import SQLiteCache, TieredCache, MemoryCache, as_cache_hit
+
+
+def test_sqlite_connections_are_closed(tmp_path, monkeypatch):
+    opened = []
+    real_connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(cache.sqlite3, "connect", tracking_connect)
+    disk = SQLiteCache(str(tmp_path / "c.sqlite3"))
+    disk.set("k", {"success": True})
+    assert disk.get("k") == {"success": True}
+    disk.clear()
+    assert disk.get("k") is None
+
+    assert len(opened) == 5
+    for conn in opened:
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            continue
+        raise AssertionError("connection left open")
+
+
+def test_cache_hit_reports_no_spend(tmp_path):
+    result = {
+        "success": True, "data": {"final_decision": "Invest"}, "attempts": 2,
+        "cost_estimate": {"total_tokens": 1800, "cost_usd": 0.0021, "source": "usage"},
+        "timings": {"total": 41.2}, "usage": {"total": {"total_tokens": 1800}}, "ttft_s": 1.3,
+        "cache_hit": False,
+    }
+    tiers = TieredCache(MemoryCache(), SQLiteCache(str(tmp_path / "c.sqlite3")))
+    tiers.set("k", result)
+
+    hit = as_cache_hit(tiers.get("k"))
+    assert hit["cache_hit"] is True and hit["data"] == result["data"]
+    assert hit["cost_estimate"]["cost_usd"] == 0 and hit["cost_estimate"]["total_tokens"] == 0
+    assert hit["usage"] == {} and hit["timings"] == {} and hit["attempts"] == 0
+    assert hit["cached_from"]["cost_estimate"] == result["cost_estimate"]
+    assert result["cost_estimate"]["cost_usd"] == 0.0021   # the stored entry is untouched
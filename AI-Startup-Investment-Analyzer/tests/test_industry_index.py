@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from industry_index import DATA_DIR, SEED_LIMIT, IndustryIndex
+
+WORDS = ["analytics", "cloud", "health", "retail", "legal", "energy", "travel", "gaming",
+         "payments", "security", "robotics", "insurance", "media", "supply", "fraud", "climate"]
+
+
+@pytest.fixture(scope="module")
+def market():
+    return IndustryIndex.from_file(os.path.join(DATA_DIR, "market_data.csv"))
+
+
+@pytest.fixture(scope="module")
+def large():
+    # "ai" sits in a few dozen names, so it is rare enough to carry real IDF weight
+    table = {f"{a.title()} {b.title()} {i}": {} for i in range(40) for a in WORDS for b in WORDS if a != b}
+    table.update({f"{w.title()} Ai": {} for w in WORDS})
+    table["HR Tech AI"] = {"aliases": ["hrtech"]}
+    return IndustryIndex(table)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("AI Fitness", "AI Fitness"),
+    ("AI fitness app for seniors", "AI Fitness"),
+    ("Helthtech", "HealthTech AI"),
+    ("proptech", "Real Estate AI"),
+    ("HR", "HR Tech AI"),
+    ("hr tech", "HR Tech AI"),
+])
+def test_market_lookups(market, query, expected):
+    assert market.lookup(query)[0] == expected
+
+
+@pytest.mark.parametrize("query", ["AI", "the best AI", "tech", "health", "xyzzy"])
+def test_market_non_matches(market, query):
+    assert market.lookup(query) == (None, None)
+
+
+def test_generic_words_do_not_match_in_a_large_table(large):
+    assert large.search("the best AI") == []
+    assert large.lookup("the best analytics ai platform")[0] == "Analytics Ai"
+    assert large.lookup("HR")[0] == "HR Tech AI"
+
+
+def test_seeding_postings_are_capped(large):
+    seeding = [t for t in large.postings if t not in large.common]
+    assert all(len(large.postings[t]) <= SEED_LIMIT for t in seeding)
+    assert "ai" in large.common and "analytics" in large.common
+
+
+@pytest.fixture(scope="module")
+def competitor():
+    return IndustryIndex.from_file(os.path.join(DATA_DIR, "competitor_data.csv"))
+
+
+@pytest.mark.parametrize("query", [
+    "health", "digital health", "health insurance", "AI health coach", "Health tech for seniors",
+])
+def test_half_of_an_alias_is_not_a_match(competitor, query):
+    # "health" is one of the two content tokens of AI Fitness's "health and fitness" alias
+    assert competitor.lookup(query) == (None, None)
+
+
+def test_whole_alias_still_matches(competitor):
+    assert competitor.lookup("health and fitness")[0] == "AI Fitness"
+    assert competitor.lookup("HR")[0] == "HR Tech AI"
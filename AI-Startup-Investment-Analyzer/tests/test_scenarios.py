@@ -0,0 +1,81 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+import scenarios
+
+
+@pytest.mark.parametrize("flows, expected", [
+    ([-100, 110], 0.10),
+    ([-100, 0, 121], 0.10),
+    ([-100, 60, 60], 0.130662),          # 60d + 60d² = 100 with d = 1 / (1 + r)
+    ([-1000, 0, 0, 1331], 0.10),
+])
+def test_irr_closed_form_cases(flows, expected):
+    assert scenarios.irr(np.array([flows], dtype=float))[0] == pytest.approx(expected, abs=1e-6)
+
+
+def test_irr_below_zero_and_undefined():
+    assert scenarios.irr(np.array([[-100.0, 10.0, 10.0]]))[0] == pytest.approx(-0.629844, abs=1e-6)
+    assert np.isnan(scenarios.irr(np.array([[-100.0, -10.0, -10.0]]))[0])
+
+
+def test_evaluate_base_case():
+    # investment = one year of cost (100), then 150 a year: payback 100/150 of a year
+    m = scenarios.evaluate(250, 100, years=3, discount_rate=0.0)
+    assert m["npv"][0] == pytest.approx(350)
+    assert m["payback_months"][0] == pytest.approx(8.0)
+    assert m["profit_3yr"][0] == pytest.approx(450)
+    assert m["irr"][0] == pytest.approx(scenarios.irr(scenarios.cash_flows(250, 100, 0, 0, 3))[0])
+
+    never = scenarios.evaluate(90, 100, years=5)
+    assert np.isnan(never["irr"][0]) and np.isnan(never["payback_months"][0])
+
+
+def test_closed_form_irr_matches_cash_flows():
+    rng = np.random.default_rng(3)
+    n = 2000
+    revenue, cost = rng.uniform(1e5, 6e5, n), rng.uniform(1e5, 3e5, n)
+    growth, churn = rng.uniform(0, 0.4, n), rng.uniform(0, 0.3, n)
+    for years in (1, 5, scenarios.MAX_YEARS):
+        fast = scenarios.evaluate(revenue, cost, growth, churn, years=years)["irr"]
+        slow = scenarios.irr(scenarios.cash_flows(revenue, cost, growth, churn, years))
+        np.testing.assert_allclose(fast, slow, atol=1e-9)
+
+
+def test_reversed_range_is_rejected():
+    with pytest.raises(ValueError, match="reversed"):
+        scenarios.monte_carlo(500000, 150000, n=100, growth=(0.3, 0.1))
+
+
+@pytest.fixture
+def roi_tool(monkeypatch):
+    # tools.py only needs BaseTool from crewai
+    crewai = types.ModuleType("crewai")
+    crewai_tools = types.ModuleType("crewai.tools")
+    crewai_tools.BaseTool = type("BaseTool", (), {})
+    crewai.tools = crewai_tools
+    monkeypatch.setitem(sys.modules, "crewai", crewai)
+    monkeypatch.setitem(sys.modules, "crewai.tools", crewai_tools)
+    monkeypatch.delitem(sys.modules, "tools", raising=False)
+    import tools
+    return tools.ROICalculatorTool()
+
+
+def test_parse_assumptions(roi_tool):
+    revenue, cost, years, assumptions = roi_tool._parse("500000, 150000, growth=0.1:0.3, churn=0.1, discount=0.12")
+    assert (revenue, cost, years) == (500000.0, 150000.0, scenarios.DEFAULT_YEARS)
+    assert assumptions == {"growth": (0.1, 0.3), "churn": 0.1, "discount_rate": 0.12}
+    assert roi_tool._parse("1,1,years=99")[2] == scenarios.MAX_YEARS
+    assert roi_tool._parse("1,1,YEARS=0")[2] == 1
+    with pytest.raises(ValueError, match="unknown assumption"):
+        roi_tool._parse("500000,150000,tax=0.2")
+
+
+def test_tool_reports_input_errors(roi_tool):
+    assert roi_tool._run("500000,150000,growth=0.3:0.1").startswith("Input error: range 0.3:0.1 is reversed")
+    assert roi_tool._run("500000").startswith("Input error")
+    report = roi_tool._run("500000,150000,years=30")
+    assert report.startswith("ROI: 233.3%") and "Monte Carlo (100,000 samples)" in report
@@ -0,0 +1,44 @@
+import json
+
+from utils import extract_json_safe, scan_json_object
+
+PAYLOAD = {"market_score": 7, "final_decision": "Invest", "recommended_actions": ["a", "b"]}
+
+
+def test_span_indexes_the_original_text():
+    text = "Here you go:\n```json\n" + json.dumps(PAYLOAD) + "\n```\nThanks."
+    data, span = extract_json_safe(text)
+    assert data == PAYLOAD
+    assert json.loads(text[span[0]:span[1]]) == PAYLOAD
+
+
+def test_trailing_commas_repaired():
+    data, _ = extract_json_safe('{"a": [1, 2,], "b": 3,}')
+    assert data == {"a": [1, 2], "b": 3}
+
+
+def test_empty_object_does_not_shadow_a_later_one():
+    text = "Schema: {} then the answer " + json.dumps(PAYLOAD)
+    assert extract_json_safe(text)[0] == PAYLOAD
+    assert extract_json_safe("only {} here") == ({}, (5, 7))
+
+
+def test_failure_preview_comes_from_the_span():
+    prose = "x" * 1000
+    text = prose + ' {"market_score": 7, "final_decision": '   # truncated
+    data, span = extract_json_safe(text)
+    assert "error" in data
+    assert span == (1001, len(text))
+    assert data["raw_preview"] == text[1001:]
+
+
+def test_failure_without_any_object():
+    data, span = extract_json_safe("no json {here}")
+    assert span is None and data["raw_preview"] == "no json {here}"
+    assert extract_json_safe("")[0]["raw_preview"] == "empty output"
+
+
+def test_required_key_skips_other_objects():
+    text = '{"note": 1} {"final_decision": "Pass"}'
+    parsed, span = scan_json_object(text, required_key="final_decision")
+    assert parsed == {"final_decision": "Pass"} and span[0] == 12
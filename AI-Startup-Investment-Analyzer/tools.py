@@ -4,9 +4,29 @@
 # Agents receive tool instances — never raw functions.
 # ============================================================
 
+import os
+
 from crewai.tools import BaseTool
 from typing import ClassVar, Dict
 
+import scenarios
+from industry_index import DATA_DIR, IndustryIndex, load_table
+
+
+# Datasets live in data/; point these env vars at another CSV/JSON to swap them.
+MARKET_DATA_PATH     = os.environ.get("MARKET_DATA_PATH", os.path.join(DATA_DIR, "market_data.csv"))
+COMPETITOR_DATA_PATH = os.environ.get("COMPETITOR_DATA_PATH", os.path.join(DATA_DIR, "competitor_data.csv"))
+
+
+def _no_match_hint(index: IndustryIndex, industry: str, limit: int = 10) -> str:
+    """Closest weak matches if any, else the first `limit` known industries."""
+    near = [name for name, _ in index.search(industry, k=3, min_score=0.3)]
+    if near:
+        return f"Closest: {', '.join(near)}"
+    names = index.names[:limit]
+    more  = f" (+{len(index.names) - limit} more)" if len(index.names) > limit else ""
+    return f"Available industries: {', '.join(names)}{more}"
+
 
 class MarketSizeTool(BaseTool):
     """
@@ -20,49 +40,60 @@ class MarketSizeTool(BaseTool):
         "Input: industry name as a string."
     )
 
-    MARKET_DATA: ClassVar[Dict] = {
-        "AI Fitness":       {"size": "$22B", "cagr": "28%", "players": "Whoop, Noom, Future"},
-        "Real Estate AI":   {"size": "$18B", "cagr": "32%", "players": "Zillow, CoStar, Reonomy"},
-        "AI Marketing":     {"size": "$107B","cagr": "35%", "players": "Jasper, Copy.ai, AdCreative"},
-        "AI SaaS":          {"size": "$115B","cagr": "38%", "players": "Salesforce Einstein, HubSpot AI"},
-        "EdTech AI":        {"size": "$31B", "cagr": "22%", "players": "Coursera, Duolingo, Khanmigo"},
-        "HealthTech AI":    {"size": "$45B", "cagr": "41%", "players": "Tempus, Viz.ai, Babylon"},
-        "FinTech AI":       {"size": "$78B", "cagr": "29%", "players": "Stripe, Plaid, Brex"},
-        "LegalTech AI":     {"size": "$12B", "cagr": "26%", "players": "Clio, ContractPodAi, Harvey"},
-        "Logistics AI":     {"size": "$75B", "cagr": "14%", "players": "Flexport, project44, FourKites"},
-        "HR Tech AI":       {"size": "$28B", "cagr": "19%", "players": "Workday, Greenhouse, Lever"},
-    }
+    MARKET_DATA:  ClassVar[Dict]          = load_table(MARKET_DATA_PATH)
+    MARKET_INDEX: ClassVar[IndustryIndex] = IndustryIndex(MARKET_DATA)
 
     def _run(self, industry: str) -> str:
-        for key, val in self.MARKET_DATA.items():
-            if key.lower() in industry.lower() or industry.lower() in key.lower():
-                return (
-                    f"Industry: {key} | "
-                    f"Global TAM: {val['size']} | "
-                    f"CAGR: {val['cagr']} | "
-                    f"Key Players: {val['players']}"
-                )
-        keys = ", ".join(self.MARKET_DATA.keys())
-        return f"No data for '{industry}'. Available industries: {keys}"
+        key, val = self.MARKET_INDEX.lookup(industry)
+        if key is None:
+            return f"No data for '{industry}'. {_no_match_hint(self.MARKET_INDEX, industry)}"
+        return (
+            f"Industry: {key} | "
+            f"Global TAM: {val['size']} | "
+            f"CAGR: {val['cagr']} | "
+            f"Key Players: {val['players']}"
+        )
 
 
 class ROICalculatorTool(BaseTool):
     """
-    Calculates ROI, payback period, and 3-year projection.
-    Strategist calls this before making financial recommendations.
+    Calculates ROI, payback period, and 3-year projection, then runs the
+    vectorized scenario engine (scenarios.py) over the same inputs so one
+    call returns NPV / IRR / payback distributions — no per-guess calls.
     """
     name: str = "ROI Calculator"
     description: str = (
         "Calculates return on investment (ROI %), payback period in months, "
-        "profit margin, and 3-year net profit projection. "
-        "Input format: 'revenue,cost' as comma-separated numbers (e.g. '500000,150000')."
+        "profit margin, and 3-year net profit projection, plus NPV, IRR and payback "
+        "across a revenue/cost sensitivity grid and 100,000 Monte Carlo scenarios. "
+        "Call it ONCE — every scenario comes back in a single response. "
+        "Input format: 'revenue,cost' as comma-separated numbers (e.g. '500000,150000'). "
+        "Optional assumptions may follow as key=value, a range as low:high — "
+        "growth, churn, discount, years (e.g. '500000,150000,growth=0.1:0.3,churn=0.1')."
     )
 
+    ASSUMPTION_KEYS: ClassVar[Dict] = {"growth": "growth", "churn": "churn", "discount": "discount_rate"}
+
+    def _parse(self, inputs: str) -> tuple:
+        parts   = [p for p in inputs.replace(" ", "").split(",") if p]
+        revenue = float(parts[0])
+        cost    = float(parts[1])
+        years, assumptions = scenarios.DEFAULT_YEARS, {}
+        for part in parts[2:]:
+            key, _, value = part.partition("=")
+            key = key.lower()
+            if key == "years":
+                years = max(1, min(int(float(value)), scenarios.MAX_YEARS))
+            elif key in self.ASSUMPTION_KEYS:
+                bounds = [float(v) for v in value.split(":")]
+                assumptions[self.ASSUMPTION_KEYS[key]] = tuple(bounds) if len(bounds) == 2 else bounds[0]
+            else:
+                raise ValueError(f"unknown assumption '{key}'")
+        return revenue, cost, years, assumptions
+
     def _run(self, inputs: str) -> str:
         try:
-            parts = inputs.replace(" ", "").split(",")
-            revenue = float(parts[0])
-            cost    = float(parts[1])
+            revenue, cost, years, assumptions = self._parse(inputs)
             if cost <= 0:
                 return "Error: cost must be greater than 0"
             roi            = round(((revenue - cost) / cost) * 100, 1)
@@ -74,10 +105,14 @@ class ROICalculatorTool(BaseTool):
                 f"ROI: {roi}% | "
                 f"Payback Period: {payback_str} | "
                 f"Profit Margin: {profit_margin}% | "
-                f"3-Year Net Profit: ${net_3yr:,.0f}"
+                f"3-Year Net Profit: ${net_3yr:,.0f}\n"
+                + scenarios.scenario_report(revenue, cost, years=years, **assumptions)
+            )
+        except (IndexError, ValueError, ZeroDivisionError) as e:
+            return (
+                f"Input error: {str(e)}. Expected format: 'revenue,cost' (e.g. '500000,150000'), "
+                "optionally followed by growth=, churn=, discount=, years="
             )
-        except (IndexError, ValueError) as e:
-            return f"Input error: {str(e)}. Expected format: 'revenue,cost' (e.g. '500000,150000')"
 
 
 class CompetitorIntelTool(BaseTool):
@@ -91,25 +126,17 @@ class CompetitorIntelTool(BaseTool):
         "Input: industry name as a string."
     )
 
-    COMPETITOR_DATA: ClassVar[Dict] = {
-        "AI Fitness":     {"comps": "Future $149/mo, Noom $70/mo, Whoop $30/mo",    "gap": "No B2B/corporate wellness focus"},
-        "Real Estate AI": {"comps": "Reonomy $500/mo, CoStar $1200/mo",             "gap": "Too expensive for independent investors"},
-        "AI Marketing":   {"comps": "Jasper $49/mo, Copy.ai $49/mo",               "gap": "None specialized for DTC product catalog workflows"},
-        "AI SaaS":        {"comps": "Harvey (custom), Clio $39/mo",                "gap": "Harvey priced out of solo lawyers — underserved segment"},
-        "LegalTech AI":   {"comps": "Clio $39/mo, Harvey (custom), Ironclad (custom)", "gap": "No mid-market between cheap and enterprise"},
-        "Logistics AI":   {"comps": "project44 (custom), Flexport (custom)",        "gap": "SMB logistics companies underserved by enterprise pricing"},
-        "HR Tech AI":     {"comps": "Greenhouse $6K/yr, Lever (custom)",            "gap": "SMB hiring teams can't afford enterprise ATS"},
-        "FinTech AI":     {"comps": "Mint (free), YNAB $14/mo, Copilot $13/mo",    "gap": "No proactive AI intervention — all reactive dashboards"},
-    }
+    COMPETITOR_DATA:  ClassVar[Dict]          = load_table(COMPETITOR_DATA_PATH)
+    COMPETITOR_INDEX: ClassVar[IndustryIndex] = IndustryIndex(COMPETITOR_DATA)
 
     def _run(self, industry: str) -> str:
-        for key, val in self.COMPETITOR_DATA.items():
-            if key.lower() in industry.lower() or industry.lower() in key.lower():
-                return (
-                    f"Competitors: {val['comps']} | "
-                    f"Market Gap: {val['gap']}"
-                )
-        return f"No competitor data for '{industry}'."
+        key, val = self.COMPETITOR_INDEX.lookup(industry)
+        if key is None:
+            return f"No competitor data for '{industry}'. {_no_match_hint(self.COMPETITOR_INDEX, industry)}"
+        return (
+            f"Competitors: {val['comps']} | "
+            f"Market Gap: {val['gap']}"
+        )
 
 
 # ── Tool registry — used by crew_setup.py to assign tools to agents ──────────
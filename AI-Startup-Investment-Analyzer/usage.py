@@ -0,0 +1,190 @@
+# ============================================================
+# usage.py — Token usage accounting + cost
+# Reads the real prompt/completion token counters CrewAI keeps
+# on each agent's LLM, snapshots them around every kickoff
+# attempt, and prices them with a per-model table.
+# No CrewAI imports here — counters are read by attribute.
+# ============================================================
+
+import csv
+import io
+
+
+# USD per 1M tokens (input, output) — list prices, paid tier.
+# Free-tier calls still report real tokens; cost is what the same run would bill.
+PRICE_TABLE = {
+    "gemini/gemini-2.5-flash":                    (0.30,  2.50),
+    "gemini/gemini-2.5-flash-preview-04-17":      (0.15,  0.60),
+    "gemini/gemini-2.5-flash-lite-preview-06-17": (0.10,  0.40),
+    "gemini/gemini-2.0-flash":                    (0.10,  0.40),
+    "gemini/gemini-1.5-flash":                    (0.075, 0.30),
+    "groq/llama-3.3-70b-versatile":               (0.59,  0.79),
+    "groq/llama-3.1-8b-instant":                  (0.05,  0.08),
+    "groq/mixtral-8x7b-32768":                    (0.24,  0.24),
+}
+DEFAULT_PRICE = (0.30, 2.50)
+
+_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens", "requests")
+
+
+def price_for(model_id: str) -> tuple:
+    """(input, output) USD per 1M tokens. Unknown models fall back to DEFAULT_PRICE."""
+    return PRICE_TABLE.get(model_id, DEFAULT_PRICE)
+
+
+def cost_usd(model_id: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price_in, price_out = price_for(model_id)
+    return round((prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000, 6)
+
+
+def _zero() -> dict:
+    return {f: 0 for f in _FIELDS}
+
+
+def read_usage(source) -> dict:
+    """
+    Normalizes any CrewAI usage object to a plain dict.
+    Accepts UsageMetrics (crew_output.token_usage, llm.get_token_usage_summary())
+    or a plain dict with the same keys.
+    """
+    if source is None:
+        return _zero()
+    get = source.get if isinstance(source, dict) else (lambda k, d=0: getattr(source, k, d))
+    prompt     = int(get("prompt_tokens", 0) or 0)
+    completion = int(get("completion_tokens", 0) or 0)
+    return {
+        "prompt_tokens":     prompt,
+        "completion_tokens": completion,
+        "total_tokens":      int(get("total_tokens", 0) or 0) or prompt + completion,
+        "requests":          int(get("successful_requests", 0) or get("requests", 0) or 0),
+    }
+
+
+def agent_usage(agent) -> dict:
+    """
+    Cumulative usage for one agent.
+    Newer CrewAI tracks it on the LLM instance; older builds on agent._token_process.
+    """
+    llm = getattr(agent, "llm", None)
+    if hasattr(llm, "get_token_usage_summary"):
+        try:
+            return read_usage(llm.get_token_usage_summary())
+        except Exception:
+            pass
+    process = getattr(agent, "_token_process", None)
+    if hasattr(process, "get_summary"):
+        try:
+            return read_usage(process.get_summary())
+        except Exception:
+            pass
+    return _zero()
+
+
+def _diff(after: dict, before: dict) -> dict:
+    # Counters that went backwards were reset by CrewAI — the new value is the delta
+    if after["total_tokens"] < before["total_tokens"]:
+        return dict(after)
+    return {f: after[f] - before[f] for f in _FIELDS}
+
+
+def _add(a: dict, b: dict) -> dict:
+    return {f: a[f] + b[f] for f in _FIELDS}
+
+
+class UsageTracker:
+    """
+    Attributes token usage per agent, per task and per kickoff attempt.
+
+    Each agent must own its LLM instance (crew_setup's llm_factory) —
+    agents sharing one LLM share one counter and can't be told apart.
+    Call record_attempt() after every kickoff, successful or not.
+    """
+
+    def __init__(self, crew, model_id: str):
+        self.crew      = crew
+        self.model_id  = model_id
+        self.by_agent  = {}
+        self.attempts  = []
+        self._previous = self._snapshot()
+
+    def _agents(self) -> dict:
+        agents = {}
+        for agent in getattr(self.crew, "agents", []):
+            agents[getattr(agent, "role", str(id(agent)))] = agent
+        return agents
+
+    def _snapshot(self) -> dict:
+        return {role: agent_usage(agent) for role, agent in self._agents().items()}
+
+    def record_attempt(self, attempt: int, success: bool, crew_output=None):
+        """Diffs every agent's counters against the last snapshot."""
+        current = self._snapshot()
+        total   = _zero()
+        for role, after in current.items():
+            delta = _diff(after, self._previous.get(role, _zero()))
+            self.by_agent[role] = _add(self.by_agent.get(role, _zero()), delta)
+            total = _add(total, delta)
+        # No per-agent counters on this CrewAI build — fall back to the crew total
+        if total["total_tokens"] == 0 and crew_output is not None:
+            total = read_usage(getattr(crew_output, "token_usage", None))
+        self._previous = current
+        self.attempts.append({
+            "attempt":  len(self.attempts) + 1,
+            "success":  success,
+            **total,
+            "cost_usd": cost_usd(self.model_id, total["prompt_tokens"], total["completion_tokens"]),
+        })
+
+    def report(self) -> dict:
+        """Aggregated usage — what run_startup_analysis returns under "usage"."""
+        by_agent = {
+            role: {**u, "cost_usd": cost_usd(self.model_id, u["prompt_tokens"], u["completion_tokens"])}
+            for role, u in self.by_agent.items()
+        }
+        by_task = {}
+        for i, task in enumerate(getattr(self.crew, "tasks", []), 1):
+            role = getattr(getattr(task, "agent", None), "role", None)
+            if role in by_agent:
+                by_task[f"{i}. {getattr(task, 'name', None) or role}"] = by_agent[role]
+
+        total = _zero()
+        for a in self.attempts:
+            total = _add(total, {f: a[f] for f in _FIELDS})
+        price_in, price_out = price_for(self.model_id)
+        return {
+            "model":      self.model_id,
+            "price_per_1m_tokens": {"input": price_in, "output": price_out},
+            "by_agent":   by_agent,
+            "by_task":    by_task,
+            "by_attempt": list(self.attempts),
+            "total":      {**total, "cost_usd": cost_usd(self.model_id, total["prompt_tokens"], total["completion_tokens"])},
+        }
+
+
+def usage_report_csv(report: dict) -> str:
+    """Flattens a usage report to CSV text — one row per agent, task, attempt, plus the total."""
+    buf    = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["scope", "name", *_FIELDS, "cost_usd"])
+    for scope in ("by_agent", "by_task"):
+        for name, u in report.get(scope, {}).items():
+            writer.writerow([scope[3:], name, *(u[f] for f in _FIELDS), u["cost_usd"]])
+    for a in report.get("by_attempt", []):
+        writer.writerow(["attempt", a["attempt"], *(a[f] for f in _FIELDS), a["cost_usd"]])
+    total = report.get("total")
+    if total:
+        writer.writerow(["total", report.get("model", ""), *(total[f] for f in _FIELDS), total["cost_usd"]])
+    return buf.getvalue()
+
+
+def cost_summary(report: dict, attempts: int) -> dict:
+    """Same keys as utils.estimate_cost(), filled from real usage."""
+    total = report["total"]
+    return {
+        "input_tokens":  total["prompt_tokens"],
+        "output_tokens": total["completion_tokens"],
+        "total_tokens":  total["total_tokens"],
+        "attempts":      attempts,
+        "cost_usd":      total["cost_usd"],
+        "source":        "usage",
+    }
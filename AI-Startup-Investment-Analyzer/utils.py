@@ -5,8 +5,10 @@
 # ============================================================
 
 import json
+import random
 import re
 import time
+from email.utils import parsedate_to_datetime
 
 
 # ── Input validation ─────────────────────────────────────────────────────────
@@ -32,38 +34,107 @@ def validate_input(text: str, min_len: int = 30) -> tuple:
 
 # ── JSON extraction ───────────────────────────────────────────────────────────
 
-def extract_json_safe(text: str) -> dict:
+# The single-file apps (AI-Startup-Due-Diligence-System, AI-Venture-Decision-Engine
+# and its Production-Safe version) carry verbatim copies of this section — change
+# them together.
+
+# Structural tokens only: a complete string literal, a brace/bracket/comma,
+# or a markdown fence. The string branch can't overlap the others, so the
+# regex never backtracks — the scan stays linear in len(text).
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\],]|```(?:json)?')
+# A JSON object opens with { then a key or }. Prose braces like "{note}"
+# are rejected here, in C, before any tokenizing.
+_JSON_START = re.compile(r'\{\s*["}]')
+
+
+def scan_json_object(text: str, required_key: str = None) -> tuple:
     """
-    Two-pass JSON extraction from LLM output.
+    Single-pass, brace-balanced scan for the outermost JSON object.
+    Returns (parsed: dict | None, span: (start, end) | None).
 
-    Pass 1: Strip markdown fences, find outermost braces, parse directly.
-    Pass 2: Fix common LLM issues (trailing commas, structural noise).
+    Repairs inline while scanning — trailing commas before } or ] are
+    dropped and markdown fences inside the object are skipped — so the
+    candidate is parsed exactly once. Balanced candidates that still fail
+    to parse (or lack required_key) are skipped and the scan resumes after
+    them, never re-reading text. An empty {} is only returned when no
+    non-empty object follows. span indexes the original text; on failure
+    it is the first candidate tried (to the end of text if truncated),
+    for previews, or None when the text holds no object at all.
+    """
+    if not text:
+        return None, None
+    first = empty = None
+    m = _JSON_START.search(text)
+    while m:
+        start = m.start()
+        out, depth, last, pending_comma = [], 0, start, None
+        end = None
+        for tok in _JSON_TOKEN.finditer(text, start):
+            t = tok.group()
+            between = text[last:tok.start()]
+            if pending_comma is not None:
+                # Comma directly followed by } or ] — trailing, drop it
+                if not (t in "}]" and not between.strip()):
+                    out.append(",")
+                pending_comma = None
+            out.append(between)
+            last = tok.end()
+            if t == ",":
+                pending_comma = tok.start()
+                continue
+            if t.startswith("```"):
+                continue
+            out.append(t)
+            if t in "{[":
+                depth += 1
+            elif t in "}]":
+                depth -= 1
+                if depth == 0:
+                    end = tok.end()
+                    break
+        if end is None:
+            first = first or (start, len(text))
+            break                      # unbalanced to end of text — truncated output
+        first = first or (start, end)
+        try:
+            parsed = json.loads("".join(out))
+            if isinstance(parsed, dict) and (required_key is None or required_key in parsed):
+                if parsed:
+                    return parsed, (start, end)
+                empty = empty or (start, end)
+        except json.JSONDecodeError:
+            pass
+        m = _JSON_START.search(text, end)
+    if empty:
+        return {}, empty
+    return None, first
 
-    Never raises — returns {"error": ...} on total failure.
-    Never call json.loads() directly on LLM output.
+
+def extract_json_safe(text: str) -> tuple:
     """
-    match = None
-    try:
-        cleaned = re.sub(r'```json\s*', '', text)
-        cleaned = re.sub(r'```\s*', '', cleaned)
-        match   = re.search(r'\{.*\}', cleaned, re.DOTALL)
-        if match:
-            return json.loads(match.group())
-    except (json.JSONDecodeError, Exception):
-        pass
+    JSON extraction from LLM output via scan_json_object().
+    Returns (data, span) — span is the (start, end) of the object in text.
 
-    try:
-        if match:
-            fixed = re.sub(r',\s*}', '}', match.group())
-            fixed = re.sub(r',\s*]', ']', fixed)
-            return json.loads(fixed)
-    except Exception:
-        pass
+    One linear pass: finds the outermost balanced object, strips fences
+    and trailing commas inline, parses once.
 
+    Never raises — data is {"error": ..., "raw_preview": ...} on total
+    failure, the preview cut from the span the scanner stopped at.
+    Never call json.loads() directly on LLM output.
+    """
+    parsed, span = scan_json_object(text)
+    if parsed is not None:
+        return parsed, span
+    if not text:
+        preview = "empty output"
+    elif span:
+        preview = text[span[0]:span[1]][:400]
+    else:
+        preview = text[:400]
     return {
-        "error": "JSON extraction failed after two passes",
-        "raw_preview": text[:400] if text else "empty output",
-    }
+        "error": "JSON extraction failed — no parseable object found",
+        "raw_preview": preview,
+    }, span
 
 
 # ── Output validation ─────────────────────────────────────────────────────────
@@ -136,25 +207,203 @@ def all_passed(validation_results: list) -> bool:
     return all(r[3] for r in validation_results)
 
 
+# ── Retry policy ──────────────────────────────────────────────────────────────
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+PERMANENT_STATUS = {400, 401, 403, 404, 413, 422}
+
+# litellm / provider SDK exception class names — matched by name so this
+# module stays import-free.
+RETRYABLE_ERRORS = {
+    "RateLimitError", "Timeout", "APITimeoutError", "APIConnectionError",
+    "ServiceUnavailableError", "InternalServerError", "TimeoutError",
+    "ConnectionError", "ResourceExhausted",
+}
+PERMANENT_ERRORS = {
+    "AuthenticationError", "PermissionDeniedError", "BadRequestError",
+    "NotFoundError", "UnprocessableEntityError", "ContextWindowExceededError",
+    "ContentPolicyViolationError", "ValidationError", "InvalidArgument",
+}
+
+
+def _error_chain(exc) -> list:
+    """The exception plus its __cause__ / __context__ chain — CrewAI wraps provider errors."""
+    chain, seen = [], set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        chain.append(exc)
+        exc = exc.__cause__ or exc.__context__
+    return chain
+
+
+def _status_code(exc):
+    for attr in ("status_code", "http_status", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def classify_error(exc) -> str:
+    """
+    Returns "retryable" or "permanent".
+    Checks status codes, then exception class names, then message text.
+    Anything unrecognized counts as retryable — same as the old behaviour.
+    """
+    for e in _error_chain(exc):
+        status = _status_code(e)
+        if status in RETRYABLE_STATUS:
+            return "retryable"
+        if status in PERMANENT_STATUS:
+            return "permanent"
+        names = {cls.__name__ for cls in type(e).__mro__}
+        if names & RETRYABLE_ERRORS:
+            return "retryable"
+        if names & PERMANENT_ERRORS:
+            return "permanent"
+
+    msg = str(exc).lower()
+    if any(s in msg for s in ("429", "rate limit", "rate_limit", "resource_exhausted",
+                              "timed out", "timeout", "503", "overloaded", "unavailable")):
+        return "retryable"
+    if any(s in msg for s in ("401", "403", "invalid api key", "api_key_invalid",
+                              "invalid_api_key", "permission denied", "unauthorized")):
+        return "permanent"
+    return "retryable"
+
+
+def _parse_duration(value: str):
+    """'27', '1.5s', '250ms', '2m59.56s' or an HTTP-date → seconds."""
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+    if parts and "".join(n + u for n, u in parts) == value.replace(" ", ""):
+        scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(n) * scale[u] for n, u in parts)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def retry_after_seconds(exc):
+    """
+    Server-requested wait, if the provider sent one.
+    Looks at Retry-After / retry-after-ms / x-ratelimit-reset-* headers (OpenAI-style,
+    Groq), then the retryDelay field Gemini embeds in its 429 body.
+    """
+    for e in _error_chain(exc):
+        headers = getattr(getattr(e, "response", None), "headers", None) or getattr(e, "headers", None)
+        if headers:
+            headers = {str(k).lower(): v for k, v in dict(headers).items()}
+            if "retry-after-ms" in headers:
+                wait = _parse_duration(headers["retry-after-ms"])
+                if wait is not None:
+                    return wait / 1000.0
+            for key in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+                if key in headers:
+                    wait = _parse_duration(headers[key])
+                    if wait is not None:
+                        return wait
+    match = re.search(r'retry_?delay["\']?\s*[:=]\s*["\']?(\d+(?:\.\d+)?)s', str(exc), re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, server Retry-After honoured,
+    permanent errors failing fast, and an optional overall deadline.
+
+    Full jitter — sleep = uniform(0, min(max_delay, base_delay * 2**(attempt-1))) —
+    spreads concurrent workers out instead of retrying in lockstep.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 2.0,
+                 max_delay: float = 60.0, deadline: float = None):
+        self.max_attempts = max_attempts
+        self.base_delay   = base_delay
+        self.max_delay    = max_delay
+        self.deadline     = deadline
+
+    def should_retry(self, exc) -> bool:
+        return classify_error(exc) == "retryable"
+
+    def backoff(self, attempt: int, exc=None) -> float:
+        """Seconds to wait after failed attempt number `attempt` (1-based)."""
+        server_wait = retry_after_seconds(exc) if exc is not None else None
+        if server_wait is not None:
+            # Small jitter on top so workers told the same reset time don't collide
+            return min(self.max_delay, server_wait + random.uniform(0, self.base_delay))
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
 # ── Retry wrapper ─────────────────────────────────────────────────────────────
 
-def safe_kickoff(crew, retries: int = 3, delay: float = 2.0) -> tuple:
+def safe_kickoff(crew, retries: int = 3, delay: float = 2.0,
+                 policy: RetryPolicy = None, on_attempt=None) -> tuple:
     """
     Retry-wrapped crew execution.
     Returns (result_or_error, attempts_used: int, success: bool).
 
+    policy defaults to RetryPolicy(max_attempts=retries, base_delay=delay).
+    Permanent errors (auth, validation) return immediately; retryable ones
+    back off with jitter until attempts or the policy deadline run out.
+    on_attempt(attempt, success, result_or_error) fires after every attempt.
+
     Logs nothing — caller is responsible for UI feedback.
     """
+    policy     = policy or RetryPolicy(max_attempts=retries, base_delay=delay)
+    started    = time.monotonic()
     last_error = None
-    for attempt in range(1, retries + 1):
+    for attempt in range(1, policy.max_attempts + 1):
         try:
             result = crew.kickoff()
-            return result, attempt, True
         except Exception as e:
             last_error = e
-            if attempt < retries:
-                time.sleep(delay)
-    return last_error, retries, False
+            if on_attempt:
+                on_attempt(attempt, False, e)
+            if attempt >= policy.max_attempts or not policy.should_retry(e):
+                return last_error, attempt, False
+            wait = policy.backoff(attempt, e)
+            if policy.deadline is not None and time.monotonic() - started + wait > policy.deadline:
+                return last_error, attempt, False
+            time.sleep(wait)
+            continue
+        if on_attempt:
+            on_attempt(attempt, True, result)
+        return result, attempt, True
+    return last_error, policy.max_attempts, False
+
+
+# ── Task timings ──────────────────────────────────────────────────────────────
+
+def task_timings(tasks: list, kickoff_seconds: float = None) -> dict:
+    """
+    Per-task wall-clock seconds, keyed by the assigned agent's role.
+    Reads the start_time / end_time CrewAI stamps on each task —
+    tasks that never ran (or older CrewAI builds) are simply omitted.
+
+    kickoff_seconds, if given, is reported as "total".
+    Pure attribute reads — no CrewAI import needed.
+    """
+    timings = {}
+    for task in tasks:
+        start = getattr(task, "start_time", None)
+        end   = getattr(task, "end_time", None)
+        if start is None or end is None:
+            continue
+        agent = getattr(task, "agent", None)
+        label = getattr(agent, "role", None) or getattr(task, "name", None) or f"task_{len(timings) + 1}"
+        timings[label] = round((end - start).total_seconds(), 2)
+    if kickoff_seconds is not None:
+        timings["total"] = round(kickoff_seconds, 2)
+    return timings
 
 
 # ── Cost estimation ───────────────────────────────────────────────────────────
@@ -163,7 +412,8 @@ def estimate_cost(task_description: str, attempts: int,
                   output_tokens: int = 400) -> dict:
     """
     Rough token and cost estimate for a single analysis run.
-    Directional — not real billing data.
+    Directional — not real billing data. Fallback only: execution.py
+    prefers usage.py's real counts when the CrewAI build exposes them.
     Based on Gemini 2.5 Flash pricing (~$0.075 per 1M tokens).
     """
     input_tokens  = round(len(task_description.split()) * 1.3)
@@ -175,4 +425,5 @@ def estimate_cost(task_description: str, attempts: int,
         "total_tokens":  total_tokens,
         "attempts":      attempts,
         "cost_usd":      cost_usd,
+        "source":        "heuristic",
     }
@@ -2,6 +2,7 @@ import streamlit as st
 import os
 import time
 import json
+import random
 import re
 
 st.set_page_config(
@@ -509,27 +510,107 @@ def validate_input(text: str, min_len: int = 30) -> tuple[bool, str]:
     return True, "valid"
 
 
-def extract_json_safe(text: str) -> dict:
-    """Two-pass JSON extraction with fallback error dict."""
-    try:
-        # Pass 1: strip markdown, find JSON block
-        cleaned = re.sub(r'```json\s*', '', text)
-        cleaned = re.sub(r'```\s*', '', cleaned)
-        match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-        if match:
-            return json.loads(match.group())
-    except (json.JSONDecodeError, Exception):
-        pass
-    try:
-        # Pass 2: fix common LLM JSON issues
-        if match:
-            fixed = re.sub(r',\s*}', '}', match.group())
-            fixed = re.sub(r',\s*]', ']', fixed)
-            fixed = re.sub(r'(?<!")(\b\w+\b)(?=\s*:)', r'"\1"', fixed)
-            return json.loads(fixed)
-    except Exception:
-        pass
-    return {"error": "JSON extraction failed after two passes", "raw_preview": text[:300]}
+# Kept identical to scan_json_object() / extract_json_safe() in
+# AI-Startup-Investment-Analyzer/utils.py — this app ships as a single file,
+# so it carries its own copy.
+
+# Structural tokens only: a complete string literal, a brace/bracket/comma,
+# or a markdown fence. The string branch can't overlap the others, so the
+# regex never backtracks — the scan stays linear in len(text).
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\],]|```(?:json)?')
+# A JSON object opens with { then a key or }. Prose braces like "{note}"
+# are rejected here, in C, before any tokenizing.
+_JSON_START = re.compile(r'\{\s*["}]')
+
+
+def scan_json_object(text: str, required_key: str = None) -> tuple:
+    """
+    Single-pass, brace-balanced scan for the outermost JSON object.
+    Returns (parsed: dict | None, span: (start, end) | None).
+
+    Repairs inline while scanning — trailing commas before } or ] are
+    dropped and markdown fences inside the object are skipped — so the
+    candidate is parsed exactly once. Balanced candidates that still fail
+    to parse (or lack required_key) are skipped and the scan resumes after
+    them, never re-reading text. An empty {} is only returned when no
+    non-empty object follows. span indexes the original text; on failure
+    it is the first candidate tried (to the end of text if truncated),
+    for previews, or None when the text holds no object at all.
+    """
+    if not text:
+        return None, None
+    first = empty = None
+    m = _JSON_START.search(text)
+    while m:
+        start = m.start()
+        out, depth, last, pending_comma = [], 0, start, None
+        end = None
+        for tok in _JSON_TOKEN.finditer(text, start):
+            t = tok.group()
+            between = text[last:tok.start()]
+            if pending_comma is not None:
+                # Comma directly followed by } or ] — trailing, drop it
+                if not (t in "}]" and not between.strip()):
+                    out.append(",")
+                pending_comma = None
+            out.append(between)
+            last = tok.end()
+            if t == ",":
+                pending_comma = tok.start()
+                continue
+            if t.startswith("```"):
+                continue
+            out.append(t)
+            if t in "{[":
+                depth += 1
+            elif t in "}]":
+                depth -= 1
+                if depth == 0:
+                    end = tok.end()
+                    break
+        if end is None:
+            first = first or (start, len(text))
+            break                      # unbalanced to end of text — truncated output
+        first = first or (start, end)
+        try:
+            parsed = json.loads("".join(out))
+            if isinstance(parsed, dict) and (required_key is None or required_key in parsed):
+                if parsed:
+                    return parsed, (start, end)
+                empty = empty or (start, end)
+        except json.JSONDecodeError:
+            pass
+        m = _JSON_START.search(text, end)
+    if empty:
+        return {}, empty
+    return None, first
+
+
+def extract_json_safe(text: str) -> tuple:
+    """
+    JSON extraction from LLM output via scan_json_object().
+    Returns (data, span) — span is the (start, end) of the object in text.
+
+    One linear pass: finds the outermost balanced object, strips fences
+    and trailing commas inline, parses once.
+
+    Never raises — data is {"error": ..., "raw_preview": ...} on total
+    failure, the preview cut from the span the scanner stopped at.
+    Never call json.loads() directly on LLM output.
+    """
+    parsed, span = scan_json_object(text)
+    if parsed is not None:
+        return parsed, span
+    if not text:
+        preview = "empty output"
+    elif span:
+        preview = text[span[0]:span[1]][:400]
+    else:
+        preview = text[:400]
+    return {
+        "error": "JSON extraction failed — no parseable object found",
+        "raw_preview": preview,
+    }, span
 
 
 def validate_output(data: dict) -> list:
@@ -580,12 +661,102 @@ def validate_output(data: dict) -> list:
     return results
 
 
-def safe_kickoff(crew, retries: int, delay: float, log_lines: list, log_ph, ts_fn) -> tuple:
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+PERMANENT_STATUS = {400, 401, 403, 404, 413, 422}
+
+# litellm / provider SDK exception class names, matched by name. Kept identical
+# to classify_error() in AI-Startup-Investment-Analyzer/utils.py.
+RETRYABLE_ERRORS = {
+    "RateLimitError", "Timeout", "APITimeoutError", "APIConnectionError",
+    "ServiceUnavailableError", "InternalServerError", "TimeoutError",
+    "ConnectionError", "ResourceExhausted",
+}
+PERMANENT_ERRORS = {
+    "AuthenticationError", "PermissionDeniedError", "BadRequestError",
+    "NotFoundError", "UnprocessableEntityError", "ContextWindowExceededError",
+    "ContentPolicyViolationError", "ValidationError", "InvalidArgument",
+}
+
+
+def _error_chain(exc) -> list:
+    """The exception plus its __cause__ / __context__ chain — CrewAI wraps provider errors."""
+    chain, seen = [], set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        chain.append(exc)
+        exc = exc.__cause__ or exc.__context__
+    return chain
+
+
+def _status_code(exc):
+    for attr in ("status_code", "http_status", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def classify_error(exc) -> str:
+    """
+    Returns "retryable" or "permanent".
+    Checks status codes, then exception class names, then message text.
+    Anything unrecognized counts as retryable — same as the old behaviour.
+    """
+    for e in _error_chain(exc):
+        status = _status_code(e)
+        if status in RETRYABLE_STATUS:
+            return "retryable"
+        if status in PERMANENT_STATUS:
+            return "permanent"
+        names = {cls.__name__ for cls in type(e).__mro__}
+        if names & RETRYABLE_ERRORS:
+            return "retryable"
+        if names & PERMANENT_ERRORS:
+            return "permanent"
+
+    msg = str(exc).lower()
+    if any(s in msg for s in ("429", "rate limit", "rate_limit", "resource_exhausted",
+                              "timed out", "timeout", "503", "overloaded", "unavailable")):
+        return "retryable"
+    if any(s in msg for s in ("401", "403", "invalid api key", "api_key_invalid",
+                              "invalid_api_key", "permission denied", "unauthorized")):
+        return "permanent"
+    return "retryable"
+
+
+def retry_after_seconds(exc):
+    """Server-requested wait from Retry-After headers or Gemini's retryDelay, else None."""
+    for e in _error_chain(exc):
+        headers = getattr(getattr(e, "response", None), "headers", None) or {}
+        headers = {str(k).lower(): v for k, v in dict(headers).items()}
+        for key in ("retry-after", "x-ratelimit-reset-requests"):
+            m = re.fullmatch(r'\s*(\d+(?:\.\d+)?)s?\s*', str(headers.get(key, "")))
+            if m:
+                return float(m.group(1))
+    m = re.search(r'retry_?delay["\']?\s*[:=]\s*["\']?(\d+(?:\.\d+)?)s', str(exc), re.IGNORECASE)
+    return float(m.group(1)) if m else None
+
+
+def backoff_delay(attempt: int, base: float, exc=None, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter; honours the server's Retry-After when given."""
+    server_wait = retry_after_seconds(exc) if exc is not None else None
+    if server_wait is not None:
+        return min(cap, server_wait + random.uniform(0, base))
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+def safe_kickoff(crew, retries: int, delay: float, log_lines: list, log_ph, ts_fn,
+                 deadline: float = None) -> tuple:
     """
     Retry-wrapped crew execution.
     Returns (result, attempts_used, success).
     Each attempt is logged live.
+    delay is the backoff base — waits grow exponentially with full jitter.
+    Permanent errors fail fast; deadline caps total seconds spent retrying.
     """
+    started    = time.monotonic()
     last_error = None
     for attempt in range(1, retries + 1):
         try:
@@ -604,11 +775,22 @@ def safe_kickoff(crew, retries: int, delay: float, log_lines: list, log_ph, ts_f
             log_lines.append((ts_fn(), "ERR", "lt-err",
                                f"Attempt {attempt} failed: {short_err}"))
             _render_log(log_lines, log_ph)
+            if classify_error(e) == "permanent":
+                log_lines.append((ts_fn(), "ERR", "lt-err",
+                                   "Permanent error (auth / validation) — not retrying"))
+                _render_log(log_lines, log_ph)
+                return last_error, attempt, False
             if attempt < retries:
+                wait = round(backoff_delay(attempt, delay, e), 1)
+                if deadline is not None and time.monotonic() - started + wait > deadline:
+                    log_lines.append((ts_fn(), "ERR", "lt-err",
+                                       f"Retry deadline of {deadline}s reached — giving up"))
+                    _render_log(log_lines, log_ph)
+                    return last_error, attempt, False
                 log_lines.append((ts_fn(), "RETRY", "lt-retry",
-                                   f"Waiting {delay}s before retry {attempt+1}…"))
+                                   f"Waiting {wait}s (backoff + jitter) before retry {attempt+1}…"))
                 _render_log(log_lines, log_ph)
-                time.sleep(delay)
+                time.sleep(wait)
     return last_error, retries, False
 
 
@@ -768,7 +950,7 @@ with col_r1:
                                    help="How many times to retry on failure")
 with col_r2:
     retry_delay = st.number_input("Retry Delay (s)", min_value=1.0, max_value=10.0, value=2.0, step=0.5,
-                                   help="Seconds to wait between retry attempts")
+                                   help="Backoff base — each retry waits up to base × 2^attempt, randomized")
 with col_r3:
     min_input_len = st.number_input("Min Input Length", min_value=10, max_value=100, value=30,
                                      help="Minimum characters required in startup description")
@@ -789,6 +971,8 @@ with st.expander("⚙  Advanced — Analyst + Cost Settings"):
             ["Conservative", "Balanced", "Aggressive"])
         temperature = st.slider("LLM Temperature", 0.0, 1.0, 0.2, 0.1,
                                   help="Lower = more consistent JSON output. 0.1–0.3 recommended for structured output.")
+        retry_deadline = st.number_input("Retry Deadline (s)", min_value=10.0, max_value=600.0, value=180.0, step=10.0,
+                                          help="Stop retrying once this many seconds have been spent on attempts + backoff")
 
     st.markdown("---")
     st.markdown("**Cost Optimization Settings**")
@@ -1003,7 +1187,7 @@ Critical rules:
 
     raw_result, attempts_used, success = safe_kickoff(
         crew, retries=max_retries, delay=retry_delay,
-        log_lines=log_lines, log_ph=log_ph, ts_fn=ts
+        log_lines=log_lines, log_ph=log_ph, ts_fn=ts, deadline=retry_deadline
     )
 
     # Update attempt log
@@ -1014,12 +1198,12 @@ Critical rules:
 
     if not success:
         log_lines.append((ts(), "ERR", "lt-err",
-                           f"All {max_retries} attempts exhausted"))
+                           f"Stopped after {attempts_used}/{max_retries} attempts"))
         _render_log(log_lines, log_ph)
         status_ph.markdown(f"""
         <div class="status-bar">
             <div class="s-dot s-err"></div>
-            <span class="s-text">All {max_retries} retry attempts failed</span>
+            <span class="s-text">Failed after {attempts_used}/{max_retries} attempts</span>
         </div>""", unsafe_allow_html=True)
         err_str = str(raw_result)
         if "quota" in err_str.lower() or "429" in err_str or "resource_exhausted" in err_str.lower():
@@ -1027,15 +1211,15 @@ Critical rules:
         elif "rate_limit" in err_str.lower():
             st.markdown('<div class="err-box"><b>Rate limit hit.</b> Retry delay was active. Try again in ~60s.</div>', unsafe_allow_html=True)
         else:
-            st.markdown(f'<div class="err-box"><b>System failed after {max_retries} retries:</b>\n{err_str[:600]}</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="err-box"><b>System failed after {attempts_used} attempt(s):</b>\n{err_str[:600]}</div>', unsafe_allow_html=True)
         st.stop()
 
     # ── Step 4: JSON extraction ────────────────────────────────────────────────
     raw_text = str(main_task.output.raw) if main_task.output else str(raw_result)
-    log_lines.append((ts(), "JSON", "lt-json", "Running two-pass JSON extraction…"))
+    log_lines.append((ts(), "JSON", "lt-json", "Running JSON extraction…"))
     _render_log(log_lines, log_ph)
 
-    parsed = extract_json_safe(raw_text)
+    parsed, _ = extract_json_safe(raw_text)
 
     if "error" in parsed:
         log_lines.append((ts(), "ERR", "lt-err", f"Extraction failed: {parsed['error']}"))
@@ -1048,11 +1232,11 @@ Critical rules:
             time.sleep(retry_delay)
             raw2, _, success2 = safe_kickoff(
                 crew, retries=2, delay=retry_delay,
-                log_lines=log_lines, log_ph=log_ph, ts_fn=ts
+                log_lines=log_lines, log_ph=log_ph, ts_fn=ts, deadline=retry_deadline
             )
             if success2:
                 raw_text2 = str(main_task.output.raw) if main_task.output else str(raw2)
-                parsed = extract_json_safe(raw_text2)
+                parsed, _ = extract_json_safe(raw_text2)
                 if "error" not in parsed:
                     log_lines.append((ts(), "OK", "lt-ok",
                                        "Auto-regeneration succeeded — JSON extracted ✓"))
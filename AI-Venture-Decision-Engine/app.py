@@ -430,24 +430,85 @@ details summary { color: var(--muted2) !important; font-size: 0.8rem !important;
 
 
 # ── Helpers ─────────────────────────────────────────────────────────────────────
-def extract_json(text: str) -> dict | None:
-    """Production JSON extraction — strips markdown fences, finds outermost braces."""
-    text = re.sub(r'```json\s*', '', text)
-    text = re.sub(r'```\s*', '', text)
-    match = re.search(r'\{.*\}', text, re.DOTALL)
-    if match:
+# Kept identical to scan_json_object() in AI-Startup-Investment-Analyzer/utils.py —
+# this app ships as a single file, so it carries its own copy.
+
+# Structural tokens only: a complete string literal, a brace/bracket/comma,
+# or a markdown fence. The string branch can't overlap the others, so the
+# regex never backtracks — the scan stays linear in len(text).
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\],]|```(?:json)?')
+# A JSON object opens with { then a key or }. Prose braces like "{note}"
+# are rejected here, in C, before any tokenizing.
+_JSON_START = re.compile(r'\{\s*["}]')
+
+
+def scan_json_object(text: str, required_key: str = None) -> tuple:
+    """
+    Single-pass, brace-balanced scan for the outermost JSON object.
+    Returns (parsed: dict | None, span: (start, end) | None).
+
+    Repairs inline while scanning — trailing commas before } or ] are
+    dropped and markdown fences inside the object are skipped — so the
+    candidate is parsed exactly once. Balanced candidates that still fail
+    to parse (or lack required_key) are skipped and the scan resumes after
+    them, never re-reading text. An empty {} is only returned when no
+    non-empty object follows. span indexes the original text; on failure
+    it is the first candidate tried (to the end of text if truncated),
+    for previews, or None when the text holds no object at all.
+    """
+    if not text:
+        return None, None
+    first = empty = None
+    m = _JSON_START.search(text)
+    while m:
+        start = m.start()
+        out, depth, last, pending_comma = [], 0, start, None
+        end = None
+        for tok in _JSON_TOKEN.finditer(text, start):
+            t = tok.group()
+            between = text[last:tok.start()]
+            if pending_comma is not None:
+                # Comma directly followed by } or ] — trailing, drop it
+                if not (t in "}]" and not between.strip()):
+                    out.append(",")
+                pending_comma = None
+            out.append(between)
+            last = tok.end()
+            if t == ",":
+                pending_comma = tok.start()
+                continue
+            if t.startswith("```"):
+                continue
+            out.append(t)
+            if t in "{[":
+                depth += 1
+            elif t in "}]":
+                depth -= 1
+                if depth == 0:
+                    end = tok.end()
+                    break
+        if end is None:
+            first = first or (start, len(text))
+            break                      # unbalanced to end of text — truncated output
+        first = first or (start, end)
         try:
-            return json.loads(match.group())
+            parsed = json.loads("".join(out))
+            if isinstance(parsed, dict) and (required_key is None or required_key in parsed):
+                if parsed:
+                    return parsed, (start, end)
+                empty = empty or (start, end)
         except json.JSONDecodeError:
-            # Try to fix common LLM JSON issues
-            fixed = match.group()
-            fixed = re.sub(r',\s*}', '}', fixed)
-            fixed = re.sub(r',\s*]', ']', fixed)
-            try:
-                return json.loads(fixed)
-            except Exception:
-                return None
-    return None
+            pass
+        m = _JSON_START.search(text, end)
+    if empty:
+        return {}, empty
+    return None, first
+
+
+def extract_json(text: str) -> dict | None:
+    """Production JSON extraction — one linear scan, fences and trailing commas repaired inline."""
+    parsed, _ = scan_json_object(text)
+    return parsed
 
 
 def validate_output(data: dict) -> list:
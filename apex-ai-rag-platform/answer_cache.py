@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+
+# ─────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────
+# Cosine similarity (MiniLM embeddings are normalized, so inner product)
+# a new question needs with a cached one to reuse its answer.
+SIMILARITY_THRESHOLD = float(os.environ.get("APEX_ANSWER_CACHE_THRESHOLD", "0.92"))
+MAX_ENTRIES = int(os.environ.get("APEX_ANSWER_CACHE_SIZE", "500"))
+
+
+class SemanticAnswerCache:
+    """
+    Answers keyed by question meaning, not text.
+
+    Questions are embedded with the app's MiniLM model and searched in a
+    small inner-product FAISS index. A hit needs similarity ≥ threshold.
+    Every entry belongs to one knowledge-base hash; when the hash changes
+    the whole cache is dropped. LRU eviction past max_entries.
+    """
+
+    def __init__(self, embeddings, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.kb_hash = None
+        self.entries = OrderedDict()  # id -> {"question", "answer", "created"}, LRU order
+        self.index = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _embed(self, question):
+        vector = np.asarray([self.embeddings.embed_query(question)], dtype=np.float32)
+        faiss.normalize_L2(vector)  # no-op for MiniLM, guards other models
+        return vector
+
+    def _reset(self, kb_hash):
+        """Caller holds the lock."""
+        self.kb_hash = kb_hash
+        self.entries.clear()
+        self.index = None
+
+    def lookup(self, question, kb_hash):
+        """(answer, similarity) for the closest cached question, or (None, best similarity)."""
+        vector = self._embed(question)
+        with self._lock:
+            if kb_hash != self.kb_hash:
+                self._reset(kb_hash)
+            if self.index is None or not self.entries:
+                self.misses += 1
+                return None, 0.0
+            scores, ids = self.index.search(vector, 1)
+            score, entry_id = float(scores[0][0]), int(ids[0][0])
+            entry = self.entries.get(entry_id)
+            if entry is None or score < self.threshold:
+                self.misses += 1
+                return None, score
+            self.entries.move_to_end(entry_id)
+            self.hits += 1
+            return entry["answer"], score
+
+    def store(self, question, answer, kb_hash):
+        vector = self._embed(question)
+        with self._lock:
+            if kb_hash != self.kb_hash:
+                self._reset(kb_hash)
+            if self.index is None:
+                self.index = faiss.IndexIDMap(faiss.IndexFlatIP(vector.shape[1]))
+            entry_id = self._next_id
+            self._next_id += 1
+            self.index.add_with_ids(vector, np.asarray([entry_id], dtype=np.int64))
+            self.entries[entry_id] = {"question": question, "answer": answer, "created": time.time()}
+            while len(self.entries) > self.max_entries:
+                old_id, _ = self.entries.popitem(last=False)
+                self.index.remove_ids(np.asarray([old_id], dtype=np.int64))
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
@@ -2,6 +2,7 @@ import streamlit as st
 import os
 import time
 import json
+import logging
 from datetime import datetime, timedelta
 import pytz
 
@@ -12,9 +13,8 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda, RunnableParallel
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
-from langchain_community.vectorstores import FAISS
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import HuggingFaceEmbeddings
 
 # ── local imports ──
@@ -22,13 +22,21 @@ from firebase_config import (
     sign_up, sign_in, get_db, get_user_data,
     track_message, track_document_upload,
     track_response_time, track_rating,
-    get_all_users, get_usage_logs,
-    get_performance_logs, get_ratings,
+    get_usage_logs, get_analytics_summary,
     check_message_limit, check_document_limit,
     create_checkout_session, upgrade_to_premium,
     verify_stripe_session,
     FREE_PLAN_LIMITS, PREMIUM_PLAN_LIMITS,
 )
+from vector_index import (
+    EMBEDDING_MODEL, NORMALIZE_EMBEDDINGS, load_or_build_index, knowledge_hash,
+)
+from ingestion import IngestionManager
+from answer_cache import SemanticAnswerCache
+from retrieval import HybridRetriever
+from context_packer import pack_context
+
+logger = logging.getLogger(__name__)
 
 # ─────────────────────────────────────────────
 # Page Config & Global CSS
@@ -538,43 +546,57 @@ setup_langchain()
 def load_embeddings():
     """Load HuggingFace embeddings model (cached)."""
     return HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2",
+        model_name=EMBEDDING_MODEL,
         model_kwargs={'device': 'cpu'},
-        encode_kwargs={'normalize_embeddings': True}
+        encode_kwargs={'normalize_embeddings': NORMALIZE_EMBEDDINGS}
     )
 
 
 @st.cache_resource
 def build_vector_store():
-    """Build FAISS vector store from knowledge.txt (cached)."""
+    """
+    FAISS vector store for knowledge.txt (cached per process).
+    Backed by an on-disk build keyed by content + config hash, so restarts
+    and new replicas load saved vectors and only changed chunks are re-embedded.
+    """
     kb_path = os.path.join(os.path.dirname(__file__), "knowledge.txt")
     
     if not os.path.exists(kb_path):
         st.warning("⚠️ knowledge.txt not found. Using empty knowledge base.")
         return None
     
-    with open(kb_path, "r", encoding="utf-8") as f:
-        text = f.read()
-    
-    # Split into chunks - UPGRADED for better context
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1500,  # 3x larger chunks for more context
-        chunk_overlap=200,  # 4x more overlap to preserve relationships
-        separators=["\n\n", "\n", ". ", "! ", "? ", "; ", ", ", " ", ""]
-    )
-    chunks = splitter.split_text(text)
-    
-    if not chunks:
-        return None
-    
-    # Create FAISS vector store
-    embeddings = load_embeddings()
-    vectorstore = FAISS.from_texts(chunks, embeddings)
+    vectorstore, stats = load_or_build_index(kb_path, load_embeddings())
+    logger.info("vector index %s · %s chunks · %s embedded · %ss",
+                stats["status"], stats["chunks"], stats["embedded"], stats["seconds"])
     
     return vectorstore
 
 
-def get_rag_chain():
+@st.cache_resource
+def get_retriever():
+    """Hybrid dense + BM25 retriever over the knowledge base (cached)."""
+    vectorstore = build_vector_store()
+    if not vectorstore:
+        return None
+    retriever = HybridRetriever(vectorstore)
+    stages = [name for name in ("dense", "sparse", "rerank") if retriever.config[name]]
+    logger.info("retrieval stages: %s · bm25 built in %s ms", " + ".join(stages), retriever.build_ms)
+    return retriever
+
+
+@st.cache_resource
+def get_answer_cache():
+    """Process-wide semantic answer cache, shared by all sessions (cached)."""
+    return SemanticAnswerCache(load_embeddings())
+
+
+@st.cache_resource
+def get_ingestion_manager():
+    """Process-wide upload ingestion pool + per-user indexes (cached)."""
+    return IngestionManager(load_embeddings())
+
+
+def get_rag_chain(uid=None):
     """Create Groq-powered RAG chain (Modern LangChain Compatible)."""
 
     groq_api_key = os.environ.get("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY", "")
@@ -590,22 +612,12 @@ def get_rag_chain():
         max_tokens=4096,  # 4x more tokens for detailed answers
     )
 
-    # ✅ Vector Store
-    vectorstore = build_vector_store()
-    if not vectorstore:
+    # ✅ Hybrid Retriever - FAISS MMR + BM25, fused (RRF), optional reranker (see retrieval.py)
+    retriever = get_retriever()
+    if not retriever:
         st.warning("⚠️ No knowledge base loaded.")
         return None
 
-    # ✅ UPGRADED Retriever - fetch more relevant context
-    retriever = vectorstore.as_retriever(
-        search_type="mmr",  # Maximum Marginal Relevance for diverse results
-        search_kwargs={
-            "k": 6,  # 2x more chunks for comprehensive context
-            "fetch_k": 12,  # Fetch more candidates before filtering
-            "lambda_mult": 0.7  # Balance between relevance and diversity
-        }
-    )
-
     # ✅ UPGRADED Prompt - Advanced reasoning and comprehensive analysis
     prompt = ChatPromptTemplate.from_template(
         """You are Apex AI, an advanced AI assistant with deep analytical capabilities.
@@ -637,11 +649,26 @@ Your goal is to provide intelligent, comprehensive, and accurate answers by:
     # ✅ Modern RAG Chain (LCEL)
     from operator import itemgetter
     
-    rag_chain = (
-        {
-            "context": itemgetter("question") | retriever,
-            "question": itemgetter("question")
-        }
+    # Global knowledge base + this user's uploaded documents
+    ingestion = get_ingestion_manager()
+
+    def retrieve(question):
+        docs, _ = retriever.retrieve(
+            question, extra={"uploads": lambda q: ingestion.search(uid, q, k=4)},
+        )
+        return docs
+
+    # Retrieved chunks are de-duplicated and packed to a token budget. The chain
+    # streams {"packed": {...}} once, then {"answer": "..."} token chunks, so the
+    # caller gets the chunk ids actually sent alongside the reply.
+    def retrieve_packed(question):
+        return pack_context(retrieve(question))
+
+    rag_chain = RunnableParallel(
+        question=itemgetter("question"),
+        packed=itemgetter("question") | RunnableLambda(retrieve_packed),
+    ).assign(
+        answer=RunnableLambda(lambda x: {"context": x["packed"]["text"], "question": x["question"]})
         | prompt
         | llm
         | StrOutputParser()
@@ -664,6 +691,7 @@ def init_session():
         "page": "chat",
         "chat_history": [],
         "rag_chain": None,
+        "ingested_uploads": set(),
         "auth_mode": "signin",  # NEW: track signin/signup mode
     }
     for k, v in defaults.items():
@@ -854,6 +882,40 @@ def render_auth():
 # ─────────────────────────────────────────────
 # RAG Chatbot Page (UPDATED with usage limits)
 # ─────────────────────────────────────────────
+def render_reply(placeholder, text, cursor=False):
+    """Draw the assistant bubble for an in-progress or finished reply."""
+    placeholder.markdown(
+        f'<div class="chat-msg bot"><div class="bubble">{text}{"▌" if cursor else ""}</div></div>',
+        unsafe_allow_html=True,
+    )
+
+
+def stream_reply(chunks, placeholder, start_t, redraw_every=0.05):
+    """
+    Renders a chain/LLM stream progressively.
+    Returns (reply, ttft_ms, tokens_per_sec). Groq streams about one token
+    per chunk, so chunks / generation time approximates tokens/sec.
+    """
+    parts, first_t, last_draw = [], None, 0.0
+    for chunk in chunks:
+        piece = chunk.content if hasattr(chunk, "content") else str(chunk)
+        if not piece:
+            continue
+        if first_t is None:
+            first_t = time.time()
+        parts.append(piece)
+        if time.time() - last_draw >= redraw_every:
+            render_reply(placeholder, "".join(parts), cursor=True)
+            last_draw = time.time()
+    reply = "".join(parts)
+    render_reply(placeholder, reply)
+    if first_t is None:
+        return reply, None, None
+    gen_s = time.time() - first_t
+    tokens_per_sec = round(len(parts) / gen_s, 1) if gen_s > 0 else None
+    return reply, int((first_t - start_t) * 1000), tokens_per_sec
+
+
 def render_chat():
     # Get user data for limit checking
     user_data = get_user_data(st.session_state.uid)
@@ -890,7 +952,7 @@ def render_chat():
     # Initialize RAG chain (only once per session)
     if st.session_state.rag_chain is None:
         with st.spinner("🔄 Loading RAG system..."):
-            st.session_state.rag_chain = get_rag_chain()
+            st.session_state.rag_chain = get_rag_chain(st.session_state.uid)
     
     # Chat history display
     st.markdown('<div style="height:420px; overflow-y:auto; padding:10px 0;" id="chat-box">', unsafe_allow_html=True)
@@ -902,7 +964,10 @@ def render_chat():
         if msg["role"] == "assistant" and "sources" in msg:
             sources = msg["sources"]
             if sources:
-                content += f"\n\n<small style='color:#64748b;'>📚 Sources: {len(sources)} chunks retrieved</small>"
+                names = ", ".join(dict.fromkeys(src.get("source", "knowledge base") for src in sources))
+                content += f"\n\n<small style='color:#64748b;'>📚 Sources: {len(sources)} chunks ({names})</small>"
+        if msg["role"] == "assistant" and msg.get("cached"):
+            content += "\n\n<small style='color:#64748b;'>⚡ Answered from cache</small>"
         
         st.markdown(
             f'<div class="chat-msg {role_cls}"><div class="bubble">{content}</div></div>',
@@ -941,22 +1006,43 @@ def render_chat():
         st.session_state.chat_history.append({"role": "user", "content": user_input.strip()})
         track_message(st.session_state.uid)
 
-        # Call RAG chain with timing
+        # Call RAG chain with timing — the reply streams into this bubble as it is generated
         start_t = time.time()
+        reply_ph = st.empty()
+        ttft_ms, tokens_per_sec = None, None
         
         chain = st.session_state.rag_chain
         
+        cache_hit = False
+        
         if chain:
-            # ✅ Modern LCEL call
-            result = chain.invoke({"question": user_input.strip()})
+            question = user_input.strip()
+            # Answers that used the user's private uploads are neither served from nor stored in the shared cache
+            answer_cache = get_answer_cache()
+            kb_hash = knowledge_hash(os.path.join(os.path.dirname(__file__), "knowledge.txt"))
+            cacheable = not get_ingestion_manager().has_documents(st.session_state.uid)
+            reply = answer_cache.lookup(question, kb_hash)[0] if cacheable else None
+            cache_hit = reply is not None
             
-            # ✅ Ensure reply is string
-            if isinstance(result, dict):
-                reply = result.get("answer") or result.get("output") or str(result)
+            if cache_hit:
+                render_reply(reply_ph, reply)
+                sources = []
             else:
-                reply = str(result)
-            
-            sources = []
+                # ✅ Modern LCEL call, streamed
+                packed = {}
+                
+                def answer_chunks():
+                    for chunk in chain.stream({"question": question}):
+                        if "packed" in chunk:
+                            packed.update(chunk["packed"])
+                        if "answer" in chunk:
+                            yield chunk["answer"]
+                
+                reply, ttft_ms, tokens_per_sec = stream_reply(answer_chunks(), reply_ph, start_t)
+                sources = packed.get("sources", [])
+                
+                if cacheable:
+                    answer_cache.store(question, reply, kb_hash)
         
         else:
             # Fallback to direct LLM (no knowledge base) - UPGRADED
@@ -970,19 +1056,22 @@ def render_chat():
                 groq_api_key=groq_api_key
             )
             
-            result = llm.invoke(prompt)
-            reply = result.content if hasattr(result, "content") else str(result)
+            reply, ttft_ms, tokens_per_sec = stream_reply(llm.stream(prompt), reply_ph, start_t)
             sources = []
         
-        # ✅ Track response time
+        # ✅ Track response time (+ time-to-first-token and generation speed when streamed)
         elapsed_ms = int((time.time() - start_t) * 1000)
-        track_response_time(st.session_state.uid, elapsed_ms, success=True)
+        track_response_time(
+            st.session_state.uid, elapsed_ms, success=True, cache_hit=cache_hit,
+            ttft_ms=ttft_ms, tokens_per_sec=tokens_per_sec,
+        )
         
         # ✅ Append assistant reply
         st.session_state.chat_history.append({
             "role": "assistant",
             "content": reply,
-            "sources": sources
+            "sources": sources,
+            "cached": cache_hit,
         })
         
         # ✅ Satisfaction rating prompt (every 10 messages)
@@ -1015,11 +1104,37 @@ def render_chat():
                     st.markdown(f'<meta http-equiv="refresh" content="0; url={checkout_url}">', unsafe_allow_html=True)
         else:
             uploaded = st.file_uploader("Upload .txt or .pdf", type=["txt", "pdf"], label_visibility="hidden")
-            if uploaded:
+            # The uploader keeps returning the same file on every rerun — ingest it once
+            upload_key = f"{uploaded.name}:{uploaded.size}:{getattr(uploaded, 'file_id', '')}" if uploaded else None
+            if uploaded and upload_key not in st.session_state.ingested_uploads:
+                st.session_state.ingested_uploads.add(upload_key)
                 track_document_upload(st.session_state.uid)
-                # In production: parse and add to vector store
-                st.success(f"Uploaded: **{uploaded.name}** — tracked successfully.")
-                st.info("💡 To add this to the knowledge base, append its content to `knowledge.txt` and rebuild the vector store.")
+                get_ingestion_manager().submit(st.session_state.uid, uploaded.name, uploaded.getvalue())
+                st.success(f"Uploaded: **{uploaded.name}** — indexing in the background.")
+
+        render_ingestion_status()
+
+
+def _ingestion_status():
+    """Progress of this user's uploads; polls itself while any are running."""
+    jobs = get_ingestion_manager().jobs_for(st.session_state.uid)
+    if not jobs:
+        return
+    labels = {
+        "queued": "⏳ Queued", "parsing": "📖 Parsing", "embedding": "🧮 Embedding",
+        "indexing": "🗂️ Indexing", "done": "✅ Ready", "failed": "❌ Failed",
+    }
+    for job in jobs[:5]:
+        detail = f" · {job['chunks']} chunks" if job["chunks"] else ""
+        if job["stage"] == "failed":
+            detail = f" · {job['error']}"
+        st.progress(job["progress"], text=f"{labels[job['stage']]} — {job['filename']}{detail}")
+    if any(j["stage"] not in ("done", "failed") for j in jobs) and not hasattr(st, "fragment"):
+        st.button("🔄 Refresh status", key="ingest_refresh")
+
+
+# Re-render just the status block every 2s where st.fragment exists (Streamlit ≥ 1.37)
+render_ingestion_status = st.fragment(run_every=2)(_ingestion_status) if hasattr(st, "fragment") else _ingestion_status
 
 
 # ─────────────────────────────────────────────
@@ -1169,50 +1284,23 @@ def render_admin_dashboard():
     days = range_map[time_range]
     since = datetime.now(pytz.utc) - timedelta(days=days) if days < 9999 else None
 
-    # ── Fetch data ──
-    all_users      = get_all_users()
-    usage_logs     = get_usage_logs(since)
-    perf_logs      = get_performance_logs(since)
-    ratings_data   = get_ratings(since)
-
-    now_utc  = datetime.now(pytz.utc)
-    seven_d  = now_utc - timedelta(days=7)
-    thirty_d = now_utc - timedelta(days=30)
+    # ── Fetch data (pre-aggregated daily rollups, not raw logs) ──
+    m = get_analytics_summary(since)
 
     # ─── Compute metrics ───
-    total_users = len(all_users)
-    active_7  = sum(1 for u in all_users if u.get("last_active") and u["last_active"] >= seven_d)
-    active_30 = sum(1 for u in all_users if u.get("last_active") and u["last_active"] >= thirty_d)
-    new_users_period = sum(
-        1 for u in all_users
-        if u.get("created_at") and u["created_at"] >= (since or datetime.min.replace(tzinfo=pytz.utc))
-    )
+    total_users = m.total_users
+    new_users_period = m.new_users
     growth_rate = (new_users_period / max(total_users - new_users_period, 1)) * 100
+    churn_rate = (m.churned / max(m.active_30, 1)) * 100
 
-    churn_count = sum(
-        1 for u in all_users
-        if u.get("last_active")
-        and u["last_active"] < seven_d
-        and u["last_active"] >= thirty_d
-    )
-    churn_rate = (churn_count / max(active_30, 1)) * 100
-
-    msg_events  = [e for e in usage_logs if e.get("event") == "message_sent"]
-    doc_events  = [e for e in usage_logs if e.get("event") == "document_uploaded"]
-    total_msgs  = len(msg_events)
-    total_docs  = len(doc_events)
-    avg_msgs    = total_msgs / max(total_users, 1)
-    avg_docs    = total_docs / max(total_users, 1)
-
-    hour_counts = [0] * 24
-    for e in msg_events:
-        ts = e.get("timestamp")
-        if ts:
-            hour_counts[ts.hour] += 1
+    avg_msgs = m.messages / max(total_users, 1)
+    avg_docs = m.documents / max(total_users, 1)
+
+    hour_counts = m.hour_counts()
     peak_hour = hour_counts.index(max(hour_counts)) if any(hour_counts) else 0
 
-    premium_users  = sum(1 for u in all_users if u.get("plan") == "premium")
-    free_users     = total_users - premium_users
+    premium_users  = m.premium_users
+    free_users     = m.free_users
     MONTHLY_PRICE  = 9.99
     MRR            = premium_users * MONTHLY_PRICE
     conversion_rate = (premium_users / max(total_users, 1)) * 100
@@ -1220,19 +1308,9 @@ def render_admin_dashboard():
     avg_months_active = 3
     LTV = avg_months_active * MONTHLY_PRICE
 
-    if perf_logs:
-        response_times = [p["response_time_ms"] for p in perf_logs]
-        avg_response   = sum(response_times) / len(response_times)
-        success_count  = sum(1 for p in perf_logs if p.get("success"))
-        success_rate   = (success_count / len(perf_logs)) * 100
-        error_rate     = 100 - success_rate
-    else:
-        avg_response = 0; success_rate = 0; error_rate = 0
-
-    if ratings_data:
-        avg_satisfaction = sum(r["rating"] for r in ratings_data) / len(ratings_data)
-    else:
-        avg_satisfaction = 0
+    success_rate = m.success_rate
+    error_rate   = 100 - success_rate if m.requests else 0
+    avg_satisfaction = m.avg_rating
 
     # ─────────────────────────────────────────────
     # 1. USER METRICS
@@ -1253,8 +1331,8 @@ def render_admin_dashboard():
             """, unsafe_allow_html=True)
 
     _card(cols[0], "user", "Total Users",      f"{total_users:,}",           f"{new_users_period} new", "up")
-    _card(cols[1], "user", "Active (7 days)",  f"{active_7:,}",              f"{active_7/max(total_users,1)*100:.0f}% of total", "up")
-    _card(cols[2], "user", "Churn Rate",       f"{churn_rate:.1f}%",         f"{churn_count} users churned", "down" if churn_rate > 0 else "up")
+    _card(cols[1], "user", "Active (7 days)",  f"{m.active_7:,}",            f"{m.active_7/max(total_users,1)*100:.0f}% of total", "up")
+    _card(cols[2], "user", "Churn Rate",       f"{churn_rate:.1f}%",         f"{m.churned} users churned", "down" if churn_rate > 0 else "up")
     _card(cols[3], "user", "Growth Rate",      f"{growth_rate:.1f}%",        f"vs previous period", "up" if growth_rate > 0 else "down")
 
     # ─────────────────────────────────────────────
@@ -1262,9 +1340,9 @@ def render_admin_dashboard():
     # ─────────────────────────────────────────────
     st.markdown('<div class="section-title">📈 Usage Metrics</div>', unsafe_allow_html=True)
     cols = st.columns(4)
-    _card(cols[0], "usage", "Total Messages",      f"{total_msgs:,}",   f"in {time_range.lower()}", "up")
+    _card(cols[0], "usage", "Total Messages",      f"{m.messages:,}",   f"in {time_range.lower()}", "up")
     _card(cols[1], "usage", "Avg Msgs / User",     f"{avg_msgs:.1f}",   "per user", "up")
-    _card(cols[2], "usage", "Total Docs Uploaded", f"{total_docs:,}",   f"in {time_range.lower()}", "up")
+    _card(cols[2], "usage", "Total Docs Uploaded", f"{m.documents:,}",  f"in {time_range.lower()}", "up")
     _card(cols[3], "usage", "Avg Docs / User",     f"{avg_docs:.2f}",   "per user", "up")
 
     st.markdown("**Peak Usage by Hour (UTC)**", unsafe_allow_html=False)
@@ -1288,11 +1366,7 @@ def render_admin_dashboard():
 
     col_pie1, col_pie2 = st.columns([1, 2])
     with col_pie1:
-        pie_df = pd.DataFrame({
-            "Plan": ["Free", "Premium"],
-            "Users": [free_users, premium_users]
-        })
-        st.pyplot(_pie_chart(pie_df), use_container_width=True)
+        st.pyplot(_pie_chart(m.plan_mix()), use_container_width=True)
     with col_pie2:
         st.markdown("**Plan Distribution**")
         st.markdown(f"""
@@ -1307,17 +1381,24 @@ def render_admin_dashboard():
     # ─────────────────────────────────────────────
     st.markdown('<div class="section-title">⚡ Performance Metrics</div>', unsafe_allow_html=True)
     cols = st.columns(4)
-    _card(cols[0], "perf", "Avg Response Time",  f"{avg_response:.0f} ms",       f"{len(perf_logs)} requests", "up" if avg_response < 2000 else "down")
-    _card(cols[1], "perf", "Success Rate",       f"{success_rate:.1f}%",         f"{sum(1 for p in perf_logs if p.get('success'))} ok", "up")
-    _card(cols[2], "perf", "Error Rate",         f"{error_rate:.1f}%",           f"{sum(1 for p in perf_logs if not p.get('success'))} errors", "down" if error_rate > 0 else "up")
-    _card(cols[3], "perf", "Avg Satisfaction",   f"{avg_satisfaction:.1f} / 5",  f"{len(ratings_data)} ratings", "up" if avg_satisfaction >= 3.5 else "down")
-
-    if perf_logs:
-        perf_df = pd.DataFrame(perf_logs).sort_values("timestamp")
-        perf_df["idx"] = range(len(perf_df))
-        st.markdown("**Response Time Trend (ms)**")
+    _card(cols[0], "perf", "Avg Response Time",  f"{m.avg_response:.0f} ms",     f"{m.requests} requests · {m.cache_rate:.0f}% cached", "up" if m.avg_response < 2000 else "down")
+    _card(cols[1], "perf", "Success Rate",       f"{success_rate:.1f}%",         f"{m.successes} ok", "up")
+    _card(cols[2], "perf", "Error Rate",         f"{error_rate:.1f}%",           f"{m.requests - m.successes} errors", "down" if error_rate > 0 else "up")
+    _card(cols[3], "perf", "Avg Satisfaction",   f"{avg_satisfaction:.1f} / 5",  f"{m.ratings} ratings", "up" if avg_satisfaction >= 3.5 else "down")
+
+    if m.requests:
+        pct = m.latency_percentiles()
+        st.caption(f"📊 Latency percentiles: p50 **{pct[50]:.0f} ms** · p95 **{pct[95]:.0f} ms** · "
+                   f"p99 **{pct[99]:.0f} ms** · DAU {m.dau} / WAU {m.active_7} / MAU {m.active_30}")
+    if m.streamed:
+        st.caption(f"⏱️ Streaming: avg time to first token **{m.avg_ttft:.0f} ms** · "
+                   f"avg generation **{m.avg_tps:.0f} tokens/s** over {m.streamed} streamed replies")
+
+    trend = m.series("W" if days > 90 else "D")["avg_response_ms"].dropna()
+    if len(trend):
+        st.markdown("**Response Time Trend (avg ms)**")
         st.line_chart(
-            perf_df.set_index("idx")[["response_time_ms"]],
+            trend,
             color="#fb923c",
             height=200,
         )
@@ -1326,7 +1407,7 @@ def render_admin_dashboard():
     # 5. Recent Activity
     # ─────────────────────────────────────────────
     st.markdown('<div class="section-title">📋 Recent Activity</div>', unsafe_allow_html=True)
-    recent = sorted(usage_logs, key=lambda x: x.get("timestamp", datetime.min.replace(tzinfo=pytz.utc)), reverse=True)[:15]
+    recent = get_usage_logs(since, limit=15)
     if recent:
         rows = ""
         for entry in recent:
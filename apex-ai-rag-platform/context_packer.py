@@ -0,0 +1,108 @@
+import os
+import re
+import hashlib
+
+# ─────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("APEX_CONTEXT_TOKENS", "1800"))
+CHARS_PER_TOKEN = 4  # Llama 3 averages ~4 chars/token on English prose
+MIN_OVERLAP_CHARS = 40  # shorter shared spans are coincidence, not splitter overlap
+MIN_PIECE_TOKENS = 40  # don't append a truncated tail shorter than this
+SEPARATOR = "\n\n---\n\n"
+
+_SENTENCE_END = re.compile(r"[.!?](?=\s)|\n\n")
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def chunk_id(doc):
+    """Stable id: the index chunk hash, else a hash of source + content."""
+    if doc.metadata.get("chunk_hash"):
+        return doc.metadata["chunk_hash"][:12]
+    key = f"{doc.metadata.get('source', '')}\n{doc.page_content}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+
+# ─────────────────────────────────────────────
+# Overlap removal
+# ─────────────────────────────────────────────
+def _suffix_prefix_overlap(left, right):
+    """Length of the longest suffix of left that is a prefix of right (≥ MIN_OVERLAP_CHARS), else 0."""
+    probe = right[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return 0
+    start = left.find(probe, max(0, len(left) - len(right)))
+    while start != -1:
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(probe, start + 1)
+    return 0
+
+
+def _strip_overlap(text, kept):
+    """text minus spans already present at the edges of kept chunks; '' if fully contained."""
+    for other in kept:
+        if text in other:
+            return ""
+        head = _suffix_prefix_overlap(other, text)  # other ends where text begins
+        if head:
+            text = text[head:]
+        tail = _suffix_prefix_overlap(text, other)  # text ends where other begins
+        if tail:
+            text = text[:-tail]
+    return text.strip()
+
+
+def _truncate_to_sentence(text, max_chars):
+    """Longest prefix ending on a sentence boundary within max_chars ('' if none)."""
+    if len(text) <= max_chars:
+        return text
+    cut = 0
+    for match in _SENTENCE_END.finditer(text, 0, max_chars):
+        cut = match.end()
+    return text[:cut].strip()
+
+
+# ─────────────────────────────────────────────
+# Packing
+# ─────────────────────────────────────────────
+def pack_context(docs, budget_tokens=CONTEXT_TOKEN_BUDGET):
+    """
+    Prompt context from best-first docs.
+
+    Overlap shared with already-packed chunks (splitter overlap between
+    neighbours, duplicates from several retrievers) is dropped, chunks are
+    added in rank order until budget_tokens, and the first chunk that does
+    not fit is cut at a sentence boundary.
+
+    Returns {"text", "sources": [{"id", "source", "tokens"}], "tokens"}.
+    """
+    kept, sources, used = [], [], 0
+    for doc in docs:
+        text = _strip_overlap(doc.page_content.strip(), kept)
+        if not text:
+            continue
+        header = f"[{len(kept) + 1}] "
+        cost = estimate_tokens(header + text) + (estimate_tokens(SEPARATOR) if kept else 0)
+        full = used + cost <= budget_tokens
+        if not full:
+            room = (budget_tokens - used) * CHARS_PER_TOKEN - len(header) - (len(SEPARATOR) if kept else 0)
+            text = _truncate_to_sentence(text, room)
+            if estimate_tokens(text) < MIN_PIECE_TOKENS:
+                break
+            cost = estimate_tokens(header + text) + (estimate_tokens(SEPARATOR) if kept else 0)
+        kept.append(text)
+        used += cost
+        sources.append({
+            "id": chunk_id(doc),
+            "source": doc.metadata.get("source", "knowledge base"),
+            "tokens": estimate_tokens(text),
+        })
+        if not full:
+            break
+
+    body = SEPARATOR.join(f"[{i}] {text}" for i, text in enumerate(kept, start=1))
+    return {"text": body, "sources": sources, "tokens": used}
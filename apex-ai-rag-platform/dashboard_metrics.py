@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+
+from telemetry import nest
+from rollups import LATENCY_MIN_MS, LATENCY_GROWTH, LATENCY_BUCKETS, day_id
+
+# ─────────────────────────────────────────────
+# Typed columnar frames
+# ─────────────────────────────────────────────
+# Firestore dicts are converted once; everything downstream is vectorized.
+UTC_TS = "datetime64[ns, UTC]"
+USAGE_COLUMNS = {"uid": "string", "event": "string", "timestamp": UTC_TS}
+PERFORMANCE_COLUMNS = {
+    "uid": "string", "response_time_ms": "float64", "success": "boolean", "cache_hit": "boolean",
+    "ttft_ms": "float64", "tokens_per_sec": "float64", "timestamp": UTC_TS,
+}
+RATING_COLUMNS = {"uid": "string", "rating": "float64", "timestamp": UTC_TS}
+USER_COLUMNS = {"plan": "string", "created_at": UTC_TS, "last_active": UTC_TS}
+
+SCALAR_FIELDS = [
+    "messages", "documents", "new_users", "requests", "successes", "cache_hits", "response_ms_sum",
+    "streamed", "ttft_ms_sum", "tps_sum", "tps_count", "ratings", "rating_sum",
+]
+
+
+def to_frame(rows, columns):
+    """DataFrame with exactly `columns`, cast to their dtypes; missing fields become NA."""
+    df = pd.DataFrame.from_records(list(rows), columns=list(columns))
+    for col, dtype in columns.items():
+        if dtype == UTC_TS:
+            df[col] = pd.to_datetime(df[col], utc=True, errors="coerce")
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def latency_buckets(ms):
+    """Vectorized rollups.latency_bucket."""
+    ms = np.asarray(ms, dtype=float)
+    with np.errstate(divide="ignore"):
+        idx = np.floor(np.log(ms / LATENCY_MIN_MS) / np.log(LATENCY_GROWTH)) + 1
+    return np.where(ms < LATENCY_MIN_MS, 0, np.minimum(idx, LATENCY_BUCKETS)).astype(int)
+
+
+# ─────────────────────────────────────────────
+# Raw logs → daily rollup docs (backfill)
+# ─────────────────────────────────────────────
+def _day_ids(timestamps):
+    """YYYY-MM-DD per timestamp; formats only the distinct days (strftime per row dominates otherwise)."""
+    codes, uniques = pd.factorize(timestamps.dt.floor("D"))
+    return pd.DatetimeIndex(uniques).strftime("%Y-%m-%d").to_numpy(dtype=object)[codes]
+
+
+def _cells(days, fields, values=1.0):
+    """Sum of values per (day, field)."""
+    days = np.asarray(days, dtype=object)
+    fields = np.broadcast_to(np.asarray(fields, dtype=object), days.shape)
+    values = np.broadcast_to(np.asarray(values, dtype=float), days.shape)
+    index = pd.MultiIndex.from_arrays([days, fields], names=["day", "field"])
+    return pd.Series(values, index=index).groupby(level=[0, 1]).sum()
+
+
+def daily_rollups(usage, performance, ratings, users):
+    """
+    {day: doc} for analytics_daily, from typed frames — the same fields
+    the live path increments, computed with groupby instead of per-row loops.
+    """
+    parts = []
+
+    u = usage.dropna(subset=["timestamp"])
+    u = u[u["event"].isin(["message_sent", "document_uploaded"])]
+    if len(u):
+        u_day = _day_ids(u["timestamp"])
+        is_msg = (u["event"] == "message_sent").to_numpy()
+        parts.append(_cells(u_day, np.where(is_msg, "messages", "documents")))
+        parts.append(_cells(u_day, "active." + u["uid"].fillna("unknown").to_numpy(dtype=object)))
+        hours = u["timestamp"].dt.hour.to_numpy()[is_msg]
+        parts.append(_cells(u_day[is_msg], np.char.add("messages_by_hour.", np.char.zfill(hours.astype(str), 2))))
+
+    p = performance.dropna(subset=["timestamp", "response_time_ms"])
+    if len(p):
+        p_day = _day_ids(p["timestamp"])
+        ms = p["response_time_ms"].to_numpy()
+        ttft = p["ttft_ms"].to_numpy(na_value=np.nan)
+        tps = p["tokens_per_sec"].fillna(0).to_numpy()
+        streamed = ~np.isnan(ttft)
+        with_tps = streamed & (tps != 0)
+        parts += [
+            _cells(p_day, "requests"),
+            _cells(p_day, "successes", p["success"].fillna(False).to_numpy(dtype=float)),
+            _cells(p_day, "cache_hits", p["cache_hit"].fillna(False).to_numpy(dtype=float)),
+            _cells(p_day, "response_ms_sum", ms),
+            _cells(p_day, np.char.add("latency_hist.", latency_buckets(ms).astype(str))),
+            _cells(p_day[streamed], "streamed"),
+            _cells(p_day[streamed], "ttft_ms_sum", ttft[streamed]),
+            _cells(p_day[with_tps], "tps_sum", tps[with_tps]),
+            _cells(p_day[with_tps], "tps_count"),
+        ]
+
+    r = ratings.dropna(subset=["timestamp", "rating"])
+    if len(r):
+        r_day = _day_ids(r["timestamp"])
+        parts += [_cells(r_day, "ratings"), _cells(r_day, "rating_sum", r["rating"].to_numpy())]
+
+    created = users["created_at"].dropna()
+    if len(created):
+        parts.append(_cells(_day_ids(created), "new_users"))
+
+    if not parts:
+        return {}
+    cells = pd.concat(parts).groupby(level=[0, 1]).sum()
+    flat = {}
+    for (day, field), value in cells.items():
+        if value:
+            flat.setdefault(day, {})[field] = int(value) if float(value).is_integer() else float(value)
+    return {day: {"date": day, **nest(fields)} for day, fields in flat.items()}
+
+
+# ─────────────────────────────────────────────
+# Rollup docs → dashboard KPIs
+# ─────────────────────────────────────────────
+class DashboardMetrics:
+    """
+    Every admin KPI, computed once from daily rollup docs.
+
+    The docs are flattened into one frame (a row per day, dotted columns
+    for the map fields) and each metric is a column sum, a boolean
+    matrix reduction or a resample — no per-event Python loops. The
+    per-user `active` maps stay out of the frame: only the last 30 days
+    feed the day × user activity matrix behind DAU/WAU/MAU and churn.
+    days must reach back 30 days before `now` for those; range totals
+    only count days on or after `since`.
+    """
+
+    def __init__(self, days, totals, now, since=None):
+        scalars = [{k: v for k, v in d.items() if k != "active"} for d in days]
+        frame = pd.json_normalize(scalars) if days else pd.DataFrame({"date": []})
+        frame.index = pd.to_datetime(frame.pop("date"), utc=True)
+        frame = frame.sort_index()
+        self.frame = frame
+        self.totals = totals
+        self.now = now
+        self.since = since
+        self.range = frame[frame.index >= pd.Timestamp(day_id(since), tz="UTC")] if since else frame
+
+        sums = self.range.reindex(columns=SCALAR_FIELDS).sum().fillna(0)
+        self.messages = int(sums["messages"])
+        self.documents = int(sums["documents"])
+        self.requests = int(sums["requests"])
+        self.successes = int(sums["successes"])
+        self.cache_hits = int(sums["cache_hits"])
+        self.streamed = int(sums["streamed"])
+        self.ratings = int(sums["ratings"])
+        self.avg_response = sums["response_ms_sum"] / self.requests if self.requests else 0.0
+        self.avg_ttft = sums["ttft_ms_sum"] / self.streamed if self.streamed else 0.0
+        self.avg_tps = sums["tps_sum"] / sums["tps_count"] if sums["tps_count"] else 0.0
+        self.avg_rating = sums["rating_sum"] / self.ratings if self.ratings else 0.0
+
+        self.total_users = int(totals.get("users", 0))
+        self.premium_users = int(totals.get("premium_users", 0))
+        self.free_users = self.total_users - self.premium_users
+        self.new_users = int(sums["new_users"]) if since else self.total_users
+
+        recent = [d for d in days if d["date"] >= day_id(now - pd.Timedelta(days=30))]
+        active_uids = [[uid for uid, n in (d.get("active") or {}).items() if n] for d in recent]
+        codes, uids = pd.factorize(np.array([uid for day in active_uids for uid in day], dtype=object))
+        active = np.zeros((len(recent), len(uids)), dtype=bool)
+        active[np.repeat(np.arange(len(recent)), [len(day) for day in active_uids]), codes] = True
+        dates = np.array([d["date"] for d in recent], dtype=object)
+
+        def _window(n_days):
+            rows = dates >= day_id(now - pd.Timedelta(days=n_days))
+            return active[rows].any(axis=0) if active.size else np.zeros(0, dtype=bool)
+
+        self.dau = int(active[dates == day_id(now)].any(axis=0).sum()) if active.size else 0
+        wau, mau = _window(7), _window(30)
+        self.active_7 = int(wau.sum())
+        self.active_30 = int(mau.sum())
+        self.churned = int((mau & ~wau).sum())
+
+    # ── derived rates ──
+    @property
+    def success_rate(self):
+        return self.successes / self.requests * 100 if self.requests else 0.0
+
+    @property
+    def cache_rate(self):
+        return self.cache_hits / self.requests * 100 if self.requests else 0.0
+
+    # ── distributions and series ──
+    def _prefixed(self, prefix):
+        cols = self.range.filter(like=prefix)
+        sums = cols.sum()
+        sums.index = sums.index.str.slice(len(prefix))
+        return sums
+
+    def hour_counts(self):
+        """Messages per UTC hour of day, length 24."""
+        sums = self._prefixed("messages_by_hour.")
+        sums.index = sums.index.astype(int)
+        return sums.reindex(range(24), fill_value=0).astype(int).tolist()
+
+    def latency_percentiles(self, qs=(50, 95, 99)):
+        """{q: ms} from the merged histogram, at each bucket's geometric midpoint."""
+        sums = self._prefixed("latency_hist.")
+        counts = np.zeros(LATENCY_BUCKETS + 1)
+        counts[sums.index.astype(int)] = sums.to_numpy()
+        if not counts.sum():
+            return {q: 0.0 for q in qs}
+        cumulative = np.cumsum(counts)
+        buckets = np.searchsorted(cumulative, np.asarray(qs) / 100 * cumulative[-1])
+        mids = np.where(buckets == 0, LATENCY_MIN_MS / 2, LATENCY_MIN_MS * LATENCY_GROWTH ** (buckets - 0.5))
+        return dict(zip(qs, mids.tolist()))
+
+    def series(self, freq="D"):
+        """Messages, requests and average response time per time bucket (pandas offset alias)."""
+        cols = self.range.reindex(columns=["messages", "requests", "response_ms_sum"]).fillna(0)
+        if cols.empty:
+            return pd.DataFrame(columns=["messages", "requests", "avg_response_ms"])
+        binned = cols.resample(freq).sum()
+        binned["avg_response_ms"] = binned["response_ms_sum"] / binned["requests"].where(binned["requests"] > 0)
+        return binned.drop(columns="response_ms_sum")
+
+    def plan_mix(self):
+        """Plan / Users frame for the plan-distribution pie."""
+        return pd.DataFrame({"Plan": ["Free", "Premium"], "Users": [self.free_users, self.premium_users]})
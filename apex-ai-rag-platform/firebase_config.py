@@ -3,10 +3,17 @@ from firebase_admin import credentials, firestore, auth
 import streamlit as st
 import os
 import json
+import time
+import threading
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 import pytz
 import stripe
 
+from telemetry import get_writer, add_event, update_event
+import rollups
+from dashboard_metrics import DashboardMetrics
+
 # ─────────────────────────────────────────────
 # Constants
 # ─────────────────────────────────────────────
@@ -125,6 +132,10 @@ def sign_up(email: str, password: str, full_name: str, role: str = "user"):
         "subscription_status": None,
         "plan_changed_at": datetime.now(pytz.utc),
     })
+    _telemetry().enqueue(
+        rollups.totals_event(users=1),
+        rollups.daily_event(datetime.now(pytz.utc), {"new_users": 1}),
+    )
     return user
 
 
@@ -147,12 +158,10 @@ def sign_in(email: str, password: str):
     
     result = resp.json()
     
-    # Fetch user role from Firestore
-    db = get_db()
-    user_doc = db.collection("users").document(result["localId"]).get()
+    # Fetch user role from Firestore (also seeds the user-state cache)
+    user_data = get_user_data(result["localId"], max_age=0)
     
-    if user_doc.exists:
-        user_data = user_doc.to_dict()
+    if user_data:
         result["role"] = user_data.get("role", "user")
         result["full_name"] = user_data.get("full_name", "")
     else:
@@ -168,19 +177,94 @@ def get_user_by_email(email: str):
     return auth.get_user_by_email(email)
 
 
-def get_user_data(uid: str):
+# ─────────────────────────────────────────────
+# Cached User State
+# ─────────────────────────────────────────────
+# Profiles are cached per uid for USER_CACHE_TTL seconds and shared by all
+# sessions in the process, so reruns and limit checks don't re-read
+# Firestore. Counter increments are applied locally at once and tracked
+# as pending until the telemetry writer commits them; a refresh from
+# Firestore adds the still-pending part back on top, and is retried when
+# a commit overlaps it (see TelemetryWriter.commit_seq).
+USER_CACHE_TTL = float(os.environ.get("APEX_USER_CACHE_TTL", "30"))
+USER_READ_ATTEMPTS = 3  # re-reads when a telemetry commit overlaps a profile read
+
+_user_cache = {}  # uid -> {"data": dict, "fetched_at": monotonic}
+_pending_counts = defaultdict(Counter)  # uid -> field -> increments not yet in Firestore
+_user_cache_lock = threading.Lock()
+
+
+def get_user_data(uid: str, max_age: float = USER_CACHE_TTL):
     """
-    Get complete user data from Firestore.
+    Get complete user data, from the cache when fresher than max_age seconds.
+    
+    Args:
+        uid: Firebase user ID
+        max_age: Pass 0 to force a Firestore read
     
     Returns:
         Dict with all user fields or None if not found
     """
-    db = get_db()
-    user_doc = db.collection("users").document(uid).get()
+    with _user_cache_lock:
+        entry = _user_cache.get(uid)
+        if entry and time.monotonic() - entry["fetched_at"] < max_age:
+            return dict(entry["data"])
     
-    if user_doc.exists:
-        return user_doc.to_dict()
-    return None
+    db = get_db()
+    writer = _telemetry()
+    for _ in range(USER_READ_ATTEMPTS):
+        # A commit that lands between the read and the pending snapshot would
+        # be counted twice (or not at all); commit_seq tells us to read again.
+        seq = writer.commit_seq
+        user_doc = db.collection("users").document(uid).get()
+        with _user_cache_lock:
+            pending = dict(_pending_counts.get(uid, {}))
+        consistent = seq % 2 == 0 and writer.commit_seq == seq
+        if consistent:
+            break
+    
+    with _user_cache_lock:
+        if not user_doc.exists:
+            _user_cache.pop(uid, None)
+            return None
+        data = user_doc.to_dict()
+        for field, n in pending.items():
+            data[field] = data.get(field, 0) + n
+        if consistent:
+            _user_cache[uid] = {"data": data, "fetched_at": time.monotonic()}
+        return dict(data)
+
+
+def update_cached_user(uid: str, fields: dict):
+    """Write-through: apply fields just written to Firestore to the cached copy."""
+    with _user_cache_lock:
+        entry = _user_cache.get(uid)
+        if entry:
+            entry["data"].update(fields)
+
+
+def _bump_counter(uid: str, field: str, now: datetime):
+    """Local atomic increment; Firestore catches up when the telemetry batch commits."""
+    with _user_cache_lock:
+        _pending_counts[uid][field] += 1
+        entry = _user_cache.get(uid)
+        if entry:
+            entry["data"][field] = entry["data"].get(field, 0) + 1
+            entry["data"]["last_active"] = now
+
+
+def _on_telemetry_commit(events):
+    """Counter increments in events are now in Firestore — stop adding them on refresh."""
+    with _user_cache_lock:
+        for event in events:
+            if event["op"] != "update" or event["collection"] != "users":
+                continue
+            pending = _pending_counts[event["doc"]]
+            pending.subtract(event["increments"])
+            for field in [f for f, n in pending.items() if n <= 0]:
+                del pending[field]
+            if not pending:
+                del _pending_counts[event["doc"]]
 
 
 # ─────────────────────────────────────────────
@@ -237,57 +321,62 @@ def check_document_limit(uid: str):
 
 
 # ─────────────────────────────────────────────
-# Usage Tracking (existing, unchanged)
+# Usage Tracking
 # ─────────────────────────────────────────────
+# Writes are queued and committed in batches by a background thread (see
+# telemetry.py), so none of these block the chat turn on Firestore.
+def _telemetry():
+    return get_writer(get_db, firestore.Increment, on_commit=_on_telemetry_commit)
+
+
 def track_message(uid: str):
     """Increment message counter for a user and log to usage_logs."""
-    db = get_db()
-    # Atomic increment on user doc
-    db.collection("users").document(uid).update({
-        "messages_sent": firestore.Increment(1),
-        "last_active": datetime.now(pytz.utc),
-    })
-    # Append a usage log entry
-    db.collection("usage_logs").add({
-        "uid": uid,
-        "event": "message_sent",
-        "timestamp": datetime.now(pytz.utc),
-    })
+    now = datetime.now(pytz.utc)
+    _bump_counter(uid, "messages_sent", now)
+    _telemetry().enqueue(
+        update_event("users", uid, {"last_active": now}, {"messages_sent": 1}),
+        add_event("usage_logs", {"uid": uid, "event": "message_sent", "timestamp": now}),
+        rollups.daily_event(now, rollups.usage_increments(uid, "message_sent", now)),
+    )
 
 
 def track_document_upload(uid: str):
     """Increment doc counter and log."""
-    db = get_db()
-    db.collection("users").document(uid).update({
-        "docs_uploaded": firestore.Increment(1),
-        "last_active": datetime.now(pytz.utc),
-    })
-    db.collection("usage_logs").add({
-        "uid": uid,
-        "event": "document_uploaded",
-        "timestamp": datetime.now(pytz.utc),
-    })
-
-
-def track_response_time(uid: str, response_ms: int, success: bool):
-    """Log response-time and success/error for performance metrics."""
-    db = get_db()
-    db.collection("performance_logs").add({
-        "uid": uid,
-        "response_time_ms": response_ms,
-        "success": success,
-        "timestamp": datetime.now(pytz.utc),
-    })
+    now = datetime.now(pytz.utc)
+    _bump_counter(uid, "docs_uploaded", now)
+    _telemetry().enqueue(
+        update_event("users", uid, {"last_active": now}, {"docs_uploaded": 1}),
+        add_event("usage_logs", {"uid": uid, "event": "document_uploaded", "timestamp": now}),
+        rollups.daily_event(now, rollups.usage_increments(uid, "document_uploaded", now)),
+    )
+
+
+def track_response_time(uid: str, response_ms: int, success: bool, cache_hit: bool = False,
+                        ttft_ms: int = None, tokens_per_sec: float = None):
+    """Log response-time and success/error for performance metrics (+ TTFT and tokens/sec when streamed)."""
+    now = datetime.now(pytz.utc)
+    _telemetry().enqueue(
+        add_event("performance_logs", {
+            "uid": uid,
+            "response_time_ms": response_ms,
+            "ttft_ms": ttft_ms,
+            "tokens_per_sec": tokens_per_sec,
+            "success": success,
+            "cache_hit": cache_hit,
+            "timestamp": now,
+        }),
+        rollups.daily_event(now, rollups.performance_increments(
+            response_ms, success, cache_hit, ttft_ms, tokens_per_sec)),
+    )
 
 
 def track_rating(uid: str, rating: int):
     """Log a user satisfaction rating (1-5)."""
-    db = get_db()
-    db.collection("ratings").add({
-        "uid": uid,
-        "rating": rating,
-        "timestamp": datetime.now(pytz.utc),
-    })
+    now = datetime.now(pytz.utc)
+    _telemetry().enqueue(
+        add_event("ratings", {"uid": uid, "rating": rating, "timestamp": now}),
+        rollups.daily_event(now, rollups.rating_increments(rating)),
+    )
 
 
 # ─────────────────────────────────────────────
@@ -347,19 +436,23 @@ def upgrade_to_premium(uid: str, stripe_session_id: str = None):
     db = get_db()
     
     # Get current user data
-    user_data = get_user_data(uid)
+    user_data = get_user_data(uid, max_age=0)
     if not user_data:
         return False
     
     plan_before = user_data.get("plan", "free")
     
     # Update user to premium
-    db.collection("users").document(uid).update({
+    updates = {
         "plan": "premium",
         "limits": PREMIUM_PLAN_LIMITS,
         "plan_changed_at": datetime.now(pytz.utc),
         "subscription_status": "active",
-    })
+    }
+    db.collection("users").document(uid).update(updates)
+    update_cached_user(uid, updates)
+    if plan_before != "premium":
+        _telemetry().enqueue(rollups.totals_event(premium_users=1))
     
     # Log conversion
     db.collection("conversions").add({
@@ -424,12 +517,14 @@ def get_all_users():
     return [doc.to_dict() for doc in db.collection("users").stream()]
 
 
-def get_usage_logs(since: datetime = None):
-    """Return usage_logs, optionally filtered by start date."""
+def get_usage_logs(since: datetime = None, limit: int = None):
+    """Return usage_logs, optionally filtered by start date. With limit: the newest entries first."""
     db = get_db()
     query = db.collection("usage_logs")
     if since:
         query = query.where("timestamp", ">=", since)
+    if limit:
+        query = query.order_by("timestamp", direction=firestore.Query.DESCENDING).limit(limit)
     return [doc.to_dict() for doc in query.stream()]
 
 
@@ -451,55 +546,32 @@ def get_ratings(since: datetime = None):
     return [doc.to_dict() for doc in query.stream()]
 
 
+def get_analytics_summary(since: datetime = None):
+    """
+    DashboardMetrics over the pre-aggregated rollup docs (see rollups.py).
+    Reads one doc per day in range (at least 30, for active/churn) plus totals.
+    """
+    db = get_db()
+    now = datetime.now(pytz.utc)
+    window = now - timedelta(days=30)
+    days = rollups.read_days(db, min(since, window) if since else None)
+    return DashboardMetrics(days, rollups.read_totals(db), now, since)
+
+
 # ─────────────────────────────────────────────
 # Database Migration Helper
 # ─────────────────────────────────────────────
 def migrate_existing_users():
     """
     Add new fields to existing user documents.
-    Run this ONCE after deploying the new code.
-    """
-    db = get_db()
-    users = db.collection("users").stream()
+    Run this ONCE after deploying the new code. Paged, batched and
+    resumable — see migrate_database.migrate_users.
     
-    count = 0
-    for user_doc in users:
-        uid = user_doc.id
-        data = user_doc.to_dict()
-        
-        updates = {}
-        
-        # Add missing fields with defaults
-        if "role" not in data:
-            updates["role"] = "user"
-        
-        if "full_name" not in data:
-            # Extract from email as placeholder
-            updates["full_name"] = data.get("email", "").split("@")[0].title()
-        
-        if "limits" not in data:
-            updates["limits"] = FREE_PLAN_LIMITS.copy()
-        
-        if "stripe_customer_id" not in data:
-            updates["stripe_customer_id"] = None
-        
-        if "stripe_subscription_id" not in data:
-            updates["stripe_subscription_id"] = None
-        
-        if "subscription_status" not in data:
-            updates["subscription_status"] = None
-        
-        if "plan_changed_at" not in data:
-            updates["plan_changed_at"] = data.get("created_at", datetime.now(pytz.utc))
-        
-        # Apply updates
-        if updates:
-            db.collection("users").document(uid).update(updates)
-            count += 1
-            print(f"✅ Migrated user: {data.get('email', 'unknown')}")
-    
-    print(f"🎉 Migration complete! Updated {count} users.")
-    return count
+    Returns:
+        Number of users updated
+    """
+    from migrate_database import migrate_users
+    return migrate_users()["migrated"]
 
 
 # ─────────────────────────────────────────────
@@ -521,6 +593,14 @@ def migrate_existing_users():
 # Collection: ratings
 #   {auto} → { uid, rating (1-5), timestamp }
 #
+# Collection: analytics_daily (rollups.py)
+#   {YYYY-MM-DD} → { date, messages, documents, new_users, active{uid}, messages_by_hour{HH},
+#       requests, successes, cache_hits, response_ms_sum, latency_hist{bucket},
+#       streamed, ttft_ms_sum, tps_sum, tps_count, ratings, rating_sum }
+#
+# Collection: analytics
+#   totals → { users, premium_users }
+#
 # Collection: conversions
 #   {auto} → { uid, converted_at, plan_before, plan_after, stripe_session_id, amount_paid, currency }
 #
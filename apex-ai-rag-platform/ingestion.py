@@ -0,0 +1,242 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from langchain_community.vectorstores import FAISS
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from vector_index import DEFAULT_INDEX_DIR, SPLITTER_CONFIG, read_build
+
+try:
+    import psutil
+except ImportError:  # optional — without it only the byte budget applies
+    psutil = None
+
+# ─────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────
+INGEST_WORKERS = int(os.environ.get("APEX_INGEST_WORKERS", "2"))
+EMBED_BATCH_SIZE = 32
+
+# Resident per-user indexes are evicted (LRU) past this budget, or when
+# system memory use crosses MEMORY_HIGH_PERCENT. Evicted indexes stay on
+# disk and are reloaded on next use.
+USER_INDEX_BUDGET_BYTES = int(os.environ.get("APEX_USER_INDEX_BUDGET_MB", "256")) * 1024 * 1024
+MEMORY_HIGH_PERCENT = 85.0
+
+USER_INDEX_DIR = os.path.join(DEFAULT_INDEX_DIR, "users")
+
+
+# ─────────────────────────────────────────────
+# Per-user index persistence
+# ─────────────────────────────────────────────
+def _user_dir(uid):
+    return os.path.join(USER_INDEX_DIR, re.sub(r"[^A-Za-z0-9_-]", "_", uid))
+
+
+def _save_user_index(uid, manifest, vectors):
+    """Write to a temp dir, then swap it in — readers never see a torn pair."""
+    final_dir = _user_dir(uid)
+    os.makedirs(USER_INDEX_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=USER_INDEX_DIR)
+    np.save(os.path.join(tmp_dir, "vectors.npy"), vectors)
+    with open(os.path.join(tmp_dir, "chunks.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    old_dir = f"{final_dir}.old-{uuid.uuid4().hex[:8]}"
+    if os.path.exists(final_dir):
+        os.rename(final_dir, old_dir)
+    os.rename(tmp_dir, final_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class UserIndex:
+    """One user's uploaded chunks: FAISS store + the raw rows it was built from."""
+
+    def __init__(self, manifest, vectors, embeddings):
+        self.manifest = manifest
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.store = None
+        if len(self.vectors):
+            self.store = FAISS.from_embeddings(
+                text_embeddings=list(zip([c["text"] for c in manifest["chunks"]], self.vectors)),
+                embedding=embeddings,
+                metadatas=[c["metadata"] for c in manifest["chunks"]],
+            )
+
+    @property
+    def nbytes(self):
+        # FAISS flat index holds its own copy of the vectors
+        return 2 * self.vectors.nbytes + sum(len(c["text"]) for c in self.manifest["chunks"])
+
+    def append(self, texts, metadatas, vectors, embeddings):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        pairs = list(zip(texts, vectors))
+        if self.store is None:
+            self.store = FAISS.from_embeddings(text_embeddings=pairs, embedding=embeddings, metadatas=metadatas)
+        else:
+            self.store.add_embeddings(text_embeddings=pairs, metadatas=metadatas)
+        self.vectors = np.concatenate([self.vectors.reshape(-1, vectors.shape[1]), vectors])
+        self.manifest["chunks"].extend({"text": t, "metadata": m} for t, m in zip(texts, metadatas))
+
+
+# ─────────────────────────────────────────────
+# Ingestion manager
+# ─────────────────────────────────────────────
+class IngestionManager:
+    """
+    Background ingestion of user uploads into per-user FAISS indexes.
+
+    submit() returns immediately; a worker pool parses, splits, embeds in
+    batches and appends to the user's index. The global knowledge.txt index
+    is never touched. jobs_for() exposes progress for the UI.
+    """
+
+    def __init__(self, embeddings, workers=INGEST_WORKERS, budget_bytes=USER_INDEX_BUDGET_BYTES):
+        self.embeddings = embeddings
+        self.budget_bytes = budget_bytes
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self.jobs = {}
+        self.indexes = OrderedDict()  # uid -> UserIndex, LRU order
+        self._lock = threading.Lock()
+        self._user_locks = {}
+
+    # ── jobs ──
+    def submit(self, uid, filename, data):
+        """Queues one upload. Returns the job id."""
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._prune_jobs()
+            self.jobs[job_id] = {
+                "id": job_id, "uid": uid, "filename": filename,
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "stage": "queued", "progress": 0.0, "chunks": 0,
+                "error": None, "submitted_at": time.time(), "finished_at": None,
+            }
+        self.pool.submit(self._run, job_id, uid, filename, data)
+        return job_id
+
+    def _prune_jobs(self, max_age=3600):
+        """Forget finished jobs after an hour. Caller holds the lock."""
+        cutoff = time.time() - max_age
+        for job_id in [j["id"] for j in self.jobs.values() if j["finished_at"] and j["finished_at"] < cutoff]:
+            del self.jobs[job_id]
+
+    def jobs_for(self, uid):
+        """Snapshot of a user's jobs, newest first."""
+        with self._lock:
+            jobs = [dict(j) for j in self.jobs.values() if j["uid"] == uid]
+        return sorted(jobs, key=lambda j: j["submitted_at"], reverse=True)
+
+    def _update(self, job_id, **fields):
+        # stage: queued → parsing → embedding → indexing → done | failed
+        with self._lock:
+            self.jobs[job_id].update(fields)
+
+    def _run(self, job_id, uid, filename, data):
+        try:
+            self._update(job_id, stage="parsing", progress=0.05)
+            docs = self._parse(filename, data)
+            chunks = RecursiveCharacterTextSplitter(**SPLITTER_CONFIG).split_documents(docs)
+            chunks = [c for c in chunks if c.page_content.strip()]
+            if not chunks:
+                raise ValueError("no extractable text")
+
+            self._update(job_id, stage="embedding", progress=0.1, chunks=len(chunks))
+            texts = [c.page_content for c in chunks]
+            metadatas = [{**c.metadata, "source": filename, "job_id": job_id} for c in chunks]
+            vectors = []
+            for start in range(0, len(texts), EMBED_BATCH_SIZE):
+                vectors.extend(self.embeddings.embed_documents(texts[start:start + EMBED_BATCH_SIZE]))
+                done = min(start + EMBED_BATCH_SIZE, len(texts))
+                self._update(job_id, progress=0.1 + 0.8 * done / len(texts))
+
+            self._update(job_id, stage="indexing", progress=0.9)
+            with self._user_lock(uid):
+                index = self._get_index(uid)
+                index.append(texts, metadatas, vectors, self.embeddings)
+                _save_user_index(uid, index.manifest, index.vectors)
+            self._update(job_id, stage="done", progress=1.0, finished_at=time.time())
+            self._evict_if_needed(keep=uid)
+        except Exception as e:
+            self._update(job_id, stage="failed", error=str(e)[:200], finished_at=time.time())
+
+    @staticmethod
+    def _parse(filename, data):
+        suffix = ".pdf" if filename.lower().endswith(".pdf") else ".txt"
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            loader = PyPDFLoader(path) if suffix == ".pdf" else TextLoader(path, autodetect_encoding=True)
+            return loader.load()
+        finally:
+            os.remove(path)
+
+    # ── per-user indexes ──
+    def _user_lock(self, uid):
+        with self._lock:
+            return self._user_locks.setdefault(uid, threading.Lock())
+
+    def _get_index(self, uid):
+        """Resident index, reloading from disk after eviction. Caller holds the user lock."""
+        with self._lock:
+            index = self.indexes.get(uid)
+            if index is not None:
+                self.indexes.move_to_end(uid)
+                return index
+        manifest, vectors = read_build(_user_dir(uid))
+        if manifest is None:
+            manifest, vectors = {"chunks": []}, np.zeros((0, 0), dtype=np.float32)
+        index = UserIndex(manifest, vectors, self.embeddings)
+        with self._lock:
+            self.indexes[uid] = index
+        return index
+
+    def has_documents(self, uid):
+        with self._lock:
+            if uid in self.indexes:
+                return self.indexes[uid].store is not None
+        return os.path.exists(os.path.join(_user_dir(uid), "chunks.json"))
+
+    def search(self, uid, query, k=4):
+        """Top-k chunks from the user's uploads; [] if they have none."""
+        if not uid or not self.has_documents(uid):
+            return []
+        vector = self.embeddings.embed_query(query)
+        with self._user_lock(uid):
+            # _run appends to the same store under this lock
+            index = self._get_index(uid)
+            if index.store is None:
+                return []
+            docs = index.store.similarity_search_by_vector(vector, k=k)
+        self._evict_if_needed(keep=uid)
+        return docs
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(i.nbytes for i in self.indexes.values())
+
+    def _memory_high(self):
+        return psutil is not None and psutil.virtual_memory().percent >= MEMORY_HIGH_PERCENT
+
+    def _evict_if_needed(self, keep=None):
+        """Drop least-recently-used indexes until under budget and memory pressure clears."""
+        with self._lock:
+            while len(self.indexes) > 1 or (self.indexes and keep not in self.indexes):
+                over_budget = sum(i.nbytes for i in self.indexes.values()) > self.budget_bytes
+                if not (over_budget or self._memory_high()):
+                    break
+                victim = next((u for u in self.indexes if u != keep), None)
+                if victim is None:
+                    break
+                del self.indexes[victim]
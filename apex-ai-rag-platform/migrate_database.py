@@ -5,10 +5,12 @@ Database Migration Script for Apex AI Upgrade
 This script adds new fields to existing user documents in Firestore
 to support the new authentication, pricing, and usage limit features.
 
-Run this ONCE after deploying the updated code.
+Run this ONCE after deploying the updated code. It is resumable: an
+interrupted run continues from its checkpoint.
 
 Usage:
-    python migrate_database.py
+    python migrate_database.py [--dry-run] [--restart] [--yes]
+                               [--page-size N] [--workers N]
 """
 
 import sys
@@ -17,14 +19,24 @@ import os
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from firebase_config import get_db, FREE_PLAN_LIMITS
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_config import get_db, update_cached_user, FREE_PLAN_LIMITS
 from datetime import datetime
 import pytz
 
 
-def migrate_users():
+PAGE_SIZE = 500  # one page = one WriteBatch (Firestore max 500 writes)
+WORKERS = 4
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".migration_checkpoint.json")
+
+
+def user_updates(data: dict) -> dict:
     """
-    Migrate all existing users by adding required new fields.
+    Missing fields for one user document (empty dict if up-to-date).
     
     New fields added:
     - role: "user" | "admin"
@@ -35,113 +47,200 @@ def migrate_users():
     - subscription_status: None
     - plan_changed_at: created_at or current time
     """
-    print("🚀 Starting database migration...")
+    email = data.get("email", "unknown")
+    updates = {}
+    
+    # 1. Add role (default to "user")
+    if "role" not in data:
+        updates["role"] = "user"
+    
+    # 2. Add full_name
+    if "full_name" not in data:
+        # Try to extract a nice name from email
+        if email and "@" in email:
+            name_part = email.split("@")[0]
+            # Convert john.doe or john_doe to John Doe
+            name_part = name_part.replace(".", " ").replace("_", " ")
+            updates["full_name"] = name_part.title()
+        else:
+            updates["full_name"] = "User"
+    
+    # 3. Add usage limits based on current plan
+    if "limits" not in data:
+        if data.get("plan", "free") == "premium":
+            updates["limits"] = {"messages": -1, "documents": -1}  # unlimited
+        else:
+            updates["limits"] = FREE_PLAN_LIMITS.copy()
+    
+    # 4. Add Stripe fields
+    for field in ("stripe_customer_id", "stripe_subscription_id", "subscription_status"):
+        if field not in data:
+            updates[field] = None
+    
+    # 5. Add plan_changed_at (created_at if available, otherwise current time)
+    if "plan_changed_at" not in data:
+        updates["plan_changed_at"] = data.get("created_at", datetime.now(pytz.utc))
+    
+    return updates
+
+
+# ─────────────────────────────────────────────
+# Checkpoint
+# ─────────────────────────────────────────────
+def load_checkpoint(path: str = CHECKPOINT_PATH):
+    """Last uid of the completed prefix, or None to start from the beginning."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("last_uid")
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(last_uid: str, stats: dict, path: str = CHECKPOINT_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"last_uid": last_uid, "stats": stats, "saved_at": datetime.now(pytz.utc).isoformat()}, f)
+    os.replace(tmp_path, path)
+
+
+# ─────────────────────────────────────────────
+# Runner
+# ─────────────────────────────────────────────
+def _pages(users_ref, page_size: int, after_uid: str = None):
+    """Yields lists of user snapshots, ordered by document id, via start_after cursors."""
+    cursor = users_ref.document(after_uid).get() if after_uid else None
+    if cursor is not None and not cursor.exists:
+        cursor = None  # checkpointed user was deleted — fall back to a fresh scan
+    while True:
+        query = users_ref.order_by("__name__").limit(page_size)
+        if cursor is not None:
+            query = query.start_after(cursor)
+        page = list(query.stream())
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        cursor = page[-1]
+
+
+def _migrate_page(db, users_ref, page, dry_run: bool):
+    """Computes updates for one page and commits them in a single batch. Returns (migrated, skipped)."""
+    pending = []
+    for user_doc in page:
+        updates = user_updates(user_doc.to_dict())
+        if updates:
+            pending.append((user_doc.id, updates))
+    
+    if dry_run:
+        for uid, updates in pending:
+            diff = ", ".join(f"+{k}={v!r}" for k, v in updates.items())
+            print(f"  ~ {uid}: {diff}")
+        return len(pending), len(page) - len(pending)
+    
+    if pending:
+        batch = db.batch()
+        for uid, updates in pending:
+            batch.update(users_ref.document(uid), updates)
+        batch.commit()
+        for uid, updates in pending:
+            update_cached_user(uid, updates)
+    return len(pending), len(page) - len(pending)
+
+
+def migrate_users(dry_run: bool = False, resume: bool = True, page_size: int = PAGE_SIZE,
+                  workers: int = WORKERS, checkpoint_path: str = CHECKPOINT_PATH):
+    """
+    Migrate all existing users by adding required new fields (see user_updates).
+    
+    Users are read in pages (cursor on document id) and each page is
+    committed as one batch on a bounded worker pool. After every page the
+    id of the last user in the completed prefix is checkpointed, so a
+    rerun resumes after it. Updates only add missing fields, so re-running
+    a page is harmless.
+    
+    Args:
+        dry_run: Print the per-user diff instead of writing (no checkpoint)
+        resume: Continue after the saved checkpoint, if any
+        page_size: Users per page / batch (max 500)
+        workers: Pages committed concurrently
+    
+    Returns:
+        Dict with migrated, skipped, errors, total, seconds
+    """
+    print(f"🚀 Starting database migration{' (dry run)' if dry_run else ''}...")
     print("-" * 50)
     
     db = get_db()
     users_ref = db.collection("users")
-    users = users_ref.stream()
+    after_uid = load_checkpoint(checkpoint_path) if resume and not dry_run else None
+    if after_uid:
+        print(f"↩️  Resuming after user {after_uid}")
     
-    migrated_count = 0
-    skipped_count = 0
-    error_count = 0
+    stats = {"migrated": 0, "skipped": 0, "errors": 0}
+    lock = threading.Lock()
+    done = {}  # page seq -> last uid, or None if the page failed
+    next_seq = [0]  # first page not yet folded into the checkpoint
+    in_flight = threading.BoundedSemaphore(workers * 2)
+    started = time.time()
     
-    for user_doc in users:
-        uid = user_doc.id
-        data = user_doc.to_dict()
-        email = data.get("email", "unknown")
-        
+    def _run(seq, page):
         try:
-            updates = {}
-            
-            # 1. Add role (default to "user")
-            if "role" not in data:
-                updates["role"] = "user"
-                print(f"  → Adding role: user")
-            
-            # 2. Add full_name
-            if "full_name" not in data:
-                # Try to extract a nice name from email
-                if email and "@" in email:
-                    name_part = email.split("@")[0]
-                    # Convert john.doe or john_doe to John Doe
-                    name_part = name_part.replace(".", " ").replace("_", " ")
-                    full_name = name_part.title()
-                else:
-                    full_name = "User"
-                
-                updates["full_name"] = full_name
-                print(f"  → Adding full_name: {full_name}")
-            
-            # 3. Add usage limits based on current plan
-            if "limits" not in data:
-                current_plan = data.get("plan", "free")
-                
-                if current_plan == "premium":
-                    limits = {"messages": -1, "documents": -1}  # unlimited
-                else:
-                    limits = FREE_PLAN_LIMITS.copy()
-                
-                updates["limits"] = limits
-                print(f"  → Adding limits: {limits}")
-            
-            # 4. Add Stripe fields
-            if "stripe_customer_id" not in data:
-                updates["stripe_customer_id"] = None
-                print("  → Adding stripe_customer_id: None")
-            
-            if "stripe_subscription_id" not in data:
-                updates["stripe_subscription_id"] = None
-                print("  → Adding stripe_subscription_id: None")
-            
-            if "subscription_status" not in data:
-                updates["subscription_status"] = None
-                print("  → Adding subscription_status: None")
-            
-            # 5. Add plan_changed_at
-            if "plan_changed_at" not in data:
-                # Use created_at if available, otherwise current time
-                plan_changed_at = data.get("created_at", datetime.now(pytz.utc))
-                updates["plan_changed_at"] = plan_changed_at
-                print(f"  → Adding plan_changed_at: {plan_changed_at}")
-            
-            # Apply updates if any
-            if updates:
-                users_ref.document(uid).update(updates)
-                migrated_count += 1
-                print(f"✅ Migrated user: {email}")
-            else:
-                skipped_count += 1
-                print(f"⏭️  Skipped (already up-to-date): {email}")
-            
-            print("-" * 50)
-        
+            _record(seq, page)
+        finally:
+            in_flight.release()
+    
+    def _record(seq, page):
+        try:
+            migrated, skipped = _migrate_page(db, users_ref, page, dry_run)
+            ok = True
         except Exception as e:
-            error_count += 1
-            print(f"❌ Error migrating {email}: {str(e)}")
-            print("-" * 50)
+            migrated, skipped, ok = 0, 0, False
+            print(f"❌ Page {seq} ({page[0].id} … {page[-1].id}) failed: {e}")
+        with lock:
+            stats["migrated"] += migrated
+            stats["skipped"] += skipped
+            stats["errors"] += 0 if ok else len(page)
+            done[seq] = page[-1].id if ok else None
+            # Advance the checkpoint over the contiguous run of successful pages
+            last_uid = None
+            while next_seq[0] in done and done[next_seq[0]] is not None:
+                last_uid = done.pop(next_seq[0])
+                next_seq[0] += 1
+            if last_uid and not dry_run:
+                save_checkpoint(last_uid, stats, checkpoint_path)
+            processed = stats["migrated"] + stats["skipped"] + stats["errors"]
+            rate = processed / max(time.time() - started, 1e-9)
+            print(f"📦 Page {seq}: +{migrated} migrated, {skipped} up-to-date · "
+                  f"{processed} users · {rate:,.0f} users/s")
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="migrate") as pool:
+        for seq, page in enumerate(_pages(users_ref, page_size, after_uid)):
+            in_flight.acquire()  # bounds pages held in memory, not just running
+            pool.submit(_run, seq, page)
+    
+    seconds = time.time() - started
+    total = stats["migrated"] + stats["skipped"] + stats["errors"]
     
     # Summary
     print("\n" + "=" * 50)
     print("📊 Migration Summary")
     print("=" * 50)
-    print(f"✅ Successfully migrated: {migrated_count} users")
-    print(f"⏭️  Skipped (up-to-date): {skipped_count} users")
-    print(f"❌ Errors: {error_count} users")
-    print(f"📈 Total processed: {migrated_count + skipped_count + error_count} users")
+    print(f"✅ {'Would migrate' if dry_run else 'Successfully migrated'}: {stats['migrated']} users")
+    print(f"⏭️  Skipped (up-to-date): {stats['skipped']} users")
+    print(f"❌ Errors: {stats['errors']} users")
+    print(f"📈 Total processed: {total} users in {seconds:.1f}s ({total / max(seconds, 1e-9):,.0f} users/s)")
     print("=" * 50)
     
-    if error_count == 0:
+    if stats["errors"] == 0:
+        if not dry_run and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)  # finished — next run starts fresh
         print("\n🎉 Migration completed successfully!")
     else:
-        print(f"\n⚠️  Migration completed with {error_count} errors. Please review.")
-    
-    return {
-        "migrated": migrated_count,
-        "skipped": skipped_count,
-        "errors": error_count,
-        "total": migrated_count + skipped_count + error_count
-    }
+        print(f"\n⚠️  Migration completed with {stats['errors']} errors. "
+              f"Re-run to resume from the last good checkpoint.")
+    
+    return {**stats, "total": total, "seconds": round(seconds, 2)}
 
 
 def verify_migration():
@@ -227,6 +326,16 @@ def create_admin_user(email: str, password: str, full_name: str):
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Apex AI database migration")
+    parser.add_argument("--dry-run", action="store_true", help="print per-user diffs, write nothing")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    parser.add_argument("--yes", action="store_true", help="skip the prompts (migrate only)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+    
     print("""
 ╔══════════════════════════════════════════════════════════╗
 ║         Apex AI Database Migration Script                ║
@@ -237,14 +346,23 @@ if __name__ == "__main__":
 """)
     
     # Confirm before proceeding
-    response = input("\n⚠️  Are you sure you want to run the migration? (yes/no): ")
-    
-    if response.lower() not in ["yes", "y"]:
-        print("❌ Migration cancelled.")
-        sys.exit(0)
+    if not (args.yes or args.dry_run):
+        response = input("\n⚠️  Are you sure you want to run the migration? (yes/no): ")
+        
+        if response.lower() not in ["yes", "y"]:
+            print("❌ Migration cancelled.")
+            sys.exit(0)
     
     # Run migration
-    results = migrate_users()
+    results = migrate_users(
+        dry_run=args.dry_run,
+        resume=not args.restart,
+        page_size=min(args.page_size, PAGE_SIZE),
+        workers=max(args.workers, 1),
+    )
+    
+    if args.yes or args.dry_run:
+        sys.exit(1 if results["errors"] else 0)
     
     # Verify migration
     if input("\n🔍 Run verification check? (yes/no): ").lower() in ["yes", "y"]:
@@ -0,0 +1,210 @@
+import os
+import re
+import math
+import time
+import logging
+import threading
+from collections import Counter, defaultdict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────
+def _env_flag(name, default):
+    return os.environ.get(name, default).lower() in ("1", "true", "yes")
+
+
+RETRIEVAL_CONFIG = {
+    # Stages
+    "dense": True,
+    "sparse": _env_flag("APEX_RETRIEVAL_SPARSE", "1"),
+    "rerank": _env_flag("APEX_RERANK", "0"),
+    # Dense (FAISS MMR over MiniLM)
+    "dense_k": 12,
+    "dense_fetch_k": 24,
+    "lambda_mult": 0.7,
+    # Sparse (BM25)
+    "sparse_k": 12,
+    "bm25_k1": 1.5,
+    "bm25_b": 0.75,
+    # Reciprocal-rank fusion: score = sum 1 / (rrf_k + rank)
+    "rrf_k": 60,
+    "final_k": 6,  # chunks sent to the LLM without a reranker
+    # Top hits of each `extra` list (the user's uploads) that always make the
+    # final cut — KB chunks found by both dense and BM25 otherwise outscore them
+    "extra_slots": 2,
+    # Cross-encoder reranker (sentence-transformers, runs locally)
+    "rerank_model": os.environ.get("APEX_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+    "rerank_candidates": 12,
+    "rerank_top_n": int(os.environ.get("APEX_RERANK_TOP_N", "4")),
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Lowercased word tokens; numbers and product names survive intact."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+# ─────────────────────────────────────────────
+# BM25
+# ─────────────────────────────────────────────
+class BM25Index:
+    """
+    Okapi BM25 over a fixed list of texts.
+
+    Per-(term, doc) weights are precomputed at build time, so a query is
+    one scatter-add per query term into a score vector.
+    """
+
+    def __init__(self, texts, k1=RETRIEVAL_CONFIG["bm25_k1"], b=RETRIEVAL_CONFIG["bm25_b"]):
+        tokenized = [tokenize(t) for t in texts]
+        self.size = len(texts)
+        doc_len = np.array([len(t) for t in tokenized], dtype=np.float32)
+        avgdl = float(doc_len.mean()) if self.size and doc_len.sum() else 1.0
+        norm = k1 * (1 - b + b * doc_len / avgdl)
+
+        raw = defaultdict(lambda: ([], []))
+        for i, tokens in enumerate(tokenized):
+            for term, tf in Counter(tokens).items():
+                raw[term][0].append(i)
+                raw[term][1].append(tf)
+
+        self.postings = {}
+        for term, (ids, tfs) in raw.items():
+            ids = np.asarray(ids, dtype=np.int32)
+            tfs = np.asarray(tfs, dtype=np.float32)
+            idf = math.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            self.postings[term] = (ids, idf * tfs * (k1 + 1) / (tfs + norm[ids]))
+
+    def search(self, query, k):
+        """[(doc index, score)] best first, only docs sharing a term with the query."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+        hits = np.flatnonzero(scores)
+        if not len(hits):
+            return []
+        top = hits[np.argsort(-scores[hits], kind="stable")[:k]]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+# ─────────────────────────────────────────────
+# Reranker
+# ─────────────────────────────────────────────
+_cross_encoders = {}
+_cross_encoder_lock = threading.Lock()
+
+
+def load_cross_encoder(model_name):
+    """Process-wide CrossEncoder, or None when sentence-transformers is unavailable."""
+    with _cross_encoder_lock:
+        if model_name not in _cross_encoders:
+            try:
+                from sentence_transformers import CrossEncoder
+                _cross_encoders[model_name] = CrossEncoder(model_name)
+            except Exception as e:  # missing package or model download failure
+                logger.warning("reranker disabled: %s", e)
+                _cross_encoders[model_name] = None
+        return _cross_encoders[model_name]
+
+
+# ─────────────────────────────────────────────
+# Pipeline
+# ─────────────────────────────────────────────
+def _doc_key(doc):
+    return doc.metadata.get("chunk_hash") or (doc.metadata.get("source"), doc.page_content)
+
+
+def reciprocal_rank_fusion(ranked_lists, rrf_k=RETRIEVAL_CONFIG["rrf_k"]):
+    """Documents from several best-first lists, ordered by summed 1 / (rrf_k + rank)."""
+    scores, docs = defaultdict(float), {}
+    for ranked in ranked_lists:
+        for rank, doc in enumerate(ranked, start=1):
+            key = _doc_key(doc)
+            scores[key] += 1.0 / (rrf_k + rank)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def reserve_slots(ranked, reserved, n):
+    """
+    First n of ranked, except that the top `slots` docs of every
+    (docs, slots) pair in reserved are always kept, displacing the
+    lowest-ranked others. Order follows ranked; reserved docs missing
+    from it go last.
+    """
+    must = list({_doc_key(d): d for docs, slots in reserved for d in docs[:slots]}.items())[:n]
+    chosen = {key for key, _ in must}
+    chosen.update([_doc_key(d) for d in ranked if _doc_key(d) not in chosen][:n - len(must)])
+    in_ranked = {_doc_key(d) for d in ranked}
+    return [d for d in ranked if _doc_key(d) in chosen] + [d for key, d in must if key not in in_ranked]
+
+
+class HybridRetriever:
+    """
+    dense (FAISS MMR) + sparse (BM25) → reciprocal-rank fusion → optional
+    cross-encoder rerank with a top-n cutoff.
+
+    The BM25 index is built over the same chunks the FAISS store holds.
+    Every stage can be switched off in config and is timed; retrieve()
+    returns the timings next to the documents.
+    """
+
+    def __init__(self, vectorstore, config=None):
+        self.config = {**RETRIEVAL_CONFIG, **(config or {})}
+        self.vectorstore = vectorstore
+        ids = [vectorstore.index_to_docstore_id[i] for i in range(len(vectorstore.index_to_docstore_id))]
+        self.docs = [vectorstore.docstore.search(doc_id) for doc_id in ids]
+        t0 = time.perf_counter()
+        self.bm25 = BM25Index(
+            [d.page_content for d in self.docs], self.config["bm25_k1"], self.config["bm25_b"],
+        ) if self.config["sparse"] else None
+        self.build_ms = round((time.perf_counter() - t0) * 1000, 1)
+        self.reranker = load_cross_encoder(self.config["rerank_model"]) if self.config["rerank"] else None
+
+    def retrieve(self, question, extra=None):
+        """
+        (documents, timings_ms). extra maps a stage name to a callable
+        question -> ranked documents (e.g. the user's uploads); each is
+        fused as one more ranked list, and its top `extra_slots` hits are
+        guaranteed a place in the result.
+        """
+        cfg, timings, ranked_lists, reserved = self.config, {}, [], []
+
+        def _timed(name, fn):
+            t0 = time.perf_counter()
+            out = fn()
+            timings[name] = round((time.perf_counter() - t0) * 1000, 1)
+            return out
+
+        if cfg["dense"]:
+            ranked_lists.append(_timed("dense", lambda: self.vectorstore.max_marginal_relevance_search(
+                question, k=cfg["dense_k"], fetch_k=cfg["dense_fetch_k"], lambda_mult=cfg["lambda_mult"],
+            )))
+        if self.bm25 is not None:
+            ranked_lists.append(_timed("sparse", lambda: [
+                self.docs[i] for i, _ in self.bm25.search(question, cfg["sparse_k"])
+            ]))
+        for name, source in (extra or {}).items():
+            ranked_lists.append(_timed(name, lambda: source(question)))
+            reserved.append((ranked_lists[-1], cfg["extra_slots"]))
+
+        fused = _timed("fusion", lambda: reciprocal_rank_fusion(ranked_lists, cfg["rrf_k"]))
+        if self.reranker is None or not fused:
+            return reserve_slots(fused, reserved, cfg["final_k"]), timings
+
+        candidates = reserve_slots(fused, reserved, cfg["rerank_candidates"])
+
+        def _rerank():
+            scores = self.reranker.predict([(question, d.page_content) for d in candidates])
+            order = np.argsort(-np.asarray(scores), kind="stable")
+            return reserve_slots([candidates[i] for i in order], reserved, cfg["rerank_top_n"])
+
+        return _timed("rerank", _rerank), timings
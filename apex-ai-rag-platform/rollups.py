@@ -0,0 +1,144 @@
+import math
+from datetime import datetime
+
+from telemetry import update_event
+
+# ─────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────
+# analytics_daily/{YYYY-MM-DD}  one doc per UTC day, maintained by increments
+# analytics/totals              user and premium counts
+DAILY_COLLECTION = "analytics_daily"
+TOTALS_COLLECTION, TOTALS_DOC = "analytics", "totals"
+
+# Latency histogram: bucket i covers [LATENCY_MIN_MS * g^(i-1), LATENCY_MIN_MS * g^i),
+# bucket 0 everything below LATENCY_MIN_MS. Percentiles read from it are within ~10%
+# (see DashboardMetrics.latency_percentiles).
+LATENCY_MIN_MS = 50
+LATENCY_GROWTH = 1.2
+LATENCY_BUCKETS = 40  # top bucket starts around 60 s
+
+BACKFILL_BATCH = 500
+
+
+# ─────────────────────────────────────────────
+# Keys and histogram
+# ─────────────────────────────────────────────
+def day_id(ts):
+    return ts.strftime("%Y-%m-%d")
+
+
+def latency_bucket(ms):
+    if ms < LATENCY_MIN_MS:
+        return 0
+    return min(int(math.log(ms / LATENCY_MIN_MS) / math.log(LATENCY_GROWTH)) + 1, LATENCY_BUCKETS)
+
+
+# ─────────────────────────────────────────────
+# Per-event increments
+# ─────────────────────────────────────────────
+# Used on the live telemetry path; dashboard_metrics.daily_rollups computes
+# the same fields in bulk for the backfill. Dotted names are nested map fields.
+
+def usage_increments(uid, event, ts):
+    counter = "messages" if event == "message_sent" else "documents"
+    inc = {counter: 1, f"active.{uid}": 1}
+    if event == "message_sent":
+        inc[f"messages_by_hour.{ts.hour:02d}"] = 1
+    return inc
+
+
+def performance_increments(response_ms, success, cache_hit=False, ttft_ms=None, tokens_per_sec=None):
+    inc = {
+        "requests": 1,
+        "successes": 1 if success else 0,
+        "cache_hits": 1 if cache_hit else 0,
+        "response_ms_sum": response_ms,
+        f"latency_hist.{latency_bucket(response_ms)}": 1,
+    }
+    if ttft_ms is not None:
+        inc.update({"streamed": 1, "ttft_ms_sum": ttft_ms})
+        if tokens_per_sec:
+            inc.update({"tps_sum": tokens_per_sec, "tps_count": 1})
+    return inc
+
+
+def rating_increments(rating):
+    return {"ratings": 1, "rating_sum": rating}
+
+
+def daily_event(ts, increments):
+    """Telemetry event adding increments to ts's day doc."""
+    day = day_id(ts)
+    return update_event(DAILY_COLLECTION, day, {"date": day}, increments)
+
+
+def totals_event(**increments):
+    return update_event(TOTALS_COLLECTION, TOTALS_DOC, {}, increments)
+
+
+# ─────────────────────────────────────────────
+# Reading
+# ─────────────────────────────────────────────
+def read_days(db, since=None):
+    """Day docs on or after since's UTC date (all when None), oldest first."""
+    query = db.collection(DAILY_COLLECTION)
+    if since:
+        query = query.where("date", ">=", day_id(since))
+    return sorted((doc.to_dict() for doc in query.stream()), key=lambda d: d.get("date", ""))
+
+
+def read_totals(db):
+    doc = db.collection(TOTALS_COLLECTION).document(TOTALS_DOC).get()
+    return doc.to_dict() if doc.exists else {}
+
+
+# ─────────────────────────────────────────────
+# Backfill
+# ─────────────────────────────────────────────
+def backfill(db):
+    """
+    Rebuilds every day doc and the totals doc from the raw collections.
+    Each collection is loaded once into a typed frame and aggregated with
+    groupby (dashboard_metrics.daily_rollups). Docs are overwritten, not
+    merged, so re-running is safe. Returns the number of day docs written.
+    """
+    from dashboard_metrics import (
+        to_frame, daily_rollups, USAGE_COLUMNS, PERFORMANCE_COLUMNS, RATING_COLUMNS, USER_COLUMNS,
+    )
+
+    def _load(collection, columns):
+        return to_frame((doc.to_dict() for doc in db.collection(collection).stream()), columns)
+
+    users = _load("users", USER_COLUMNS)
+    docs = daily_rollups(
+        _load("usage_logs", USAGE_COLUMNS),
+        _load("performance_logs", PERFORMANCE_COLUMNS),
+        _load("ratings", RATING_COLUMNS),
+        users,
+    )
+
+    items = sorted(docs.items())
+    for start in range(0, len(items), BACKFILL_BATCH):
+        batch = db.batch()
+        for day, doc in items[start:start + BACKFILL_BATCH]:
+            batch.set(db.collection(DAILY_COLLECTION).document(day), doc)
+        batch.commit()
+    db.collection(TOTALS_COLLECTION).document(TOTALS_DOC).set({
+        "users": len(users),
+        "premium_users": int((users["plan"] == "premium").sum()),
+    })
+    return len(items)
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from firebase_config import get_db
+
+    started = datetime.now()
+    print("🚀 Backfilling analytics rollups...")
+    written = backfill(get_db())
+    print(f"✅ Wrote {written} day docs in {(datetime.now() - started).total_seconds():.1f}s")
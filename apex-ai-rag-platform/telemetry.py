@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import queue
+import atexit
+import shutil
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────
+MAX_BATCH = 500  # Firestore WriteBatch limit
+FLUSH_INTERVAL = float(os.environ.get("APEX_TELEMETRY_FLUSH_SECONDS", "2.0"))
+SPILL_PATH = os.environ.get(
+    "APEX_TELEMETRY_SPILL",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".telemetry_spill.jsonl"),
+)
+SPILL_RETRY_SECONDS = 60
+SHUTDOWN_TIMEOUT = 10
+
+
+# ─────────────────────────────────────────────
+# Events
+# ─────────────────────────────────────────────
+# {"op": "add", "collection": "usage_logs", "data": {...}}
+# {"op": "update", "collection": "users", "doc": uid, "data": {...}, "increments": {"messages_sent": 1}}
+# Increments stay plain numbers until commit so events can be merged and spilled as JSON.
+# Dotted field names ("messages_by_hour.13") address nested map fields.
+
+def add_event(collection, data):
+    return {"op": "add", "collection": collection, "data": data}
+
+
+def update_event(collection, doc, data=None, increments=None):
+    return {"op": "update", "collection": collection, "doc": doc,
+            "data": data or {}, "increments": increments or {}}
+
+
+def _encode(obj):
+    if isinstance(obj, datetime):
+        return {"$dt": obj.isoformat()}
+    raise TypeError(f"not JSON serializable: {type(obj).__name__}")
+
+
+def _decode(obj):
+    if "$dt" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def nest(fields):
+    """{"a.b": 1} -> {"a": {"b": 1}} — merge-set treats dots literally, so map paths are nested first."""
+    out = {}
+    for path, value in fields.items():
+        node = out
+        *parents, leaf = path.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = value
+    return out
+
+
+def coalesce(events):
+    """
+    Merges updates to the same document: increments are summed, later
+    fields win. Adds are kept as-is. Order of first appearance is preserved.
+    """
+    merged, out = {}, []
+    for event in events:
+        if event["op"] != "update":
+            out.append(event)
+            continue
+        key = (event["collection"], event["doc"])
+        if key not in merged:
+            merged[key] = {**event, "data": dict(event["data"]), "increments": dict(event["increments"])}
+            out.append(merged[key])
+            continue
+        target = merged[key]
+        target["data"].update(event["data"])
+        for field, n in event["increments"].items():
+            target["increments"][field] = target["increments"].get(field, 0) + n
+    return out
+
+
+def _append_file(src, dst):
+    """Moves src's lines onto the end of dst, then removes src."""
+    with open(dst, "ab+") as out:
+        if out.tell():
+            out.seek(-1, os.SEEK_END)
+            if out.read(1) != b"\n":
+                out.write(b"\n")  # torn last line must not swallow the first appended one
+        with open(src, "rb") as f:
+            shutil.copyfileobj(f, out)
+    os.remove(src)
+
+
+# ─────────────────────────────────────────────
+# Writer
+# ─────────────────────────────────────────────
+class TelemetryWriter:
+    """
+    Off-request-path Firestore writer.
+
+    enqueue() only appends to an in-memory queue. A daemon thread flushes
+    in WriteBatches of up to MAX_BATCH when the buffer fills or
+    FLUSH_INTERVAL passes. Failed batches go to a JSONL spill file that is
+    replayed after the next successful commit. close() drains on shutdown.
+    on_commit(events), if given, is called with each committed chunk.
+
+    commit_seq is odd from just before a chunk is committed until its
+    on_commit has returned, and even otherwise. A reader that combines a
+    Firestore read with on_commit bookkeeping can compare it before and
+    after: the same even value means no commit landed in between.
+    """
+
+    def __init__(self, get_db, increment_cls, spill_path=SPILL_PATH,
+                 flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH, on_commit=None):
+        self.get_db = get_db
+        self.increment_cls = increment_cls
+        self.on_commit = on_commit
+        self.spill_path = spill_path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "spilled": 0, "replayed": 0}
+        self.commit_seq = 0
+        self._stop = threading.Event()
+        self._spill_lock = threading.Lock()
+        self._last_spill_try = 0.0
+        self._thread = threading.Thread(target=self._loop, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, *events):
+        for event in events:
+            self.queue.put(event)
+        self.stats["enqueued"] += len(events)
+
+    # ── flushing ──
+    def _loop(self):
+        buffer, deadline = [], time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                buffer.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+            stopping = self._stop.is_set()
+            if stopping:
+                while True:
+                    try:
+                        buffer.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+            if len(buffer) >= self.max_batch or time.monotonic() >= deadline or stopping:
+                if buffer:
+                    self._flush(buffer)
+                    buffer = []
+                elif not stopping:
+                    self._maybe_replay_spill()
+                deadline = time.monotonic() + self.flush_interval
+            if stopping:
+                return
+
+    def _commit(self, events):
+        db = self.get_db()
+        batch = db.batch()
+        for event in events:
+            collection = db.collection(event["collection"])
+            if event["op"] == "add":
+                batch.set(collection.document(), event["data"])
+            else:
+                fields = dict(event["data"])
+                fields.update((f, self.increment_cls(n)) for f, n in event["increments"].items())
+                # merge-set, not update: one deleted user doc must not fail the whole batch
+                batch.set(collection.document(event["doc"]), nest(fields), merge=True)
+        batch.commit()
+
+    def _flush(self, events):
+        """Commits in chunks of max_batch; spills whatever fails. Returns True if all committed."""
+        events = coalesce(events)
+        ok = True
+        for start in range(0, len(events), self.max_batch):
+            chunk = events[start:start + self.max_batch]
+            self.commit_seq += 1         # odd until on_commit has run
+            try:
+                try:
+                    self._commit(chunk)
+                except Exception as e:
+                    logger.warning("telemetry batch of %d failed, spilling: %s", len(chunk), e)
+                    self._spill(chunk)
+                    ok = False
+                    continue
+                self.stats["written"] += len(chunk)
+                self.stats["batches"] += 1
+                if self.on_commit:
+                    self.on_commit(chunk)
+            finally:
+                self.commit_seq += 1
+        if ok:
+            self._maybe_replay_spill()
+        return ok
+
+    # ── spill file ──
+    def _spill(self, events):
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event, default=_encode) + "\n")
+            self.stats["spilled"] += len(events)
+            self._last_spill_try = time.monotonic()  # back off before retrying
+
+    def _maybe_replay_spill(self):
+        """Re-queues spilled events, at most once per SPILL_RETRY_SECONDS."""
+        if self._stop.is_set() or time.monotonic() - self._last_spill_try < SPILL_RETRY_SECONDS:
+            return
+        self._last_spill_try = time.monotonic()
+        replay_path = f"{self.spill_path}.replay"
+        with self._spill_lock:
+            has_spill = os.path.exists(self.spill_path)
+            if os.path.exists(replay_path):
+                # left behind by a run that died mid-replay — append, never overwrite
+                if has_spill:
+                    _append_file(self.spill_path, replay_path)
+            elif has_spill:
+                os.replace(self.spill_path, replay_path)
+            else:
+                return
+        events = []
+        with open(replay_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line, object_hook=_decode))
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash
+        os.remove(replay_path)
+        self.stats["replayed"] += len(events)
+        self.enqueue(*events)
+
+    def close(self, timeout=SHUTDOWN_TIMEOUT):
+        """Flushes everything queued; anything still unwritten ends up in the spill file."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+# ─────────────────────────────────────────────
+# Process-wide instance
+# ─────────────────────────────────────────────
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer(get_db, increment_cls, on_commit=None):
+    """Started on first use; drained at interpreter exit."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = TelemetryWriter(get_db, increment_cls, on_commit=on_commit)
+            atexit.register(_writer.close)
+        return _writer
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeEmbeddings:
+    """Deterministic 8-d bag-of-characters vectors."""
+
+    def _vec(self, text):
+        v = np.zeros(8, dtype=np.float32)
+        for ch in text:
+            v[ord(ch) % 8] += 1
+        return (v / max(np.linalg.norm(v), 1e-6)).tolist()
+
+    def embed_documents(self, texts):
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vec(text)
+
+    def __call__(self, text):
+        return self.embed_query(text)
+
+
+@pytest.fixture
+def embeddings():
+    return FakeEmbeddings()
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+
+from dashboard_metrics import DashboardMetrics
+
+NOW = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+
+
+def _day(days_ago, uids, **fields):
+    return {"date": (NOW - timedelta(days=days_ago)).strftime("%Y-%m-%d"), "active": dict.fromkeys(uids, 1), **fields}
+
+
+def test_activity_windows_only_use_the_last_30_days():
+    days = [
+        _day(0, ["a", "b"], messages=3),
+        _day(5, ["c"], messages=1),
+        _day(20, ["d", "a"]),
+        _day(200, [f"old{i}" for i in range(1000)], messages=7),
+    ]
+    m = DashboardMetrics(days, {"users": 10}, NOW)
+
+    assert (m.dau, m.active_7, m.active_30, m.churned) == (2, 3, 4, 1)
+    assert m.messages == 11
+    assert not any(col.startswith("active") for col in m.frame.columns)
+
+
+def test_no_activity():
+    m = DashboardMetrics([], {}, NOW)
+    assert (m.dau, m.active_7, m.active_30, m.churned) == (0, 0, 0, 0)
@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("langchain_community")
+pytest.importorskip("faiss")
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from retrieval import HybridRetriever, RETRIEVAL_CONFIG
+
+
+def _kb(embeddings):
+    texts = [f"pricing plan tier {i} pricing details" for i in range(20)]
+    metadatas = [{"chunk_hash": f"kb{i}"} for i in range(20)]
+    return FAISS.from_texts(texts, embeddings, metadatas=metadatas)
+
+
+def test_uploads_keep_their_slots(embeddings):
+    retriever = HybridRetriever(_kb(embeddings))
+    uploads = [Document(page_content=f"my contract clause {i}", metadata={"source": "mine.pdf"}) for i in range(4)]
+
+    docs, timings = retriever.retrieve("pricing plan", extra={"uploads": lambda q: uploads})
+
+    assert len(docs) == RETRIEVAL_CONFIG["final_k"]
+    assert [d for d in docs if d.metadata.get("source") == "mine.pdf"] == uploads[:RETRIEVAL_CONFIG["extra_slots"]]
+    assert "uploads" in timings
+
+
+def test_without_uploads_returns_final_k(embeddings):
+    retriever = HybridRetriever(_kb(embeddings))
+    docs, _ = retriever.retrieve("pricing plan", extra={"uploads": lambda q: []})
+    assert len(docs) == RETRIEVAL_CONFIG["final_k"]
+    assert all(d.metadata["chunk_hash"].startswith("kb") for d in docs)
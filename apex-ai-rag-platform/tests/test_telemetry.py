@@ -0,0 +1,62 @@
+import json
+
+from telemetry import TelemetryWriter, add_event
+
+
+class FakeDB:
+    def __init__(self):
+        self.committed = []
+
+    def batch(self):
+        db = self
+
+        class Batch:
+            def __init__(self):
+                self.ops = []
+
+            def set(self, ref, data, merge=False):
+                self.ops.append(data)
+
+            def commit(self):
+                db.committed.extend(self.ops)
+
+        return Batch()
+
+    def collection(self, name):
+        class Ref:
+            def document(self, doc_id=None):
+                return doc_id
+
+        return Ref()
+
+
+def test_replay_keeps_events_from_a_crashed_replay(tmp_path, monkeypatch):
+    monkeypatch.setattr("telemetry.SPILL_RETRY_SECONDS", 0)
+    spill = tmp_path / "spill.jsonl"
+    (tmp_path / "spill.jsonl.replay").write_text(
+        json.dumps(add_event("usage_logs", {"n": 1})) + "\n" + '{"op": "add", "coll', encoding="utf-8",
+    )
+    spill.write_text(json.dumps(add_event("usage_logs", {"n": 2})) + "\n", encoding="utf-8")
+
+    db = FakeDB()
+    writer = TelemetryWriter(lambda: db, int, spill_path=str(spill), flush_interval=0.05)
+    writer._maybe_replay_spill()
+    writer.close()
+
+    assert sorted(d["n"] for d in db.committed) == [1, 2]
+    assert writer.stats["replayed"] == 2
+    assert not spill.exists() and not (tmp_path / "spill.jsonl.replay").exists()
+
+
+def test_commit_seq_brackets_commit_and_on_commit(tmp_path):
+    seen = []
+    db = FakeDB()
+    writer = TelemetryWriter(lambda: db, int, spill_path=str(tmp_path / "spill.jsonl"), flush_interval=0.05,
+                             on_commit=lambda chunk: seen.append(writer.commit_seq))
+    writer.close()  # drive _flush directly, without the background loop
+    writer._flush([add_event("usage_logs", {"n": 1})])
+    assert seen == [1] and writer.commit_seq == 2
+
+    db.batch = lambda: (_ for _ in ()).throw(RuntimeError("offline"))
+    assert writer._flush([add_event("usage_logs", {"n": 2})]) is False
+    assert writer.commit_seq == 4 and seen == [1]
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+pytest.importorskip("langchain_community")
+pytest.importorskip("faiss")
+
+import vector_index
+from ingestion import IngestionManager
+
+
+def _build(tmp_path, index_dir, text, embeddings):
+    kb = tmp_path / "knowledge.txt"
+    kb.write_text(text, encoding="utf-8")
+    store, stats = vector_index.load_or_build_index(str(kb), embeddings, index_dir=str(index_dir))
+    assert stats["status"] == "built"
+    return store
+
+
+def test_rebuilds_keep_user_indexes(tmp_path, monkeypatch, embeddings):
+    index_dir = tmp_path / "index"
+    users_dir = index_dir / "users"
+    monkeypatch.setattr("ingestion.USER_INDEX_DIR", str(users_dir))
+
+    _build(tmp_path, index_dir, "first knowledge base", embeddings)
+    ingestion = IngestionManager(embeddings, workers=1)
+    job_id = ingestion.submit("alice", "notes.txt", b"alice uploaded notes")
+    ingestion.pool.shutdown(wait=True)
+    assert ingestion.jobs[job_id]["stage"] == "done"
+
+    for text in ("second knowledge base", "third knowledge base", "fourth knowledge base"):
+        _build(tmp_path, index_dir, text, embeddings)
+
+    assert os.path.exists(users_dir / "alice" / "chunks.json")
+    builds = [n for n in os.listdir(index_dir) if vector_index.BUILD_KEY_RE.match(n)]
+    assert len(builds) == vector_index.KEEP_BUILDS
+
+    fresh = IngestionManager(embeddings, workers=1)
+    assert [d.page_content for d in fresh.search("alice", "notes")] == ["alice uploaded notes"]
@@ -0,0 +1,210 @@
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# ─────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+NORMALIZE_EMBEDDINGS = True
+
+SPLITTER_CONFIG = {
+    "chunk_size": 1500,  # 3x larger chunks for more context
+    "chunk_overlap": 200,  # 4x more overlap to preserve relationships
+    "separators": ["\n\n", "\n", ". ", "! ", "? ", "; ", ", ", " ", ""],
+}
+
+# Bump when the on-disk layout changes — old builds are then ignored
+INDEX_FORMAT_VERSION = 1
+
+DEFAULT_INDEX_DIR = os.environ.get(
+    "APEX_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".vector_index")
+)
+KEEP_BUILDS = 2
+BUILD_KEY_RE = re.compile(r"^[0-9a-f]{24}$")  # build_key() names; anything else in index_dir is left alone
+
+
+# ─────────────────────────────────────────────
+# Hashing
+# ─────────────────────────────────────────────
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_fingerprint():
+    """Identifies the vector space — chunk vectors are reusable while this is unchanged."""
+    return _sha256(json.dumps({
+        "model": EMBEDDING_MODEL,
+        "normalize": NORMALIZE_EMBEDDINGS,
+        "v": INDEX_FORMAT_VERSION,
+    }, sort_keys=True))
+
+
+def build_key(source_text):
+    """Content hash of the knowledge base + splitter + embedding config."""
+    return _sha256(json.dumps({
+        "source": _sha256(source_text),
+        "splitter": SPLITTER_CONFIG,
+        "embedding": embedding_fingerprint(),
+    }, sort_keys=True))[:24]
+
+
+_hash_memo = {}
+
+
+def knowledge_hash(kb_path):
+    """build_key() of the file at kb_path, re-read only when its mtime/size change."""
+    try:
+        st_ = os.stat(kb_path)
+    except OSError:
+        return None
+    stamp = (st_.st_mtime_ns, st_.st_size)
+    cached = _hash_memo.get(kb_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with open(kb_path, "r", encoding="utf-8") as f:
+        key = build_key(f.read())
+    _hash_memo[kb_path] = (stamp, key)
+    return key
+
+
+# ─────────────────────────────────────────────
+# On-disk builds
+# ─────────────────────────────────────────────
+# <index_dir>/<build_key>/vectors.npy   float32 (n, dim), memory-mapped on load
+# <index_dir>/<build_key>/chunks.json   chunk texts + hashes, same row order
+# <index_dir>/LATEST                    most recent build — seeds incremental rebuilds
+# Builds are written to a temp dir and renamed into place, so replicas
+# sharing the volume never see a half-written build.
+
+def read_build(build_dir):
+    """(manifest, vectors) for a complete build, or (None, None)."""
+    manifest_path = os.path.join(build_dir, "chunks.json")
+    vectors_path = os.path.join(build_dir, "vectors.npy")
+    if not (os.path.exists(manifest_path) and os.path.exists(vectors_path)):
+        return None, None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        vectors = np.load(vectors_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None, None
+    if len(manifest.get("chunks", [])) != len(vectors):
+        return None, None
+    return manifest, vectors
+
+
+def _write_build(index_dir, key, manifest, vectors):
+    os.makedirs(index_dir, exist_ok=True)
+    final_dir = os.path.join(index_dir, key)
+    tmp_dir = os.path.join(index_dir, f".tmp-{key}-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "vectors.npy"), vectors)
+    with open(os.path.join(tmp_dir, "chunks.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    try:
+        os.rename(tmp_dir, final_dir)
+    except OSError:
+        # Another replica finished the same build first — theirs is identical
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    latest_tmp = os.path.join(index_dir, f".LATEST-{os.getpid()}")
+    with open(latest_tmp, "w", encoding="utf-8") as f:
+        f.write(key)
+    os.replace(latest_tmp, os.path.join(index_dir, "LATEST"))
+    _prune(index_dir, keep={key})
+
+
+def _prune(index_dir, keep):
+    """Drop all but the newest KEEP_BUILDS builds. Only build-key dirs are candidates."""
+    builds = [
+        os.path.join(index_dir, name) for name in os.listdir(index_dir)
+        if BUILD_KEY_RE.match(name) and os.path.isdir(os.path.join(index_dir, name))
+    ]
+    builds.sort(key=os.path.getmtime, reverse=True)
+    for path in builds[KEEP_BUILDS:]:
+        if os.path.basename(path) not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _previous_vectors(index_dir):
+    """chunk hash -> vector from the last build in the same embedding space."""
+    try:
+        with open(os.path.join(index_dir, "LATEST"), "r", encoding="utf-8") as f:
+            latest = f.read().strip()
+    except OSError:
+        return {}
+    manifest, vectors = read_build(os.path.join(index_dir, latest))
+    if manifest is None or manifest.get("embedding") != embedding_fingerprint():
+        return {}
+    return {c["hash"]: vectors[i] for i, c in enumerate(manifest["chunks"])}
+
+
+# ─────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────
+def split_text(text):
+    return RecursiveCharacterTextSplitter(**SPLITTER_CONFIG).split_text(text)
+
+
+def load_or_build_index(kb_path, embeddings, index_dir=None):
+    """
+    FAISS store for kb_path. Loads the saved build when knowledge.txt and
+    the config are unchanged; otherwise re-splits and embeds only chunks
+    whose hash is not in the previous build.
+    Returns (vectorstore | None, stats).
+    """
+    index_dir = index_dir or DEFAULT_INDEX_DIR
+    t0 = time.time()
+    with open(kb_path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    key = build_key(text)
+    manifest, vectors = read_build(os.path.join(index_dir, key))
+    status, embedded = "loaded", 0
+
+    if manifest is None:
+        chunks = split_text(text)
+        if not chunks:
+            return None, {"status": "empty", "chunks": 0, "embedded": 0, "seconds": round(time.time() - t0, 3)}
+
+        hashes = [_sha256(c) for c in chunks]
+        reuse = _previous_vectors(index_dir)
+        missing = [i for i, h in enumerate(hashes) if h not in reuse]
+        fresh = embeddings.embed_documents([chunks[i] for i in missing]) if missing else []
+        fresh_by_hash = {hashes[i]: np.asarray(v, dtype=np.float32) for i, v in zip(missing, fresh)}
+        vectors = np.stack([
+            fresh_by_hash[h] if h in fresh_by_hash else np.asarray(reuse[h], dtype=np.float32)
+            for h in hashes
+        ])
+        status, embedded = "built", len(missing)
+        manifest = {
+            "embedding": embedding_fingerprint(),
+            "chunks": [{"hash": h, "text": c} for h, c in zip(hashes, chunks)],
+        }
+        try:
+            _write_build(index_dir, key, manifest, vectors)
+        except OSError:
+            pass  # read-only volume — still serve the in-memory index
+
+    texts = [c["text"] for c in manifest["chunks"]]
+    metadatas = [{"chunk_hash": c["hash"]} for c in manifest["chunks"]]
+    vectorstore = FAISS.from_embeddings(
+        text_embeddings=list(zip(texts, vectors)),
+        embedding=embeddings,
+        metadatas=metadatas,
+    )
+    return vectorstore, {
+        "status": status,
+        "chunks": len(texts),
+        "embedded": embedded,
+        "seconds": round(time.time() - t0, 3),
+    }
@@ -1,5 +1,9 @@
 import streamlit as st
 import os
+import re
+import csv
+import json
+import math
 import time
 
 st.set_page_config(
@@ -444,6 +448,164 @@ st.markdown('<div class="div"></div>', unsafe_allow_html=True)
 run_btn = st.button("⚙  RUN TOOL-POWERED CREW")
 
 
+# ── Industry data + index ───────────────────────────────────────────────────────
+# Built-in tables; MARKET_DATA_PATH / COMPETITOR_DATA_PATH (CSV or JSON,
+# keyed by an "industry" column, optional "|"-separated "aliases") replace them.
+MARKET_DATA_DEFAULT = {
+    "AI Fitness":      {"size": "$22B", "growth": "28% CAGR", "leaders": "Whoop, Noom, Future"},
+    "Real Estate AI":  {"size": "$18B", "growth": "32% CAGR", "leaders": "Zillow, CoStar, Reonomy"},
+    "AI Marketing":    {"size": "$107B", "growth": "35% CAGR", "leaders": "Jasper, Copy.ai, AdCreative"},
+    "AI SaaS":         {"size": "$115B", "growth": "38% CAGR", "leaders": "Salesforce Einstein, HubSpot AI"},
+    "EdTech AI":       {"size": "$31B", "growth": "22% CAGR", "leaders": "Coursera, Duolingo, Khanmigo"},
+    "HealthTech AI":   {"size": "$45B", "growth": "41% CAGR", "leaders": "Tempus, Viz.ai, Babylon"},
+    "FinTech AI":      {"size": "$78B", "growth": "29% CAGR", "leaders": "Stripe, Plaid, Brex"},
+    "LegalTech AI":    {"size": "$12B", "growth": "26% CAGR", "leaders": "Clio, ContractPodAi, Harvey"},
+}
+
+COMPETITOR_DATA_DEFAULT = {
+    "AI Fitness":      {"players": ["Future ($149/mo)", "Noom ($70/mo)", "Whoop ($30/mo)"], "gap": "No B2B/corporate wellness focus — high opportunity"},
+    "Real Estate AI":  {"players": ["Reonomy ($500/mo)", "CoStar ($1200/mo)", "PropStream ($100/mo)"], "gap": "Too expensive for independent investors under 10 deals/month"},
+    "AI Marketing":    {"players": ["Jasper ($49/mo)", "Copy.ai ($49/mo)", "AdCreative ($29/mo)"], "gap": "None specialized for DTC ecommerce product catalog workflows"},
+    "AI SaaS":         {"players": ["Harvey ($custom)", "Clio ($39/mo)", "ContractPodAi ($custom)"], "gap": "Harvey priced out of solo lawyers — massive underserved segment"},
+    "EdTech AI":       {"players": ["Coursera ($59/mo)", "Duolingo (free)", "Udemy ($12/course)"], "gap": "No AI-personalized career-path learning for adults in emerging markets"},
+    "HealthTech AI":   {"players": ["Babylon ($15/mo)", "K Health ($29/mo)", "Ada (free)"], "gap": "Symptom checkers without actionable next-step integration"},
+    "FinTech AI":      {"players": ["Mint (free)", "YNAB ($14/mo)", "Copilot ($13/mo)"], "gap": "No proactive AI intervention — all reactive dashboards"},
+    "LegalTech AI":    {"players": ["Clio ($39/mo)", "Harvey ($custom)", "Ironclad ($custom)"], "gap": "Enterprise pricing blocks solo attorneys — no mid-market player"},
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "the", "to", "with"})
+_GENERIC = frozenset({"ai", "app", "apps", "platform", "software", "startup", "tech", "technology"})
+SEED_LIMIT = FUZZY_GRAM_LIMIT = 64   # caps that keep lookup cost independent of table size
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(str(text).lower().replace("&", " and ")) if t not in _STOPWORDS]
+
+
+def _trigrams(token):
+    padded = f" {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def load_industry_table(path, default):
+    """{industry: record} from CSV/JSON at path, or the built-in table when path is unset."""
+    if not path:
+        return default
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            data = json.load(f)
+            rows = [{"industry": k, **v} for k, v in data.items()] if isinstance(data, dict) else data
+    table = {}
+    for row in rows:
+        name = str(row.pop("industry", "")).strip()
+        if name:
+            aliases = row.get("aliases") or []
+            row["aliases"] = aliases if isinstance(aliases, list) else [a.strip() for a in aliases.split("|") if a.strip()]
+            table[name] = row
+    return table
+
+
+class IndustryIndex:
+    """
+    Prebuilt lookup: token inverted index + alias table + trigram index for typos.
+    Score = IDF-weighted share of an entry's name (or alias) tokens found in the
+    query. Candidates come only from rare query tokens (generic words, tokens in
+    >25% of entries or >SEED_LIMIT names don't seed), names/aliases found whole
+    in the query, and names/aliases containing the whole query — a phrase that
+    holds all of a name's rare tokens and points at one entry ("HR" → "HR Tech
+    AI") matches even below min_score. Otherwise partial coverage must score
+    strictly above min_score: "health" alone is not "health and fitness".
+    Lookup cost tracks the query, not the table. Ties break on name.
+    """
+
+    def __init__(self, table, min_score=0.5, fuzzy=0.7):
+        self.table, self.min_score, self.fuzzy = table, min_score, fuzzy
+        self.names    = sorted(table)
+        self.exact    = {}
+        self.variants = []
+        self.postings = {}
+        self.phrases  = {}
+        self.trigrams = {}
+        entries = {}
+        for entry_id, name in enumerate(self.names):
+            for text in [name, *table[name].get("aliases", [])]:
+                tokens = tuple(dict.fromkeys(tokenize(text)))
+                if not tokens:
+                    continue
+                self.exact.setdefault(" ".join(tokens), len(self.variants))
+                self.variants.append((entry_id, tokens))
+                for t in tokens:
+                    self.postings.setdefault(t, []).append(len(self.variants) - 1)
+                    entries.setdefault(t, set()).add(entry_id)
+        n = len(self.names) or 1
+        self.idf     = {t: math.log(1 + n / len(e)) for t, e in entries.items()}
+        self.common  = {t for t, e in entries.items()
+                        if t in _GENERIC or (n > 8 and len(e) > n * 0.25) or len(self.postings[t]) > SEED_LIMIT}
+        self.weight  = [sum(self.idf[t] for t in tokens) for _, tokens in self.variants]
+        self.longest = max((len(tokens) for _, tokens in self.variants), default=0)
+        for v, (_, tokens) in enumerate(self.variants):
+            for i in range(len(tokens)):
+                for j in range(i + 1, len(tokens) + 1):
+                    if not self.common.issuperset(tokens[i:j]):
+                        self.phrases.setdefault(" ".join(tokens[i:j]), []).append(v)
+        self.grams = {t: _trigrams(t) for t in self.postings}
+        for t, grams in self.grams.items():
+            for g in grams:
+                self.trigrams.setdefault(g, []).append(t)
+
+    def _expand(self, token):
+        if token in self.postings:
+            return {token: 1.0}
+        if len(token) < 4:
+            return {}
+        grams = _trigrams(token)
+        cands = {c for g in grams if len(self.trigrams.get(g, ())) <= FUZZY_GRAM_LIMIT for c in self.trigrams.get(g, ())}
+        sims = sorted((-2 * len(grams & self.grams[c]) / (len(grams) + len(self.grams[c])), c) for c in cands)
+        return {c: -s for s, c in sims[:3] if -s >= self.fuzzy}
+
+    def search(self, query, k=5):
+        """Top-k [(industry, score)], best first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if " ".join(tokens) in self.exact:
+            return [(self.names[self.variants[self.exact[" ".join(tokens)]][0]], 1.0)][:k]
+        weights = {}
+        for token in tokens:
+            for known, w in self._expand(token).items():
+                weights[known] = max(weights.get(known, 0.0), w)
+        candidates = {v for t in weights if t not in self.common for v in self.postings[t]}
+        candidates.update(self.exact[p] for i in range(len(tokens))
+                          for j in range(i + 1, min(i + self.longest, len(tokens)) + 1)
+                          if (p := " ".join(tokens[i:j])) in self.exact)
+        contains_query = self.phrases.get(" ".join(tokens), ())
+        candidates.update(contains_query)
+        always = {self.variants[v][0] for v in contains_query
+                  if self.common.issuperset(set(self.variants[v][1]).difference(tokens))}
+        always = always if len(always) == 1 else set()
+        best = {}
+        for v in candidates:
+            entry_id, vtokens = self.variants[v]
+            score = round(sum(self.idf[t] * weights.get(t, 0.0) for t in vtokens) / self.weight[v], 4)
+            best[entry_id] = max(best.get(entry_id, 0.0), score)
+        ranked = sorted(((self.names[e], s) for e, s in best.items() if s >= 1.0 or s > self.min_score or e in always),
+                        key=lambda item: (-item[1], item[0]))
+        return ranked[:k]
+
+    def lookup(self, query):
+        hits = self.search(query, k=1)
+        return (hits[0][0], self.table[hits[0][0]]) if hits else (None, None)
+
+
+@st.cache_resource
+def get_industry_indexes():
+    """Built once per process, shared by every run."""
+    market     = load_industry_table(os.environ.get("MARKET_DATA_PATH"), MARKET_DATA_DEFAULT)
+    competitor = load_industry_table(os.environ.get("COMPETITOR_DATA_PATH"), COMPETITOR_DATA_DEFAULT)
+    return IndustryIndex(market), IndustryIndex(competitor)
+
+
 # ── Execution ──────────────────────────────────────────────────────────────────
 if run_btn:
     if not business_idea.strip():
@@ -469,6 +631,8 @@ if run_btn:
         os.environ["GEMINI_API_KEY"] = api_key
 
     # ── Define Tools ───────────────────────────────────────────────────────────
+    market_index, competitor_index = get_industry_indexes()
+
     class MarketSizeTool(BaseTool):
         name: str = "Market Size Estimator"
         description: str = (
@@ -476,24 +640,14 @@ if run_btn:
             "Use this tool when you need market size data to support business analysis. "
             "Input should be the industry name."
         )
-        market_data: ClassVar[Dict] = {
-            "AI Fitness":      {"size": "$22B", "growth": "28% CAGR", "leaders": "Whoop, Noom, Future"},
-            "Real Estate AI":  {"size": "$18B", "growth": "32% CAGR", "leaders": "Zillow, CoStar, Reonomy"},
-            "AI Marketing":    {"size": "$107B", "growth": "35% CAGR", "leaders": "Jasper, Copy.ai, AdCreative"},
-            "AI SaaS":         {"size": "$115B", "growth": "38% CAGR", "leaders": "Salesforce Einstein, HubSpot AI"},
-            "EdTech AI":       {"size": "$31B", "growth": "22% CAGR", "leaders": "Coursera, Duolingo, Khanmigo"},
-            "HealthTech AI":   {"size": "$45B", "growth": "41% CAGR", "leaders": "Tempus, Viz.ai, Babylon"},
-            "FinTech AI":      {"size": "$78B", "growth": "29% CAGR", "leaders": "Stripe, Plaid, Brex"},
-            "LegalTech AI":    {"size": "$12B", "growth": "26% CAGR", "leaders": "Clio, ContractPodAi, Harvey"},
-        }
         def _run(self, industry: str) -> str:
-            for key, val in self.market_data.items():
-                if key.lower() in industry.lower() or industry.lower() in key.lower():
-                    return (
-                        f"Market: {key} | Global Size: {val['size']} | "
-                        f"Growth Rate: {val['growth']} | Key Players: {val['leaders']}"
-                    )
-            return f"Market data not found for '{industry}'. Available: {', '.join(self.market_data.keys())}"
+            key, val = market_index.lookup(industry)
+            if key is None:
+                return f"Market data not found for '{industry}'. Available: {', '.join(market_index.names[:10])}"
+            return (
+                f"Market: {key} | Global Size: {val['size']} | "
+                f"Growth Rate: {val['growth']} | Key Players: {val['leaders']}"
+            )
 
     class ROITool(BaseTool):
         name: str = "ROI Calculator"
@@ -533,22 +687,13 @@ if run_btn:
             "Returns competitor names, pricing tiers, and key weaknesses for a given industry. "
             "Use this to identify differentiation opportunities. Input should be the industry name."
         )
-        competitor_data: ClassVar[Dict] = {
-            "AI Fitness":      {"players": ["Future ($149/mo)", "Noom ($70/mo)", "Whoop ($30/mo)"], "gap": "No B2B/corporate wellness focus — high opportunity"},
-            "Real Estate AI":  {"players": ["Reonomy ($500/mo)", "CoStar ($1200/mo)", "PropStream ($100/mo)"], "gap": "Too expensive for independent investors under 10 deals/month"},
-            "AI Marketing":    {"players": ["Jasper ($49/mo)", "Copy.ai ($49/mo)", "AdCreative ($29/mo)"], "gap": "None specialized for DTC ecommerce product catalog workflows"},
-            "AI SaaS":         {"players": ["Harvey ($custom)", "Clio ($39/mo)", "ContractPodAi ($custom)"], "gap": "Harvey priced out of solo lawyers — massive underserved segment"},
-            "EdTech AI":       {"players": ["Coursera ($59/mo)", "Duolingo (free)", "Udemy ($12/course)"], "gap": "No AI-personalized career-path learning for adults in emerging markets"},
-            "HealthTech AI":   {"players": ["Babylon ($15/mo)", "K Health ($29/mo)", "Ada (free)"], "gap": "Symptom checkers without actionable next-step integration"},
-            "FinTech AI":      {"players": ["Mint (free)", "YNAB ($14/mo)", "Copilot ($13/mo)"], "gap": "No proactive AI intervention — all reactive dashboards"},
-            "LegalTech AI":    {"players": ["Clio ($39/mo)", "Harvey ($custom)", "Ironclad ($custom)"], "gap": "Enterprise pricing blocks solo attorneys — no mid-market player"},
-        }
         def _run(self, industry: str) -> str:
-            for key, val in self.competitor_data.items():
-                if key.lower() in industry.lower() or industry.lower() in key.lower():
-                    players_str = " | ".join(val["players"])
-                    return f"Competitors: {players_str} | Market Gap: {val['gap']}"
-            return f"Competitor data not found for '{industry}'."
+            key, val = competitor_index.lookup(industry)
+            if key is None:
+                return f"Competitor data not found for '{industry}'."
+            players = val["players"]
+            players_str = " | ".join(players) if isinstance(players, list) else players
+            return f"Competitors: {players_str} | Market Gap: {val['gap']}"
 
     # ── Live log ───────────────────────────────────────────────────────────────
     t0 = time.time()
@@ -5,6 +5,10 @@ import json
 import re
 import logging
 import io
+import html
+import queue
+import threading
+import uuid
 from datetime import datetime
 
 st.set_page_config(
@@ -54,6 +58,106 @@ if not logger.handlers:
 def log_event(msg, level="INFO"):
     getattr(logger, level.lower(), logger.info)(msg)
 
+# ── Streaming execution ───────────────────────────────────────────────────────────
+# StreamRoutes / _stream_routes / kickoff_streaming are kept in sync with
+# AI-Business-Intelligence-Assistant/app.py (only the step / task payloads differ) —
+# each app deploys as a single file.
+class StreamRoutes:
+    """
+    run id → {id(llm): (llm, chunk callback)}. Concurrent Streamlit sessions
+    register and remove their runs under one lock, and a chunk only reaches
+    the run whose LLM object emitted it. Holding the LLM keeps its id from
+    being reused by another session's LLM while the run is registered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs = {}
+
+    def add(self, run_id, llm, callback):
+        with self._lock:
+            self._runs.setdefault(run_id, {})[id(llm)] = (llm, callback)
+
+    def remove(self, run_id):
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def dispatch(self, source, chunk):
+        callbacks = []
+        with self._lock:
+            for run in self._runs.values():
+                llm, callback = run.get(id(source), (None, None))
+                if llm is source:
+                    callbacks.append(callback)
+        for callback in callbacks:
+            callback(chunk)
+
+
+@st.cache_resource
+def _stream_routes():
+    """
+    The process-wide StreamRoutes. CrewAI's event bus is process-wide, so one
+    listener is registered per process and routes chunks by emitting LLM.
+    Returns None when this CrewAI build has no token stream events.
+    """
+    try:
+        from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+    except ImportError:
+        try:
+            from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+        except ImportError:
+            return None
+    routes = StreamRoutes()
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _route_chunk(source, event):
+        routes.dispatch(source, event.chunk)
+
+    return routes
+
+
+def kickoff_streaming(crew, on_event, poll=0.1):
+    """
+    Runs crew.kickoff() on a worker thread. Agent steps, finished tasks and LLM
+    token chunks are queued and handed to on_event(kind, agent, text) here on
+    the Streamlit thread — only this thread may draw.
+    Returns (result, ttft_seconds | None); re-raises the crew's exception.
+    """
+    events, box = queue.Queue(), {}
+    routes, run_id = _stream_routes(), uuid.uuid4().hex
+    for agent in crew.agents:
+        if routes is not None and getattr(agent, "llm", None) is not None:
+            routes.add(run_id, agent.llm, lambda chunk, role=agent.role: events.put(("token", role, chunk)))
+    crew.step_callback = lambda step: events.put(
+        ("step", None, str(getattr(step, "thought", "") or getattr(step, "output", "") or step)))
+    crew.task_callback = lambda out: events.put(
+        ("task", getattr(out, "agent", None), str(getattr(out, "raw", out))))
+
+    def worker():
+        try:
+            box["result"] = crew.kickoff()
+        except Exception as e:
+            box["error"] = e
+
+    start, first_token = time.time(), None
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        while thread.is_alive() or not events.empty():
+            try:
+                kind, agent, text = events.get(timeout=poll)
+            except queue.Empty:
+                continue
+            if kind == "token" and first_token is None:
+                first_token = time.time()
+            on_event(kind, agent, text)
+    finally:
+        if routes is not None:
+            routes.remove(run_id)
+    if "error" in box:
+        raise box["error"]
+    return box["result"], (round(first_token - start, 2) if first_token else None)
+
 # ══════════════════════════════════════════════════════════════════════════════════
 # CSS — Observability Terminal Aesthetic
 # Inspired by: Datadog, Grafana, Honeycomb
@@ -702,10 +806,11 @@ with st.expander("⚙  OBSERVABILITY SETTINGS"):
             ["Venture Capital","Angel Investor","Private Equity","Impact Investor"])
         geography    = st.selectbox("GEOGRAPHY",
             ["Global","Southeast Asia","South Asia","USA & Canada","Europe"])
-    col_c, col_d, col_e = st.columns(3)
+    col_c, col_d, col_e, col_f = st.columns(4)
     with col_c: show_trace    = st.checkbox("Show trace log",    value=True)
     with col_d: show_timeline = st.checkbox("Show timeline",     value=True)
     with col_e: show_json     = st.checkbox("Show JSON verdict", value=True)
+    with col_f: live_stream   = st.checkbox("Stream tokens",     value=True)
 
 st.markdown('<div class="div"></div>', unsafe_allow_html=True)
 run_btn   = st.button("◈  DEPLOY AGENTS + START TRACE")
@@ -828,8 +933,16 @@ if run_btn:
     # ── LLM ──────────────────────────────────────────────────────────────────────
     log_event("Initializing LLM...", "DEBUG")
     step_start = time.time()
+    stream_tokens = live_stream and _stream_routes() is not None
+
+    def make_llm():
+        # One instance per agent so streamed chunks can be attributed to it
+        if stream_tokens:
+            return LLM(model=model_id, temperature=0.3, stream=True)
+        return LLM(model=model_id, temperature=0.3)
+
     try:
-        llm = LLM(model=model_id, temperature=0.3)
+        llm = make_llm()
     except Exception as e:
         log_event(f"LLM init failed: {e}", "ERROR")
         st.markdown(f'<div class="fail-box"><div class="fail-box-title">LLM Error</div>{e}</div>', unsafe_allow_html=True)
@@ -859,19 +972,19 @@ if run_btn:
         role="Market Analyst",
         goal="Evaluate TAM/SAM/SOM, competitive landscape, demand signals, and market timing.",
         backstory=f"Senior market analyst. {inv_map[investor_type]} Focus on {geography} markets.",
-        llm=llm, verbose=True, max_iter=4,
+        llm=make_llm(), verbose=True, max_iter=4,
     )
     financial_analyst = Agent(
         role="Financial Analyst",
         goal="Assess revenue model, unit economics, gross margin, capital requirements.",
         backstory="Startup CFO with 50+ financial models built. Expert in CAC, LTV, burn rate.",
-        llm=llm, verbose=True, max_iter=4,
+        llm=make_llm(), verbose=True, max_iter=4,
     )
     risk_analyst = Agent(
         role="Risk Analyst",
         goal="Identify and rate market, regulatory, technical, and execution risks.",
         backstory="Venture risk specialist who studied 300+ startup failures. Rates risks H/M/L.",
-        llm=llm, verbose=True, max_iter=4,
+        llm=make_llm(), verbose=True, max_iter=4,
     )
     investment_advisor = Agent(
         role="Investment Advisor",
@@ -883,7 +996,7 @@ if run_btn:
             f"final_decision (INVEST/CONDITIONAL/WATCH/PASS), "
             f"decision_reasoning (1-2 sentences explaining why)."
         ),
-        llm=llm, verbose=True, max_iter=5,
+        llm=make_llm(), verbose=True, max_iter=5,
     )
 
     record_step("Agent Setup", step_start, time.time(), "#22d3ee")
@@ -963,16 +1076,59 @@ if run_btn:
     exec_start = time.time()
     render_trace()
 
+    stream_ph  = st.empty()
+    buffers    = {}
+    task_marks = [exec_start]
+    last_draw  = [0.0]
+
+    def render_stream():
+        body = "".join(
+            f'<div class="trace-line"><span class="trace-lvl lvl-info">{html.escape(role)}</span>'
+            f'<span class="trace-msg">{html.escape(text[-500:])}</span></div>'
+            for role, text in buffers.items()
+        )
+        stream_ph.markdown(f"""
+        <div class="trace-shell">
+          <div class="trace-titlebar">
+            <span class="trace-dot td-r"></span>
+            <span class="trace-dot td-y"></span>
+            <span class="trace-dot td-g"></span>
+            <span class="trace-title">LIVE AGENT OUTPUT · STREAMING</span>
+          </div>
+          <div class="trace-body">{body}</div>
+        </div>""", unsafe_allow_html=True)
+
+    def on_event(kind, agent, text):
+        if kind == "token":
+            buffers[agent] = buffers.get(agent, "") + text
+            if time.time() - last_draw[0] > 0.15:
+                render_stream()
+                last_draw[0] = time.time()
+        elif kind == "task":
+            task_marks.append(time.time())
+            log_event(f"Task complete · {agent} · {round(task_marks[-1] - exec_start, 1)}s", "INFO")
+            render_trace()
+        elif log_level == "DEBUG":
+            log_event(f"Step · {html.escape(text[:100])}", "DEBUG")
+            render_trace()
+
     try:
-        result = crew.kickoff()
+        result, ttft = kickoff_streaming(crew, on_event)
         exec_end = time.time()
         exec_time = round(exec_end - exec_start, 2)
         total_time = round(time.time() - t0, 2)
-
-        record_step("Market Analysis",     exec_start,                exec_start + exec_time*0.25, "#fbbf24")
-        record_step("Financial Analysis",  exec_start + exec_time*0.25, exec_start + exec_time*0.50, "#60a5fa")
-        record_step("Risk Assessment",     exec_start + exec_time*0.50, exec_start + exec_time*0.75, "#f87171")
-        record_step("Investment Verdict",  exec_start + exec_time*0.75, exec_end,                    "#4ade80")
+        if buffers:
+            render_stream()
+        if ttft is not None:
+            log_event(f"Time to first token: {ttft}s", "INFO")
+
+        # Real task boundaries from task_callback — sequential, so each task
+        # runs from the previous one's completion to its own
+        marks = (task_marks + [exec_end] * 4)[:5]
+        record_step("Market Analysis",     marks[0], marks[1], "#fbbf24")
+        record_step("Financial Analysis",  marks[1], marks[2], "#60a5fa")
+        record_step("Risk Assessment",     marks[2], marks[3], "#f87171")
+        record_step("Investment Verdict",  marks[3], exec_end, "#4ade80")
 
         # ── Monitoring: update counters ───────────────────────────────────────────
         st.session_state["total_time"] += total_time